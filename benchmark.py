@@ -0,0 +1,455 @@
+# benchmark.py
+# Synthetic data generator and query benchmarks for every panel's hot paths.
+# Runs against a local MySQL server (GYM_DB_* env vars); point GYM_DB_NAME at a scratch database.
+#
+#   python benchmark.py generate --members 100000 --payments 5000000 --classes 500000 --truncate
+#   python benchmark.py run --iterations 200 --output bench_results.json
+import argparse
+import datetime
+import json
+import random
+import time
+
+import class_slots
+import equipment_usage
+import expiry
+import gymdb
+import member_dashboard
+import member_search
+import membership
+import migrations
+import payroll
+import reminders
+import revenue
+import scheduling
+import search_index
+
+GENERATE_CHUNK_SIZE = 10000
+SCHEMES = [("Monthly", 1, 1500), ("Quarterly", 3, 4000), ("Half Yearly", 6, 7500),
+           ("Yearly", 12, 14000), ("Student Yearly", 12, 10000), ("Couple Yearly", 12, 25000)]
+PAYMENT_METHODS = ["Cash", "Card", "UPI"]
+TABLES = ["reminder_outbox", "reminder_state", "payslip", "payroll_run", "revenue_daily", "revenue_monthly", "rollup_state", "payment", "class_enrollment", "class_series", "classes", "member", "salary", "trainer", "workouts", "equipment", "membership_schemes", "login"]
+
+
+# --- Synthetic data ---
+# Deterministic for a given seed and sizes: IDs are assigned explicitly, so re-running
+# with the same arguments produces the same database.
+
+def _insert(conn, sql, rows, chunk_size=GENERATE_CHUNK_SIZE):
+    cur = conn.cursor()
+    batch = []
+    count = 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= chunk_size:
+            cur.executemany(sql, batch)
+            conn.commit()
+            count += len(batch)
+            batch = []
+    if batch:
+        cur.executemany(sql, batch)
+        conn.commit()
+        count += len(batch)
+    cur.close()
+    return count
+
+
+def generate(conn, members=100000, trainers=1000, payments=5000000, classes=500000,
+             equipment=200, workouts=1000, seed=42, truncate=False, today=None):
+    rng = random.Random(seed)
+    today = today or datetime.date.today()
+    summary = {}
+    migrations.migrate(conn)
+    cur = conn.cursor()
+    if truncate:
+        cur.execute("SET FOREIGN_KEY_CHECKS = 0")
+        for table in TABLES:
+            cur.execute(f"TRUNCATE TABLE {table}")
+        cur.execute("SET FOREIGN_KEY_CHECKS = 1")
+    cur.close()
+
+    def timed(name, sql, rows):
+        started = time.perf_counter()
+        count = _insert(conn, sql, rows)
+        seconds = time.perf_counter() - started
+        summary[name] = {"rows": count, "seconds": round(seconds, 3),
+                         "rows_per_sec": round(count / seconds, 1) if seconds else None}
+
+    timed("membership_schemes", "INSERT INTO membership_schemes (scheme_id, scheme_name, duration, fee) VALUES (%s, %s, %s, %s)",
+          ((i, name, duration, fee) for i, (name, duration, fee) in enumerate(SCHEMES, start=1)))
+    timed("equipment", "INSERT INTO equipment (equipment_id, equipment_name, number_of_equipment) VALUES (%s, %s, %s)",
+          ((i, f"Equipment {i}", rng.randint(1, 40)) for i in range(1, equipment + 1)))
+    timed("workouts", "INSERT INTO workouts (workout_id, equipment_id, workout_name) VALUES (%s, %s, %s)",
+          ((i, rng.randint(1, equipment), f"Workout {i}") for i in range(1, workouts + 1)))
+    timed("trainer", "INSERT INTO trainer (trainer_id, trainer_name, gender, phone, email) VALUES (%s, %s, %s, %s, %s)",
+          ((i, f"Trainer {i}", rng.choice("MF"), f"8{i:09d}", f"trainer{i}@bench.gym") for i in range(1, trainers + 1)))
+    timed("salary", "INSERT INTO salary (salary_id, trainer_id, salary, date) VALUES (%s, %s, %s, %s)",
+          ((i, i, rng.randrange(20000, 80000, 500), today.replace(day=1)) for i in range(1, trainers + 1)))
+
+    def logins():
+        for i in range(1, trainers + 1):
+            yield (f"trainer{i}@bench.gym", "bench", "Trainer")
+        for i in range(1, members + 1):
+            yield (f"member{i}@bench.gym", "bench", "Member")
+        yield ("admin@bench.gym", "bench", "Admin")
+    timed("login", "INSERT INTO login (email, password, category) VALUES (%s, %s, %s)", logins())
+
+    def member_rows():
+        for i in range(1, members + 1):
+            height = round(rng.uniform(150, 195), 2)
+            weight = round(rng.uniform(45, 110), 2)
+            yield (i, f"Member {i}", rng.choice("MF"), f"9{i:09d}", f"member{i}@bench.gym", rng.randint(1, len(SCHEMES)),
+                   "Inactive", rng.randint(1, trainers), height, weight, round(weight * 10000 / (height * height), 2),
+                   rng.randint(16, 70))
+    timed("member", """INSERT INTO member (memberID, member_name, gender, phone, email, membership_id, membership_status,
+                                          trainer_id, height, weight, bmi, age)
+                       VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)""", member_rows())
+
+    # classes spread over the last two years and the next two months, an hour each between 06:00 and 21:00
+    first_class = today - datetime.timedelta(days=730)
+
+    def class_rows():
+        for i in range(1, classes + 1):
+            hour = rng.randint(6, 20)
+            yield (i, rng.randint(1, trainers), first_class + datetime.timedelta(days=rng.randint(0, 790)),
+                   rng.randint(1, workouts), datetime.time(hour), datetime.time(hour + 1), f"Room {rng.randint(1, 20)}")
+    timed("classes", """INSERT INTO classes (class_id, trainer_id, date, workout_id, start_time, end_time, room)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s)""", class_rows())
+
+    # payments over the last three years
+    first_payment = today - datetime.timedelta(days=3 * 365)
+    fees = [fee for _, _, fee in SCHEMES]
+    timed("payment", "INSERT INTO payment (payment_id, member_id, amount, payment_date, payment_method) VALUES (%s, %s, %s, %s, %s)",
+          ((i, rng.randint(1, members), rng.choice(fees), first_payment + datetime.timedelta(days=rng.randint(0, 3 * 365)),
+            rng.choice(PAYMENT_METHODS)) for i in range(1, payments + 1)))
+
+    # bring statuses in line with the generated payments
+    started = time.perf_counter()
+    summary["status_sweep"] = membership.sweep_statuses(conn)
+    summary["status_sweep"]["seconds"] = round(time.perf_counter() - started, 3)
+    # and fold the payments into the revenue rollups
+    summary["revenue_rollup"] = revenue.rebuild(conn)
+    return summary
+
+
+# --- Benchmarks ---
+# Each benchmark runs one query path of the app once and returns the number of rows it touched.
+# `ctx` holds the data sizes and a seeded random generator.
+BENCHMARKS = {}
+
+
+def bench(name, iterations=None):
+    def register(fn):
+        BENCHMARKS[name] = (fn, iterations)
+        return fn
+    return register
+
+
+def _member(ctx):
+    return ctx["rng"].randint(1, ctx["members"])
+
+
+def _trainer(ctx):
+    return ctx["rng"].randint(1, ctx["trainers"])
+
+
+@bench("member_login")
+def bench_member_login(conn, cur, ctx):
+    cur.execute("SELECT * FROM login WHERE email = %s and password = %s", (f"member{_member(ctx)}@bench.gym", "bench"))
+    return len(cur.fetchall())
+
+
+@bench("member_dashboard_load")
+def bench_member_dashboard(conn, cur, ctx):
+    dash = member_dashboard.load_dashboard(cur, f"member{_member(ctx)}@bench.gym")
+    return 1 + len(dash.payments) if dash else 0
+
+
+@bench("member_payment_history")
+def bench_payment_history(conn, cur, ctx):
+    cur.execute("SELECT amount, payment_date, payment_method FROM payment WHERE member_id = %s ORDER BY payment_date DESC",
+                (_member(ctx),))
+    return len(cur.fetchall())
+
+
+@bench("trainer_view_classes")
+def bench_trainer_classes(conn, cur, ctx):
+    start, end = scheduling.class_window("This month")
+    rows, _ = scheduling.trainer_classes_page(cur, _trainer(ctx), start, end, upcoming=False)
+    return len(rows)
+
+
+# second page of a trainer's past classes over the two generated years
+@bench("trainer_view_classes_next_page")
+def bench_trainer_classes_next(conn, cur, ctx):
+    trainer_id = _trainer(ctx)
+    end = datetime.date.today()
+    start = end - datetime.timedelta(days=730)
+    rows, next_cursor = scheduling.trainer_classes_page(cur, trainer_id, start, end, upcoming=False)
+    if next_cursor is None:
+        return len(rows)
+    rows, _ = scheduling.trainer_classes_page(cur, trainer_id, start, end, upcoming=False, after=next_cursor)
+    return len(rows)
+
+
+@bench("trainer_workout_list")
+def bench_workout_list(conn, cur, ctx):
+    cur.execute("SELECT workout_id, workout_name, equipment_id FROM workouts")
+    return len(cur.fetchall())
+
+
+# The workout picker: index built once per run, then a prefix search per keystroke
+@bench("trainer_workout_search")
+def bench_workout_search(conn, cur, ctx):
+    if "workout_index" not in ctx:
+        ctx["workout_index"] = search_index.NameIndex(lambda cur: search_index.load_names(cur, "workouts"))
+    query = f"workout {ctx['rng'].randint(1, 99)}"
+    return len(ctx["workout_index"].search(query, k=20, cur=cur))
+
+
+# Add Class; rolled back so repeated runs don't change the data
+@bench("class_scheduling")
+def bench_class_scheduling(conn, cur, ctx):
+    try:
+        cur.execute("INSERT INTO classes (trainer_id, date, workout_id) VALUES (%s, %s, %s)",
+                    (_trainer(ctx), datetime.date.today(), 1))
+        return cur.rowcount
+    finally:
+        conn.rollback()
+
+
+# A 12 week Mon/Wed/Fri series as Add Class writes it (one executemany); rolled back
+@bench("class_series_scheduling")
+def bench_class_series(conn, cur, ctx):
+    trainer_id = _trainer(ctx)
+    dates = scheduling.series_dates(datetime.date.today(), [0, 2, 4], 12)
+    try:
+        cur.execute("INSERT INTO class_series (trainer_id, workout_id, start_date, end_date, weekdays) VALUES (%s, %s, %s, %s, %s)",
+                    (trainer_id, 1, dates[0], dates[-1], "Mon,Wed,Fri"))
+        cur.executemany("INSERT INTO classes (trainer_id, date, workout_id, series_id) VALUES (%s, %s, %s, %s)",
+                        [(trainer_id, d, 1, cur.lastrowid) for d in dates])
+        return len(dates)
+    finally:
+        conn.rollback()
+
+
+# Conflict check of one class against a warm slot index (as on the Schedule Class form)
+@bench("class_conflict_check")
+def bench_class_conflict(conn, cur, ctx):
+    if "slot_index" not in ctx:
+        ctx["slot_index"] = class_slots.SlotIndex()
+    trainer_id = _trainer(ctx)
+    day = datetime.date.today() + datetime.timedelta(days=ctx["rng"].randint(0, 13))
+    hour = ctx["rng"].randint(6, 20)
+    equipment_id, demand, stock = class_slots.requirement(cur, trainer_id, 1)
+    return len(ctx["slot_index"].conflicts(cur, [(day, datetime.time(hour), datetime.time(hour + 1))],
+                                           trainer_id, "Room 1", equipment_id, demand, stock))
+
+
+# Bulk validation of a 12-week Mon/Wed/Fri series against a cold slot index
+@bench("class_series_validation")
+def bench_series_validation(conn, cur, ctx):
+    trainer_id = _trainer(ctx)
+    dates = scheduling.series_dates(datetime.date.today(), [0, 2, 4], 12)
+    equipment_id, demand, stock = class_slots.requirement(cur, trainer_id, 1)
+    return len(class_slots.SlotIndex().conflicts(cur, [(d, datetime.time(18), datetime.time(19)) for d in dates],
+                                                 trainer_id, "Room 1", equipment_id, demand, stock))
+
+
+@bench("member_upcoming_classes")
+def bench_member_upcoming(conn, cur, ctx):
+    member_id = _member(ctx)
+    cur.execute("SELECT trainer_id FROM member WHERE memberID = %s", (member_id,))
+    row = cur.fetchone()
+    if not row or not row[0]:
+        return 0
+    return len(scheduling.upcoming_classes(cur, member_id, row[0]))
+
+
+@bench("admin_view_members_first_page")
+def bench_admin_members_first(conn, cur, ctx):
+    rows, _ = gymdb.fetch_page(cur, "member", ["memberID", "member_name", "email", "membership_status"], "memberID", 50)
+    return len(rows)
+
+
+@bench("admin_view_members_deep_page")
+def bench_admin_members_deep(conn, cur, ctx):
+    after = (None, _member(ctx))
+    rows, _ = gymdb.fetch_page(cur, "member", ["memberID", "member_name", "email", "membership_status"], "memberID", 50,
+                               after=after)
+    return len(rows)
+
+
+@bench("admin_view_members_sorted_filtered")
+def bench_admin_members_sorted(conn, cur, ctx):
+    rows, _ = gymdb.fetch_page(cur, "member", ["memberID", "member_name", "email", "membership_status"], "memberID", 50,
+                               sort="member_name", where="membership_status = %s", params=("Active",))
+    return len(rows)
+
+
+@bench("admin_view_members_count")
+def bench_admin_members_count(conn, cur, ctx):
+    gymdb.count_rows(cur, "member")
+    return 1
+
+
+# Front desk lookup by partial name; index built once per run
+@bench("admin_member_search")
+def bench_member_search(conn, cur, ctx):
+    if "member_index" not in ctx:
+        ctx["member_index"] = member_search.MemberIndex(member_search.load_members)
+    return len(ctx["member_index"].search(f"member{_member(ctx)}", k=20, cur=cur))
+
+
+@bench("admin_view_trainers_first_page")
+def bench_admin_trainers(conn, cur, ctx):
+    rows, _ = gymdb.fetch_page(cur, "trainer", ["trainer_id", "trainer_name", "email"], "trainer_id", 50)
+    return len(rows)
+
+
+# Admin Equipment Usage page, uncached: two weeks of per-class demand against stock
+@bench("admin_equipment_usage")
+def bench_equipment_usage(conn, cur, ctx):
+    start = datetime.date.today()
+    demand = equipment_usage.load_demand(cur, start, start + datetime.timedelta(days=13))
+    return len(equipment_usage.compare(demand, equipment_usage.load_stock(cur)))
+
+
+# Admin Revenue page: two years of monthly rollups plus the pandas trend / breakdown
+@bench("admin_revenue_report")
+def bench_revenue_report(conn, cur, ctx):
+    end = datetime.date.today()
+    frame = revenue.load(cur, "monthly", end - datetime.timedelta(days=730), end)
+    if not frame.empty:
+        revenue.trend(frame, freq=revenue.FREQ["monthly"])
+        revenue.breakdown(frame, "scheme")
+    return len(frame)
+
+
+# Full expiry calendar rebuild: one load of every member's scheme and last payment, then NumPy
+@bench("expiry_calendar_build", iterations=3)
+def bench_expiry_build(conn, cur, ctx):
+    calendar = expiry.ExpiryCalendar(expiry.load_members)
+    calendar.rebuild(cur)
+    ctx["expiry_calendar"] = calendar
+    return len(calendar)
+
+
+# Admin Membership Expiry page against a built calendar: expiring in 30 days + expired but Active
+@bench("admin_membership_expiry")
+def bench_membership_expiry(conn, cur, ctx):
+    if "expiry_calendar" not in ctx:
+        ctx["expiry_calendar"] = expiry.ExpiryCalendar(expiry.load_members)
+    calendar = ctx["expiry_calendar"]
+    return len(calendar.expiring(30, cur=cur)) + len(calendar.overdue(cur=cur))
+
+
+# One renewal-reminder scan chunk (5000 memberIDs) queued into the outbox, rolled back
+@bench("reminder_scan_chunk")
+def bench_reminder_scan(conn, cur, ctx):
+    low = ctx["rng"].randint(0, max(0, ctx["members"] - reminders.SCAN_CHUNK_SIZE))
+    today = datetime.date.today()
+    try:
+        return reminders.queue_chunk(cur, low, low + reminders.SCAN_CHUNK_SIZE, today,
+                                      today + datetime.timedelta(days=reminders.REMINDER_DAYS))
+    finally:
+        conn.rollback()
+
+
+# Last month's payroll for every trainer; idempotent, so repeated runs just replace it
+@bench("payroll_run", iterations=3)
+def bench_payroll_run(conn, cur, ctx):
+    last_month = datetime.date.today().replace(day=1) - datetime.timedelta(days=1)
+    return payroll.run_payroll(conn, last_month)["trainers"]
+
+
+@bench("status_sweep", iterations=3)
+def bench_status_sweep(conn, cur, ctx):
+    return membership.sweep_statuses(conn)["members"]
+
+
+def _percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(p * len(sorted_values)))]
+
+
+def run(conn, iterations=200, warmup=5, only=None, seed=7):
+    cur = conn.cursor()
+    cur.execute("SELECT COUNT(*) FROM member")
+    members = cur.fetchone()[0]
+    cur.execute("SELECT COUNT(*) FROM trainer")
+    trainers = cur.fetchone()[0]
+    if not members or not trainers:
+        raise RuntimeError("no data to benchmark: run 'python benchmark.py generate' first")
+    ctx = {"members": members, "trainers": trainers, "rng": random.Random(seed)}
+
+    results = {}
+    for name, (fn, fixed_iterations) in BENCHMARKS.items():
+        if only and name not in only:
+            continue
+        n = fixed_iterations or iterations
+        for _ in range(warmup if not fixed_iterations else 0):
+            fn(conn, cur, ctx)
+        timings, rows = [], 0
+        started = time.perf_counter()
+        for _ in range(n):
+            t0 = time.perf_counter()
+            rows += fn(conn, cur, ctx)
+            timings.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - started
+        timings.sort()
+        results[name] = {
+            "iterations": n,
+            "p50_ms": round(_percentile(timings, 0.50) * 1000, 3),
+            "p95_ms": round(_percentile(timings, 0.95) * 1000, 3),
+            "p99_ms": round(_percentile(timings, 0.99) * 1000, 3),
+            "max_ms": round(timings[-1] * 1000, 3),
+            "rows": rows,
+            "rows_per_sec": round(rows / elapsed, 1) if elapsed else None,
+            "ops_per_sec": round(n / elapsed, 1) if elapsed else None,
+        }
+        print(f"{name:>36}: p50 {results[name]['p50_ms']:>9} ms  p95 {results[name]['p95_ms']:>9} ms  "
+              f"p99 {results[name]['p99_ms']:>9} ms  {results[name]['rows_per_sec']} rows/s")
+    cur.close()
+    return {"members": members, "trainers": trainers, "benchmarks": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic data and query benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+    gen = sub.add_parser("generate", help="fill the database with deterministic synthetic data")
+    gen.add_argument("--members", type=int, default=100000)
+    gen.add_argument("--trainers", type=int, default=1000)
+    gen.add_argument("--payments", type=int, default=5000000)
+    gen.add_argument("--classes", type=int, default=500000)
+    gen.add_argument("--equipment", type=int, default=200)
+    gen.add_argument("--workouts", type=int, default=1000)
+    gen.add_argument("--seed", type=int, default=42)
+    gen.add_argument("--truncate", action="store_true", help="empty every gym table first")
+    runner = sub.add_parser("run", help="benchmark the app's query paths")
+    runner.add_argument("--iterations", type=int, default=200)
+    runner.add_argument("--warmup", type=int, default=5)
+    runner.add_argument("--only", nargs="*", choices=sorted(BENCHMARKS), help="run only these benchmarks")
+    runner.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args()
+
+    conn = gymdb.get_connection()
+    try:
+        if args.command == "generate":
+            summary = generate(conn, args.members, args.trainers, args.payments, args.classes,
+                               args.equipment, args.workouts, args.seed, args.truncate)
+            print(json.dumps(summary, indent=2))
+        else:
+            results = run(conn, args.iterations, args.warmup, args.only)
+            results["database"] = gymdb.DB_NAME
+            results["finished_at"] = datetime.datetime.now().isoformat(timespec="seconds")
+            with open(args.output, "w") as f:
+                json.dump(results, f, indent=2)
+            print(f"results written to {args.output}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# bulk_ops.py
+# Multi-row admin actions. Each action is one set-based statement per table touched
+# (WHERE key IN (...)), all run in a single transaction, and reports rows affected and time taken.
+import time
+
+# table -> primary key, fields a bulk update may set, and dependent rows removed with it
+BULK_TABLES = {
+    "member": {
+        "key": "memberID",
+        "fields": ["membership_status", "membership_id", "trainer_id", "age"],
+        "dependents": [("class_enrollment", "member_id")],
+    },
+    "trainer": {
+        "key": "trainer_id",
+        "fields": ["trainer_name", "gender", "phone"],
+        "dependents": [("salary", "trainer_id")],
+    },
+    "equipment": {
+        "key": "equipment_id",
+        "fields": ["equipment_name", "number_of_equipment"],
+        "dependents": [],
+    },
+}
+
+MAX_BULK_ROWS = 5000  # keeps a single IN list (and the transaction) bounded
+
+
+def _placeholders(ids):
+    if not ids:
+        raise ValueError("no rows selected")
+    if len(ids) > MAX_BULK_ROWS:
+        raise ValueError(f"at most {MAX_BULK_ROWS} rows per bulk action")
+    return ", ".join(["%s"] * len(ids))
+
+
+# Run [(label, sql, params)] in one transaction.
+# Returns {"rows": {label: rows affected}, "seconds": elapsed}.
+def run(conn, statements):
+    started = time.perf_counter()
+    rows = {}
+    cur = conn.cursor()
+    try:
+        for label, sql, params in statements:
+            cur.execute(sql, params)
+            rows[label] = rows.get(label, 0) + cur.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+    return {"rows": rows, "seconds": round(time.perf_counter() - started, 3)}
+
+
+# Set the same `changes` ({field: value}) on every row of `table` in `ids`
+def update_rows(conn, table, ids, changes):
+    spec = BULK_TABLES[table]
+    unknown = set(changes) - set(spec["fields"])
+    if not changes or unknown:
+        raise ValueError(f"fields that can be bulk updated on {table}: {', '.join(spec['fields'])}")
+    assignments = ", ".join(f"{field} = %s" for field in changes)
+    sql = f"UPDATE {table} SET {assignments} WHERE {spec['key']} IN ({_placeholders(ids)})"
+    return run(conn, [(table, sql, tuple(changes.values()) + tuple(ids))])
+
+
+# Delete the rows of `table` in `ids` together with their dependent rows
+def delete_rows(conn, table, ids):
+    spec = BULK_TABLES[table]
+    marks = _placeholders(ids)
+    statements = [(dep_table, f"DELETE FROM {dep_table} WHERE {dep_key} IN ({marks})", tuple(ids))
+                  for dep_table, dep_key in spec["dependents"]]
+    statements.append((table, f"DELETE FROM {table} WHERE {spec['key']} IN ({marks})", tuple(ids)))
+    return run(conn, statements)
+
+
+# Salary change for many trainers: set a new amount, or raise / cut by `percent` and/or `amount`
+def adjust_salaries(conn, trainer_ids, percent=0.0, amount=0, set_to=None):
+    marks = _placeholders(trainer_ids)
+    if set_to is not None:
+        sql, params = f"UPDATE salary SET salary = %s WHERE trainer_id IN ({marks})", (set_to,)
+    else:
+        sql = f"UPDATE salary SET salary = GREATEST(0, ROUND(salary * (1 + %s / 100)) + %s) WHERE trainer_id IN ({marks})"
+        params = (percent, amount)
+    return run(conn, [("salary", sql, params + tuple(trainer_ids))])
@@ -0,0 +1,208 @@
+# class_slots.py
+# Time-slot conflicts for classes (migrations/0009_class_time_slots.sql). A new class may not
+# overlap another class of the same trainer or in the same room, and the classes running at the
+# same time may not need more units of an equipment than are in stock.
+# Classes are indexed per resource and day as intervals sorted by start time, so checking a slot
+# is a binary search plus the overlapping intervals, not a scan of every class. A day's index is
+# loaded from the database the first time it is needed and again after it is invalidated or
+# expires. Untimed classes (no start / end time) never clash with a trainer or room, but hold their
+# equipment for the whole day. equipment_usage.py reports demand with the same overlap rules.
+import bisect
+import datetime
+import os
+
+import numpy as np
+import pandas as pd
+
+import refcache
+
+SLOT_INDEX_TTL = float(os.environ.get("GYM_SLOT_INDEX_TTL", "300"))  # seconds
+WHOLE_DAY = (0, 24 * 60)
+
+CLASS_DEMAND_COLUMNS = ["class_id", "date", "start_time", "end_time", "trainer_id", "room", "equipment_id", "demand"]
+
+
+# Minutes since midnight of a datetime.time, or of a timedelta (how mysql-connector returns TIME);
+# None for a missing time (None, or NaT once loaded into a DataFrame)
+def minutes(value):
+    if value is None or value is pd.NaT:
+        return None
+    if isinstance(value, datetime.timedelta):
+        return int(value.total_seconds()) // 60
+    return value.hour * 60 + value.minute
+
+
+def format_minutes(value):
+    return f"{value // 60:02d}:{value % 60:02d}"
+
+
+# "09:00-10:00" for a class's start and end time, "" for an untimed class
+def time_range(start_time, end_time):
+    begin, finish = minutes(start_time), minutes(end_time)
+    return f"{format_minutes(begin)}-{format_minutes(finish)}" if begin is not None and finish is not None else ""
+
+
+CLASS_DEMAND_SQL = """
+    SELECT C.class_id, C.date, C.start_time, C.end_time, C.trainer_id, C.room, W.equipment_id,
+           COALESCE(A.active, 0) - COALESCE(D.dropped, 0) AS demand
+    FROM classes C
+    LEFT JOIN workouts W ON W.workout_id = C.workout_id
+    LEFT JOIN (
+        SELECT trainer_id, COUNT(*) AS active FROM member
+        WHERE membership_status = 'Active'
+        GROUP BY trainer_id
+    ) A ON A.trainer_id = C.trainer_id
+    LEFT JOIN (
+        SELECT CE.class_id, COUNT(*) AS dropped
+        FROM class_enrollment CE
+        JOIN classes C2 ON C2.class_id = CE.class_id
+        JOIN member M ON M.memberID = CE.member_id
+                     AND M.trainer_id = C2.trainer_id AND M.membership_status = 'Active'
+        WHERE CE.status = 'Dropped' AND C2.date >= %s AND C2.date <= %s
+        GROUP BY CE.class_id
+    ) D ON D.class_id = C.class_id
+    WHERE C.date >= %s AND C.date <= %s
+"""
+
+
+# One row per class with start <= date <= end: its slot, trainer, room, equipment and demand
+def load_class_demand(cur, start, end):
+    cur.execute(CLASS_DEMAND_SQL, (start, end, start, end))
+    frame = pd.DataFrame(cur.fetchall(), columns=CLASS_DEMAND_COLUMNS)
+    if not frame.empty:
+        frame["date"] = pd.to_datetime(frame["date"]).dt.date
+        frame["demand"] = frame["demand"].astype(np.int64).clip(lower=0)
+    return frame
+
+
+# Highest total weight running at any one moment among [(start, end, weight)] half-open intervals.
+# Ends sort before starts at the same minute, so back-to-back classes don't count as concurrent.
+def peak(intervals):
+    events = sorted([(start, weight) for start, _, weight in intervals] + [(end, -weight) for _, end, weight in intervals])
+    running = highest = 0
+    for _, delta in events:
+        running += delta
+        highest = max(highest, running)
+    return highest
+
+
+class IntervalList:
+    # Half-open intervals [start, end) sorted by start. reach[i] is the latest end among the
+    # first i + 1 intervals, so it never decreases and bounds the intervals a query has to look at.
+    __slots__ = ("starts", "ends", "items", "reach")
+
+    def __init__(self):
+        self.starts, self.ends, self.items, self.reach = [], [], [], []
+
+    def __len__(self):
+        return len(self.starts)
+
+    def add(self, start, end, item):
+        i = bisect.bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        self.items.insert(i, item)
+        self.reach.insert(i, 0)
+        previous = self.reach[i - 1] if i else 0
+        for j in range(i, len(self.reach)):
+            previous = self.reach[j] = max(previous, self.ends[j])
+
+    # [(start, end, item)] of the intervals overlapping [start, end)
+    def overlapping(self, start, end):
+        hi = bisect.bisect_left(self.starts, end)             # only these start before `end`
+        lo = bisect.bisect_right(self.reach, start, 0, hi)    # none before this one ends after `start`
+        return [(self.starts[i], self.ends[i], self.items[i]) for i in range(lo, hi) if self.ends[i] > start]
+
+
+class SlotIndex:
+    def __init__(self, ttl=SLOT_INDEX_TTL):
+        self._days = refcache.DayCache(self._build, dict, ttl)  # date -> {(resource, key): IntervalList}
+
+    # {(resource, key): IntervalList} per day for start..end, from one query
+    @staticmethod
+    def _build(cur, start, end):
+        days = {}
+        for row in load_class_demand(cur, start, end).itertuples(index=False):
+            begin, finish = minutes(row.start_time), minutes(row.end_time)
+            timed = begin is not None and finish is not None
+            day = days.setdefault(row.date, {})
+            item = (row.class_id, int(row.demand))
+            if timed:
+                day.setdefault(("trainer", row.trainer_id), IntervalList()).add(begin, finish, item)
+                if row.room:
+                    day.setdefault(("room", row.room), IntervalList()).add(begin, finish, item)
+            if not pd.isna(row.equipment_id):
+                span = (begin, finish) if timed else WHOLE_DAY
+                day.setdefault(("equipment", int(row.equipment_id)), IntervalList()).add(*span, item)
+        return days
+
+    # Conflicts of scheduling a class for `trainer_id` in `room` needing `demand` units of
+    # `equipment_id` (of which `stock` exist) in each of `slots`, [(date, start_time, end_time)].
+    # One slot is a single class, several are the occurrences of a series (validated together).
+    # Returns [{"date", "start", "end", "resource", "class_ids", "detail"}], empty if all are free.
+    def conflicts(self, cur, slots, trainer_id, room=None, equipment_id=None, demand=0, stock=None):
+        wanted = []
+        for day, start_time, end_time in slots:
+            begin, finish = minutes(start_time), minutes(end_time)
+            if begin is None or finish is None:
+                continue
+            if finish <= begin:
+                raise ValueError("a class must end after it starts")
+            wanted.append((day, begin, finish))
+        if not wanted:
+            return []
+        indexes = self._days.get(cur, [day for day, _, _ in wanted])
+
+        found = []
+        for day, begin, finish in wanted:
+            index = indexes[day]
+
+            def hits(resource, key):
+                return index[(resource, key)].overlapping(begin, finish) if (resource, key) in index else []
+
+            def report(resource, overlapping, detail):
+                found.append({"date": day, "start": format_minutes(begin), "end": format_minutes(finish),
+                              "resource": resource, "class_ids": [item[0] for _, _, item in overlapping],
+                              "detail": detail})
+
+            overlapping = hits("trainer", trainer_id)
+            if overlapping:
+                report("trainer", overlapping, "trainer already teaching then")
+            overlapping = hits("room", room) if room else []
+            if overlapping:
+                report("room", overlapping, f"room {room} already booked")
+            if equipment_id is not None and stock is not None:
+                overlapping = hits("equipment", equipment_id)
+                # the busiest moment of the new slot, counting only the part of each class inside it
+                needed = demand + peak([(max(start, begin), min(end, finish), item[1]) for start, end, item in overlapping])
+                if needed > stock:
+                    report("equipment", overlapping, f"needs {needed} units of equipment {equipment_id}, {stock} in stock")
+        return found
+
+    # Forget the given days (after classes on them changed)
+    def invalidate(self, dates):
+        self._days.invalidate(dates)
+
+    # Forget everything (member statuses, workouts or equipment changed)
+    def clear(self):
+        self._days.clear()
+
+
+REQUIREMENT_SQL = """
+    SELECT W.equipment_id, E.number_of_equipment,
+           (SELECT COUNT(*) FROM member WHERE trainer_id = %s AND membership_status = 'Active')
+    FROM workouts W
+    LEFT JOIN equipment E ON E.equipment_id = W.equipment_id
+    WHERE W.workout_id = %s
+"""
+
+
+# What a class of `workout_id` taught by `trainer_id` needs: (equipment_id, demand, stock).
+# Demand is the trainer's Active members, all enrolled until they drop the class.
+def requirement(cur, trainer_id, workout_id):
+    cur.execute(REQUIREMENT_SQL, (trainer_id, workout_id))
+    row = cur.fetchone()
+    if not row:
+        return None, 0, None
+    equipment_id, stock, demand = row
+    return equipment_id, int(demand or 0), (int(stock) if stock is not None else None)
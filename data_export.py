@@ -0,0 +1,206 @@
+# data_export.py
+# Streaming export of members, payments and classes to CSV, JSONL or Parquet.
+# Rows are pulled from an unbuffered (server-side) cursor a chunk at a time and written
+# straight out, so memory stays flat however large the table is.
+#
+#   python data_export.py payment --format csv --from 2024-01-01 --to 2024-12-31 -o payments.csv
+#   python data_export.py member_payments --format parquet -o payments.parquet
+import argparse
+import csv
+import datetime
+import io
+import json
+import os
+import sys
+
+import gymdb
+
+EXPORT_CHUNK_SIZE = 5000
+FORMATS = ("csv", "jsonl", "parquet")
+# the Admin page's download button holds the whole file in server memory; larger exports go through the CLI
+DOWNLOAD_LIMIT_MB = int(os.environ.get("GYM_EXPORT_DOWNLOAD_MB", "200"))
+
+# name -> query and the column the optional date range applies to
+DATASETS = {
+    "member": {
+        "sql": """SELECT memberID, member_name, gender, phone, email, membership_id, membership_status, trainer_id,
+                         height, weight, bmi, payment_id, age
+                  FROM member""",
+        "date_column": None,
+        "order_by": "memberID",
+    },
+    "payment": {
+        "sql": "SELECT payment_id, member_id, amount, payment_date, payment_method FROM payment",
+        "date_column": "payment_date",
+        "order_by": "payment_id",
+    },
+    "classes": {
+        "sql": "SELECT class_id, trainer_id, date, workout_id, series_id, start_time, end_time, room FROM classes",
+        "date_column": "date",
+        "order_by": "class_id",
+    },
+    "member_payments": {
+        "sql": """SELECT P.payment_id, P.payment_date, P.amount, P.payment_method,
+                         M.memberID AS member_id, M.member_name, M.email, S.scheme_name
+                  FROM payment P
+                  JOIN member M ON M.memberID = P.member_id
+                  LEFT JOIN membership_schemes S ON S.scheme_id = M.membership_id""",
+        "date_column": "P.payment_date",
+        "order_by": "P.payment_id",
+    },
+    "trainer_classes": {
+        "sql": """SELECT C.class_id, C.date, T.trainer_id, T.trainer_name, W.workout_id, W.workout_name, E.equipment_name
+                  FROM classes C
+                  JOIN trainer T ON T.trainer_id = C.trainer_id
+                  LEFT JOIN workouts W ON W.workout_id = C.workout_id
+                  LEFT JOIN equipment E ON E.equipment_id = W.equipment_id""",
+        "date_column": "C.date",
+        "order_by": "C.class_id",
+    },
+}
+
+
+def build_query(dataset, start=None, end=None):
+    spec = DATASETS[dataset]
+    clauses, params = [], []
+    if spec["date_column"]:
+        if start:
+            clauses.append(f"{spec['date_column']} >= %s")
+            params.append(start)
+        if end:
+            clauses.append(f"{spec['date_column']} <= %s")
+            params.append(end)
+    elif start or end:
+        raise ValueError(f"{dataset} has no date column to filter on")
+    sql = spec["sql"]
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += f" ORDER BY {spec['order_by']}"
+    return sql, params
+
+
+# Yields (column names, list of rows) chunk by chunk from an unbuffered cursor.
+# The connection is busy until the generator is exhausted, so give it a dedicated one.
+def iter_chunks(conn, dataset, start=None, end=None, chunk_size=EXPORT_CHUNK_SIZE):
+    sql, params = build_query(dataset, start, end)
+    cur = conn.cursor(buffered=False)
+    try:
+        cur.execute(sql, params)
+        columns = [d[0] for d in cur.description]
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield columns, rows
+    finally:
+        cur.close()
+
+
+def _jsonable(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return str(value)  # TIME columns arrive as timedelta: "9:30:00"
+
+
+def _write_csv(chunks, out):
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=True)
+    writer = csv.writer(text)
+    header_written = False
+    rows = 0
+    for columns, chunk in chunks:
+        if not header_written:
+            writer.writerow(columns)
+            header_written = True
+        writer.writerows(chunk)
+        rows += len(chunk)
+    text.flush()
+    text.detach()
+    return rows
+
+
+def _write_jsonl(chunks, out):
+    rows = 0
+    for columns, chunk in chunks:
+        lines = [json.dumps(dict(zip(columns, row)), default=_jsonable) for row in chunk]
+        out.write(("\n".join(lines) + "\n").encode("utf-8"))
+        rows += len(chunk)
+    return rows
+
+
+def _parquet_field(pa, field):
+    if pa.types.is_null(field.type):
+        return pa.field(field.name, pa.string())
+    if pa.types.is_decimal(field.type):
+        return pa.field(field.name, pa.decimal128(38, field.type.scale))
+    return field
+
+
+def _write_parquet(chunks, out):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+
+    writer = None
+    schema = None
+    rows = 0
+    try:
+        for columns, chunk in chunks:
+            data = {c: [row[i] for row in chunk] for i, c in enumerate(columns)}
+            if schema is None:
+                # columns that are entirely NULL in the first chunk are written as strings; DECIMAL
+                # columns get the widest precision at their scale, since the first chunk's widest
+                # value says nothing about later ones
+                schema = pa.schema([_parquet_field(pa, f) for f in pa.Table.from_pydict(data).schema])
+                writer = pq.ParquetWriter(out, schema)
+            for field in schema:
+                if pa.types.is_string(field.type):
+                    data[field.name] = [None if v is None else str(v) for v in data[field.name]]
+            writer.write_table(pa.Table.from_pydict(data, schema=schema))
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+# Stream `dataset` into the binary file object `out`. Returns the number of rows written.
+def export(conn, dataset, fmt, out, start=None, end=None, chunk_size=EXPORT_CHUNK_SIZE):
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown format {fmt!r}")
+    chunks = iter_chunks(conn, dataset, start, end, chunk_size)
+    if fmt == "csv":
+        return _write_csv(chunks, out)
+    if fmt == "jsonl":
+        return _write_jsonl(chunks, out)
+    return _write_parquet(chunks, out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export gym data")
+    parser.add_argument("dataset", choices=sorted(DATASETS))
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--from", dest="start", type=datetime.date.fromisoformat, help="first date (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end", type=datetime.date.fromisoformat, help="last date (YYYY-MM-DD)")
+    parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+    parser.add_argument("-o", "--output", help="output file (default: stdout, not for parquet)")
+    args = parser.parse_args()
+
+    if args.format == "parquet" and not args.output:
+        parser.error("parquet export needs --output")
+
+    conn = gymdb.get_connection()
+    try:
+        if args.output:
+            with open(args.output, "wb") as out:
+                rows = export(conn, args.dataset, args.format, out, args.start, args.end, args.chunk_size)
+        else:
+            rows = export(conn, args.dataset, args.format, sys.stdout.buffer, args.start, args.end, args.chunk_size)
+    finally:
+        conn.close()
+    print(f"{rows} row(s) exported", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# equipment_usage.py
+# Equipment demand vs. capacity. A class needs one unit of its workout's equipment per enrolled
+# member: the trainer's Active members minus those who dropped that class (see scheduling.py).
+# Per-class demand comes from one grouped query (class_slots.load_class_demand). A day's demand
+# for an equipment is its peak: the most units needed by classes running at the same moment, with
+# the overlap rules of the scheduling check in class_slots.py (an untimed class holds its
+# equipment all day). Comparing that with stock is done on arrays. Demand is cached per day and a
+# day is recomputed only after a change to it (a class scheduled, edited or cancelled, or an
+# enrollment change).
+import datetime
+import os
+
+import numpy as np
+import pandas as pd
+
+import class_slots
+import refcache
+
+DEMAND_CACHE_TTL = float(os.environ.get("GYM_DEMAND_CACHE_TTL", "300"))  # seconds
+
+DEMAND_COLUMNS = ["date", "equipment_id", "classes", "demand"]  # demand: peak concurrent units
+
+
+# Per day and equipment for start <= date <= end: number of classes and peak concurrent demand
+def load_demand(cur, start, end):
+    per_class = class_slots.load_class_demand(cur, start, end)
+    per_class = per_class[per_class["equipment_id"].notna()]
+    if per_class.empty:
+        return pd.DataFrame(columns=DEMAND_COLUMNS)
+    rows = []
+    for (day, equipment_id), group in per_class.groupby(["date", "equipment_id"]):
+        spans = []
+        for start_time, end_time, demand in zip(group["start_time"], group["end_time"], group["demand"]):
+            begin, finish = class_slots.minutes(start_time), class_slots.minutes(end_time)
+            begin, finish = (begin, finish) if begin is not None and finish is not None else class_slots.WHOLE_DAY
+            spans.append((begin, finish, int(demand)))
+        rows.append((day, int(equipment_id), len(group), class_slots.peak(spans)))
+    return pd.DataFrame(rows, columns=DEMAND_COLUMNS)
+
+
+# Compare demand with stock: adds equipment_name, stock, utilization (demand / stock) and
+# over_subscribed (demand > stock); most over-subscribed first
+def compare(demand, stock_rows):
+    stock = pd.DataFrame(stock_rows, columns=["equipment_id", "equipment_name", "stock"])
+    frame = demand.merge(stock, on="equipment_id", how="left")
+    units = frame["stock"].fillna(0).to_numpy(dtype=float)
+    needed = frame["demand"].to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        frame["utilization"] = np.where(units > 0, needed / units, np.nan).round(2)  # NaN: none in stock
+    frame["over_subscribed"] = needed > units
+    frame["shortfall"] = np.maximum(needed - units, 0).astype(int)
+    return frame.sort_values(["over_subscribed", "shortfall", "utilization", "date"], ascending=[False, False, False, True])
+
+
+def load_stock(cur):
+    cur.execute("SELECT equipment_id, equipment_name, number_of_equipment FROM equipment")
+    return cur.fetchall()
+
+
+class DemandCache:
+    def __init__(self, ttl=DEMAND_CACHE_TTL):
+        self._days = refcache.DayCache(self._build, lambda: pd.DataFrame(columns=DEMAND_COLUMNS), ttl)
+
+    @staticmethod
+    def _build(cur, start, end):
+        fresh = load_demand(cur, start, end)
+        return dict(tuple(fresh.groupby("date"))) if not fresh.empty else {}
+
+    # Demand for start..end; only days missing from the cache are queried (as one range)
+    def get(self, cur, start, end):
+        days = [start + datetime.timedelta(days=i) for i in range((end - start).days + 1)]
+        cached = self._days.get(cur, days)
+        frames = [cached[d] for d in days if not cached[d].empty]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=DEMAND_COLUMNS)
+
+    # Forget the given days (after classes on them changed)
+    def invalidate(self, dates):
+        self._days.invalidate(dates)
+
+    # Forget everything (member statuses or trainers changed)
+    def clear(self):
+        self._days.clear()
@@ -0,0 +1,171 @@
+# expiry.py
+# Membership expiry calendar. A membership runs for its scheme's duration (months) from the
+# member's latest payment; a payment on the 31st of a month expires on the last day of a shorter
+# target month. Member, scheme and last-payment data are loaded once in one query, every
+# member's expiry is computed with NumPy datetime64 arithmetic, and the expiry-sorted arrays
+# answer "expiring in the next N days" and "expired but still Active" with binary searches.
+#
+#   python expiry.py expiring --days 30     # members whose membership ends in the next 30 days
+#   python expiry.py overdue                # expired but still marked Active
+import argparse
+import datetime
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import gymdb
+
+EXPIRY_CACHE_TTL = float(os.environ.get("GYM_EXPIRY_CACHE_TTL", "600"))  # seconds between full rebuilds
+
+EXPIRY_COLUMNS = ["memberID", "member_name", "email", "membership_status", "scheme_name", "last_payment", "expiry",
+                  "days_remaining"]
+
+_NAT = np.datetime64("NaT", "D")
+
+
+# Expiry per member: `last_paid` (datetime64[D], NaT for never paid) plus `duration` months
+# (float, NaN without a scheme), clamped to the end of the target month. NaT where either is missing.
+def expiry_dates(last_paid, duration):
+    last_paid = np.asarray(last_paid, dtype="datetime64[D]")
+    duration = np.asarray(duration, dtype=float)
+    known = ~np.isnat(last_paid) & ~np.isnan(duration)
+    months = np.where(known, duration, 0).astype(np.int64)
+    start_month = last_paid.astype("datetime64[M]")
+    target_month = start_month + months
+    day_offset = last_paid - start_month.astype("datetime64[D]")
+    month_end = (target_month + 1).astype("datetime64[D]") - 1
+    expiry = np.minimum(target_month.astype("datetime64[D]") + day_offset, month_end)
+    return np.where(known, expiry, _NAT)
+
+
+# (expiry date, days remaining) of one membership; (None, None) without a payment or scheme
+def membership_expiry(last_paid, duration, today=None):
+    if last_paid is None or duration is None:
+        return None, None
+    expiry = expiry_dates([last_paid], [duration])[0]
+    return expiry.item(), int((expiry - np.datetime64(today or datetime.date.today(), "D")).astype(np.int64))
+
+
+MEMBERS_SQL = """
+    SELECT M.memberID, M.member_name, M.email, M.membership_status, S.scheme_name, S.duration, P.last_paid
+    FROM member M
+    LEFT JOIN membership_schemes S ON S.scheme_id = M.membership_id
+    LEFT JOIN (
+        SELECT member_id, MAX(payment_date) AS last_paid FROM payment GROUP BY member_id
+    ) P ON P.member_id = M.memberID
+    ORDER BY M.memberID
+"""
+
+
+# [(memberID, member_name, email, membership_status, scheme_name, duration, last payment date)]
+def load_members(cur):
+    cur.execute(MEMBERS_SQL)
+    return cur.fetchall()
+
+
+class ExpiryCalendar:
+    def __init__(self, loader, ttl=EXPIRY_CACHE_TTL):
+        self._loader = loader  # (cur) -> load_members rows; cur is None when the caller has none open
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._built_at = None
+        self._arrays = None
+
+    def __len__(self):
+        return len(self._arrays["ids"]) if self._arrays else 0
+
+    # Full rebuild: one load (on the caller's cursor if given), then vectorised expiry and an
+    # expiry-ordered permutation
+    def rebuild(self, cur=None):
+        rows = self._loader(cur)
+        ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+        last_paid = np.array([r[6] if r[6] is not None else "NaT" for r in rows], dtype="datetime64[D]")
+        duration = np.array([r[5] if r[5] is not None else np.nan for r in rows], dtype=float)
+        expiry = expiry_dates(last_paid, duration)
+        arrays = {
+            "ids": ids,
+            "expiry": expiry,
+            "active": np.fromiter((r[3] == "Active" for r in rows), dtype=bool, count=len(rows)),
+            # the columns a query returns, sliced by position
+            "members": pd.DataFrame({
+                "memberID": ids,
+                "member_name": [r[1] for r in rows],
+                "email": [r[2] for r in rows],
+                "membership_status": [r[3] for r in rows],
+                "scheme_name": [r[4] for r in rows],
+                "last_payment": last_paid,
+                "expiry": expiry,
+            }),
+        }
+        # members with an expiry, ordered by it (NaT sorts last and is cut off)
+        order = np.argsort(expiry, kind="stable")
+        arrays["by_expiry"] = order[:np.count_nonzero(~np.isnat(expiry))]
+        arrays["sorted_expiry"] = expiry[arrays["by_expiry"]]
+        with self._lock:
+            self._arrays = arrays
+            self._built_at = time.monotonic()
+
+    def _ensure_fresh(self, cur=None):
+        if self._built_at is None or time.monotonic() - self._built_at > self.ttl:
+            self.rebuild(cur)
+
+    # Drop everything; the next query rebuilds (after payments or a status sweep)
+    def invalidate(self):
+        with self._lock:
+            self._built_at = None
+
+    # EXPIRY_COLUMNS frame of the members at `positions`
+    @staticmethod
+    def _frame(arrays, positions, today):
+        frame = arrays["members"].iloc[positions].reset_index(drop=True)
+        frame["days_remaining"] = (arrays["expiry"][positions] - np.datetime64(today, "D")).astype(np.int64)
+        return frame
+
+    # Members whose membership ends between today and today + `days`, soonest first (EXPIRY_COLUMNS)
+    def expiring(self, days=30, today=None, cur=None):
+        self._ensure_fresh(cur)
+        today = today or datetime.date.today()
+        arrays = self._arrays
+        sorted_expiry = arrays["sorted_expiry"]
+        lo = np.searchsorted(sorted_expiry, np.datetime64(today, "D"), side="left")
+        hi = np.searchsorted(sorted_expiry, np.datetime64(today + datetime.timedelta(days=days), "D"), side="right")
+        return self._frame(arrays, arrays["by_expiry"][lo:hi], today)
+
+    # Members whose membership has ended but who are still marked Active, longest overdue first
+    def overdue(self, today=None, cur=None):
+        self._ensure_fresh(cur)
+        today = today or datetime.date.today()
+        arrays = self._arrays
+        hi = np.searchsorted(arrays["sorted_expiry"], np.datetime64(today, "D"), side="left")
+        positions = arrays["by_expiry"][:hi]
+        return self._frame(arrays, positions[arrays["active"][positions]], today)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Membership expiry calendar")
+    sub = parser.add_subparsers(dest="command", required=True)
+    exp = sub.add_parser("expiring", help="memberships ending in the next N days")
+    exp.add_argument("--days", type=int, default=30)
+    sub.add_parser("overdue", help="expired memberships still marked Active")
+    args = parser.parse_args()
+
+    conn = gymdb.get_connection()
+    try:
+        calendar = ExpiryCalendar(load_members)
+        started = time.perf_counter()
+        calendar.rebuild(conn.cursor())
+        built = time.perf_counter() - started
+        started = time.perf_counter()
+        rows = calendar.expiring(args.days) if args.command == "expiring" else calendar.overdue()
+        queried = time.perf_counter() - started
+    finally:
+        conn.close()
+    print(rows.to_string(index=False))
+    print(f"{len(rows)} member(s)  built in {built:.3f}s  query {queried * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
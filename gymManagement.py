@@ -1,51 +1,406 @@
 # gym_app_final.py
-import os
 import streamlit as st
-import mysql.connector
 import datetime
+import io
+import tempfile
+import time
+
+import bulk_ops
+import class_slots
+import data_export
+import equipment_usage
+import expiry
+import gymdb
+import member_dashboard
+import member_import
+import member_search
+import membership
+import migrations
+import payments
+import payroll
+import querylog
+import refcache
+import reminders
+import revenue
+import scheduling
+import search_index
+
+# Database connection helper: every panel borrows from one pool per server process.
+# Host/user/password/database and the pool size come from the GYM_DB_* env vars (see gymdb.py).
+@st.cache_resource
+def get_pool():
+    # every statement is recorded in the query log shown on the Admin "Performance" page
+    return gymdb.ConnectionPool(query_log=querylog.QueryLog())
 
-# --- Configuration: use env var for DB password ---
-DB_HOST = os.environ.get("GYM_DB_HOST", "localhost")
-DB_USER = os.environ.get("GYM_DB_USER", "root")
-DB_PASSWORD = os.environ.get("GYM_DB_PASSWORD", "<your-db-password-here>")  # set env var in prod
-DB_NAME = os.environ.get("GYM_DB_NAME", "gym")
-
-# Database connection helper
 def get_connection():
-    return mysql.connector.connect(
-        host="localhost",
-        user="root",
-        password="Welcome@123",
-        database="gym"
-    )
-
-# Utility to compute months difference between two dates
-def months_between(d1, d2):
-    # returns number of months from d1 to d2 (d2 >= d1 assumed)
-    return (d2.year - d1.year) * 12 + (d2.month - d1.month)
-
-# Update membership status for a given member_id based on last payment date (>15 months -> Inactive)
-def update_member_status(member_id, cur, conn):
-    cur.execute("SELECT payment_date FROM payment WHERE member_id = %s ORDER BY payment_date DESC LIMIT 1", (member_id,))
-    row = cur.fetchone()
-    today = datetime.date.today()
-    if row and row[0] is not None:
-        last_payment_date = row[0]
-        # if last payment older than 15 months -> inactive
-        if months_between(last_payment_date, today) > 15:
-            cur.execute("UPDATE member SET membership_status = %s WHERE memberID = %s", ("Inactive", member_id))
-            conn.commit()
-            return "Inactive", last_payment_date
-        else:
-            # ensure status is Active if within range
-            cur.execute("UPDATE member SET membership_status = %s WHERE memberID = %s", ("Active", member_id))
-            conn.commit()
-            return "Active", last_payment_date
+    return get_pool().connection()
+
+# Bring the schema up to date once per server process (see migrations/)
+@st.cache_resource
+def ensure_schema():
+    conn = get_connection()
+    try:
+        migrations.migrate(conn, log=None)
+    finally:
+        conn.close()
+    return True
+
+# Schemes, workouts and equipment are served from an in-process cache; writes to them invalidate it
+@st.cache_resource
+def get_ref_cache():
+    return refcache.RefCache()
+
+# Equipment demand per day (see equipment_usage.py); class changes invalidate just their days
+@st.cache_resource
+def get_demand_cache():
+    return equipment_usage.DemandCache()
+
+# Trainer / room / equipment bookings per day (see class_slots.py); invalidated like the demand cache
+@st.cache_resource
+def get_slot_index():
+    return class_slots.SlotIndex()
+
+# Loader for the in-memory indexes below: a (re)build reads with the cursor of the page that
+# triggered it, so it doesn't take a second pooled connection while the page holds one. Only callers
+# without a cursor borrow one for the rebuild: the Schedule Class fragment's workout picker, which
+# also reruns on its own, when no page connection is open.
+def pooled_loader(load):
+    def loader(cur):
+        if cur is not None:
+            return load(cur)
+        conn = get_connection()
+        try:
+            own = conn.cursor()
+            try:
+                return load(own)
+            finally:
+                own.close()
+        finally:
+            conn.close()
+    return loader
+
+# Typeahead indexes over workout / equipment names, built on first use; writes update them in place
+@st.cache_resource
+def get_name_index(table):
+    return search_index.NameIndex(pooled_loader(lambda cur: search_index.load_names(cur, table)))
+
+# Member lookup by partial name / phone / email (see member_search.py); member writes keep it in sync
+@st.cache_resource
+def get_member_index():
+    return member_search.MemberIndex(pooled_loader(member_search.load_members))
+
+# Membership expiry per member (see expiry.py), rebuilt after payments and status sweeps
+@st.cache_resource
+def get_expiry_calendar():
+    return expiry.ExpiryCalendar(pooled_loader(expiry.load_members))
+
+# Members' status, scheme or trainer changed (status sweep, Update Member, Bulk Actions):
+# dashboards, class demand, slot bookings and expiries all derive from them
+MEMBERSHIP_FIELDS = {"membership_status", "membership_id", "trainer_id"}
+
+def memberships_changed():
+    member_dashboard.invalidate_all()
+    get_demand_cache().clear()
+    get_slot_index().clear()
+    get_expiry_calendar().invalidate()
+
+# Membership status is recomputed for everyone by a background sweep (see membership.py),
+# so the member pages only read the stored status.
+@st.cache_resource
+def get_status_sweeper():
+    return membership.StatusSweeper(get_pool(), on_change=memberships_changed).start()
+
+# Renewal reminders are queued and sent by a background worker (see reminders.py), never by a page run
+@st.cache_resource
+def get_reminder_worker():
+    return reminders.ReminderWorker(get_pool()).start()
+
+# st.tabs executes the body of every tab on each rerun. This tab bar returns the selected
+# label instead, so a panel only loads and renders the section the user is looking at.
+def lazy_tabs(labels, key):
+    return st.radio("Section", labels, key=key, horizontal=True, label_visibility="collapsed")
+
+# Admin "View ..." pages. Each table is browsed one page at a time with keyset pagination;
+# sorting, search and filters are pushed down to SQL and a page is rendered as one dataframe.
+ADMIN_VIEWS = {
+    "View Members": {
+        "title": "View Members",
+        "table": "member",
+        "key": "memberID",
+        "columns": {
+            "memberID": "ID", "member_name": "Name", "gender": "Gender", "phone": "Phone", "email": "Email",
+            "membership_id": "Membership Scheme ID", "membership_status": "Membership Status",
+            "trainer_id": "Trainer ID", "height": "Height", "weight": "Weight", "bmi": "BMI",
+            "payment_id": "Payment ID (latest)", "age": "Age",
+        },
+        "sortable": ["memberID", "member_name", "membership_status", "trainer_id", "age"],
+        "search": ["member_name", "phone", "email"],
+        "filters": {"membership_status": ["Active", "Inactive"]},
+    },
+    "View Trainers": {
+        "title": "View Trainers",
+        "table": "trainer",
+        "key": "trainer_id",
+        "columns": {
+            "trainer_id": "ID", "trainer_name": "Name", "gender": "Gender", "phone": "Phone", "email": "Email",
+        },
+        "sortable": ["trainer_id", "trainer_name"],
+        "search": ["trainer_name", "phone", "email"],
+        "filters": {},
+    },
+    "View Equipment": {
+        "title": "View Equipment",
+        "table": "equipment",
+        "key": "equipment_id",
+        "columns": {"equipment_id": "Equipment ID", "equipment_name": "Equipment Name", "number_of_equipment": "Quantity"},
+        "sortable": ["equipment_id", "equipment_name", "number_of_equipment"],
+        "search": ["equipment_name"],
+        "filters": {},
+    },
+    "View Schemes": {
+        "title": "View Membership Schemes",
+        "table": "membership_schemes",
+        "key": "scheme_id",
+        "columns": {"scheme_id": "ID", "scheme_name": "Name", "duration": "Duration (months)", "fee": "Fee (₹)"},
+        "sortable": ["scheme_id", "scheme_name", "duration", "fee"],
+        "search": ["scheme_name"],
+        "filters": {},
+    },
+}
+
+# Total row counts change slowly, so they are cached for a minute per filter combination.
+# Counted on the page's cursor (`_cur` is not part of the cache key).
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_row_count(_cur, table, where, params):
+    return gymdb.count_rows(_cur, table, where, params)
+
+# With `selectable`, rows can be ticked in the grid and the keys of the selected rows are returned.
+def show_table_page(view, cur, selectable=False):
+    spec = ADMIN_VIEWS[view]
+    labels = spec["columns"]
+
+    col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
+    search = col1.text_input("Search", key=f"{view}_search", placeholder=", ".join(labels[c] for c in spec["search"]))
+    sort = col2.selectbox("Sort by", spec["sortable"], format_func=lambda c: labels[c], key=f"{view}_sort")
+    descending = col3.checkbox("Descending", key=f"{view}_desc")
+    page_size = col4.selectbox("Rows", [25, 50, 100, 250], key=f"{view}_page_size")
+
+    clauses, params = [], []
+    if search:
+        clauses.append(" OR ".join(f"{c} LIKE %s" for c in spec["search"]))
+        params.extend([f"%{search}%"] * len(spec["search"]))
+    chosen = {}
+    for column, options in spec["filters"].items():
+        value = st.selectbox(labels[column], ["All"] + options, key=f"{view}_{column}")
+        chosen[column] = value
+        if value != "All":
+            clauses.append(f"{column} = %s")
+            params.append(value)
+    where = " AND ".join(f"({c})" for c in clauses)
+
+    # cursor for the start of every page visited so far; restart whenever the query changes
+    signature = (search, sort, descending, page_size, tuple(chosen.items()))
+    if st.session_state.get(f"{view}_signature") != signature:
+        st.session_state[f"{view}_signature"] = signature
+        st.session_state[f"{view}_pages"] = [None]
+    pages = st.session_state[f"{view}_pages"]
+
+    def load_page():
+        return gymdb.fetch_page(cur, spec["table"], list(labels), spec["key"], page_size,
+                                after=pages[-1], sort=sort, descending=descending,
+                                where=where, params=params)
+
+    if spec["table"] in refcache.REFERENCE_TABLES:
+        ref_cache = get_ref_cache()
+        rows, next_cursor = ref_cache.get(spec["table"], ("page", signature, pages[-1]), load_page)
+        total = ref_cache.get(spec["table"], ("count", where, tuple(params)),
+                              lambda: gymdb.count_rows(cur, spec["table"], where, params))
+    else:
+        rows, next_cursor = load_page()
+        total = cached_row_count(cur, spec["table"], where, tuple(params))
+    st.caption(f"Page {len(pages)} of {max(1, -(-total // page_size))} · {total} record(s)")
+
+    selected = []
+    if rows and selectable:
+        event = st.dataframe([dict(zip(labels.values(), row)) for row in rows], use_container_width=True,
+                             hide_index=True, on_select="rerun", selection_mode="multi-row",
+                             key=f"{view}_grid_{len(pages)}_{hash(signature)}")
+        key_index = list(labels).index(spec["key"])
+        selected = [rows[i][key_index] for i in event.selection.rows]
+    elif rows:
+        st.dataframe([dict(zip(labels.values(), row)) for row in rows], use_container_width=True, hide_index=True)
+    else:
+        st.info("No records found.")
+
+    prev_col, next_col = st.columns(2)
+    prev_col.button("Previous", key=f"{view}_prev", disabled=len(pages) == 1, on_click=pages.pop)
+    next_col.button("Next", key=f"{view}_next", disabled=next_cursor is None, on_click=pages.append, args=(next_cursor,))
+    return selected
+
+# Search-as-you-type picker over workouts or equipment; returns the chosen id (or None).
+# Pass the page's `cur` when it has one open, for the index to (re)build with.
+def search_picker(label, table, key, default=None, cur=None):
+    index = get_name_index(table)
+    query = st.text_input(f"Search {label}", key=f"{key}_query", placeholder="Start typing a name")
+    matches = index.search(query, k=20, cur=cur)
+    if default is not None and not query and default not in dict(matches):
+        matches = [(default, index.name(default, cur=cur))] + matches[:19]
+    if not matches:
+        st.info(f"No {label.lower()} matches \"{query}\".")
+        return None
+    names = dict(matches)
+    return st.selectbox(label, list(names), format_func=lambda i: f"{i} - {names[i]}", key=f"{key}_pick")
+
+# Front desk member lookup; returns the chosen memberID (or None)
+def member_picker(key, cur=None):
+    query = st.text_input("Find member", key=f"{key}_query", placeholder="Name, phone or email")
+    if not query:
+        return None
+    matches = get_member_index().search(query, k=20, cur=cur)
+    if not matches:
+        st.info(f"No member matches \"{query}\".")
+        return None
+    members = {m[0]: m for m in matches}
+    return st.selectbox("Member", list(members), key=f"{key}_pick",
+                        format_func=lambda i: f"{i} - {members[i][1]} · {members[i][2]} · {members[i][3]}")
+
+# Trainer "View Classes": one keyset-paginated table for upcoming or past classes in a date window
+def show_trainer_classes(cur, trainer_id):
+    col1, col2, col3 = st.columns([2, 2, 1])
+    window = col1.selectbox("Window", ["This week", "This month", "Custom range"], key="classes_window")
+    when = col2.radio("Show", ["Upcoming", "Past"], horizontal=True, key="classes_when")
+    page_size = col3.selectbox("Rows", [25, 50, 100], key="classes_page_size")
+    if window == "Custom range":
+        today = datetime.date.today()
+        dates = st.date_input("Dates", (today - datetime.timedelta(days=30), today + datetime.timedelta(days=30)),
+                              key="classes_range")
+        if len(dates) != 2:
+            st.info("Pick the last date of the range.")
+            return
+        start, end = dates
     else:
-        # no payment found -> mark inactive
-        cur.execute("UPDATE member SET membership_status = %s WHERE memberID = %s", ("Inactive", member_id))
-        conn.commit()
-        return "Inactive", None
+        start, end = scheduling.class_window(window)
+
+    signature = (window, start, end, when, page_size)
+    if st.session_state.get("classes_signature") != signature:
+        st.session_state["classes_signature"] = signature
+        st.session_state["classes_pages"] = [None]
+    pages = st.session_state["classes_pages"]
+
+    rows, next_cursor = scheduling.trainer_classes_page(cur, trainer_id, start, end, when == "Upcoming",
+                                                        page_size, after=pages[-1])
+    st.caption(f"{start} to {end} · page {len(pages)}")
+    if rows:
+        st.dataframe([{"Class ID": r[0], "Date": r[1], "Time": class_slots.time_range(r[4], r[5]), "Room": r[6],
+                       "Workout": r[2], "Series": r[3]} for r in rows],
+                     use_container_width=True, hide_index=True)
+    else:
+        st.info(f"No {when.lower()} classes in this window.")
+
+    prev_col, next_col = st.columns(2)
+    prev_col.button("Previous", key="classes_prev", disabled=len(pages) == 1, on_click=pages.pop)
+    next_col.button("Next", key="classes_next", disabled=next_cursor is None, on_click=pages.append, args=(next_cursor,))
+
+# --- Write forms ---
+# Fragments: submitting one of these re-executes only the form itself (one connection,
+# just its own statements) instead of rerunning the whole script and every panel query.
+@st.fragment
+def make_payment_form(member_id, scheme_fee):
+    # one key per payment: a double click or rerun replays the same key and is rejected.
+    # The key only changes when the member explicitly starts another payment.
+    if "payment_key" not in st.session_state:
+        st.session_state["payment_key"] = payments.new_idempotency_key()
+    if st.session_state.get("payment_done"):
+        st.success("Payment submitted and your membership is now Active!")
+        if st.button("Make another payment"):
+            st.session_state["payment_key"] = payments.new_idempotency_key()
+            st.session_state["payment_done"] = None
+            st.rerun(scope="fragment")
+        return
+
+    with st.form("payment_form"):
+        # force exact amount equal to scheme fee
+        amount = st.number_input("Amount", min_value=int(scheme_fee), max_value=int(scheme_fee), value=int(scheme_fee), step=0)
+        method = st.selectbox("Payment Method", ["Cash", "Card", "UPI"])
+        submitted = st.form_submit_button("Submit Payment")
+
+    if submitted:
+        # a submit reruns only this fragment: count it as its own run
+        querylog.begin_rerun("Member", "Make Payment")
+        conn = get_connection()
+        try:
+            payment_id, created = payments.record_payment(conn, member_id, amount, method, st.session_state["payment_key"])
+            # the other tabs pick up the new status/history from a fresh dashboard on their next run
+            member_dashboard.invalidate(member_id)
+            if created:
+                get_expiry_calendar().invalidate()
+                st.session_state["payment_done"] = payment_id
+                st.success("Payment submitted and your membership is now Active!")
+            else:
+                st.info(f"This payment was already recorded (payment ID {payment_id}).")
+
+        except Exception as e:
+            st.error(f"Error submitting payment: {e}")
+        finally:
+            conn.close()
+
+# Schedule Class (only assign to active members)
+@st.fragment
+def schedule_class_form(trainer_id):
+    workout_id = search_picker("Workout", "workouts", key="schedule_workout")
+    with st.form("schedule_class_form"):
+        class_date = st.date_input("Class Date")
+        col1, col2, col3 = st.columns(3)
+        start_time = col1.time_input("Start", datetime.time(9, 0), step=900)
+        end_time = col2.time_input("End", datetime.time(10, 0), step=900)
+        room = col3.text_input("Room").strip()
+        repeat_on = st.multiselect("Repeat on (leave empty for a one-off class)", scheduling.WEEKDAYS)
+        weeks = st.number_input("For how many weeks", min_value=1, max_value=scheduling.MAX_SERIES_WEEKS, value=12)
+        override = st.checkbox("Schedule even if it conflicts with other classes")
+        submitted = st.form_submit_button("Add Class")
+
+    if submitted and workout_id is None:
+        st.error("Pick a workout first.")
+    elif submitted and end_time <= start_time:
+        st.error("The class must end after it starts.")
+    elif submitted:
+        querylog.begin_rerun("Trainer", "Schedule Class")
+        conn = get_connection()
+        cur = conn.cursor()
+        try:
+            weekdays = [scheduling.WEEKDAYS.index(d) for d in repeat_on]
+            dates = scheduling.series_dates(class_date, weekdays, int(weeks)) if repeat_on else [class_date]
+            # every occurrence is checked in one pass against the slot index (one load for the whole range)
+            equipment_id, demand, stock = class_slots.requirement(cur, trainer_id, workout_id)
+            clashes = get_slot_index().conflicts(cur, [(d, start_time, end_time) for d in dates],
+                                                 trainer_id, room, equipment_id, demand, stock)
+            if clashes and not override:
+                st.error(f"{len({c['date'] for c in clashes})} of {len(dates)} class(es) conflict, nothing was scheduled.")
+                st.dataframe(
+                    [{"Date": c["date"], "Time": f"{c['start']}-{c['end']}", "Conflict": c["resource"],
+                      "Details": c["detail"], "With classes": ", ".join(str(i) for i in c["class_ids"])}
+                     for c in clashes],
+                    hide_index=True, use_container_width=True
+                )
+                return
+
+            # Active members of this trainer are enrolled by default, so this is a single insert
+            if repeat_on:
+                _, scheduled = scheduling.schedule_series(conn, trainer_id, workout_id, class_date, weekdays, int(weeks),
+                                                          start_time, end_time, room)
+            else:
+                scheduling.schedule_class(conn, trainer_id, class_date, workout_id, start_time, end_time, room)
+                scheduled = 1
+            get_demand_cache().invalidate(dates)
+            get_slot_index().invalidate(dates)
+            member_dashboard.invalidate_all()
+
+            st.success(f"{scheduled} class(es) scheduled for your active members!")
+        except Exception as e:
+            st.error(f"Error scheduling class: {e}")
+        finally:
+            cur.close()
+            conn.close()
 
 # --- Streamlit UI config ---
 st.set_page_config(page_title="Gym Management System", layout="wide")
@@ -75,8 +430,13 @@ st.markdown("""
 
 st.title("🏋 Gym Management System")
 
+ensure_schema()
+get_status_sweeper()
+get_reminder_worker()
+
 # Sidebar: role selection
 role = st.sidebar.selectbox("Login as", ["Member", "Trainer", "Admin"])
+querylog.begin_rerun(role)
 
 # -------------------------
 # MEMBER PANEL
@@ -84,231 +444,167 @@ role = st.sidebar.selectbox("Login as", ["Member", "Trainer", "Admin"])
 if role == "Member":
     st.header("Member Panel")
 
-    # Establish connection at start
+    # Establish connection at start; st.stop() and st.rerun() raise, so it goes back to the pool in finally
     conn = get_connection()
     cur = conn.cursor()
+    try:
+        # Login workflow
+        if st.session_state.get("member_logged_in"):
+            email = st.session_state["member_email"]
+            # one round trip on first load, none afterwards until the member pays or an admin edits them
+            member = member_dashboard.get_dashboard(st.session_state, cur, email)
+            if not member:
+                st.error("Member record not found. Please contact admin.")
+                st.session_state.clear()
+                st.stop()
+            member_id = member.member_id
 
-    # Login workflow
-    if st.session_state.get("member_logged_in"):
-        email = st.session_state["member_email"]
-        cur.execute("SELECT * FROM member WHERE email = %s", (email,))
-        member = cur.fetchone()
-        if not member:
-            st.error("Member record not found. Please contact admin.")
-            st.session_state.clear()
-            st.stop()
-        member_id = member[0]
-
-        # Update member status based on payments (auto-inactivate if needed)
-        membership_status, last_payment_date = update_member_status(member_id, cur, conn)
-        # Refresh member tuple (so member[6] status will be current)
-        cur.execute("SELECT * FROM member WHERE memberID = %s", (member_id,))
-        member = cur.fetchone()
+        else:
+            # Login form
+            with st.form("member_form"):
+                email = st.text_input("Enter your email ID")
+                password = st.text_input("Enter your password", type="password")
+                submitted = st.form_submit_button("Login")
 
-    else:
-        # Login form
-        with st.form("member_form"):
-            email = st.text_input("Enter your email ID")
-            password = st.text_input("Enter your password", type="password")
-            submitted = st.form_submit_button("Login")
-
-        if submitted:
-            conn = get_connection()
-            cur = conn.cursor()
-            cur.execute("SELECT * FROM login WHERE email = %s and password = %s", (email, password))
-            memberLogin = cur.fetchone()
-            if memberLogin:
-                st.session_state["member_logged_in"] = True
-                st.session_state["member_email"] = email
-                st.rerun()
-            else:
-                st.error("Member not found!")
+            if submitted:
+                cur.execute("SELECT * FROM login WHERE email = %s and password = %s", (email, password))
+                memberLogin = cur.fetchone()
+                if memberLogin:
+                    st.session_state["member_logged_in"] = True
+                    st.session_state["member_email"] = email
+                    st.rerun()
+                else:
+                    st.error("Member not found!")
 
-    # After login UI
-    if st.session_state.get("member_logged_in"):
-        st.success(f"Welcome, {member[1]}!")
+        # After login UI
+        if st.session_state.get("member_logged_in"):
+            st.success(f"Welcome, {member.name}!")
 
-        if st.button("Logout"):
-            st.session_state.clear()
-            st.rerun()
+            if st.button("Logout"):
+                st.session_state.clear()
+                st.rerun()
 
-        tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs([
-            "Personal Details", "Trainer Details", "Membership Scheme", "Class Details",
-            "Workout Plan", "Payment History", "Make Payment"
-        ])
+            tab = lazy_tabs([
+                "Personal Details", "Trainer Details", "Membership Scheme", "Class Details",
+                "Workout Plan", "Payment History", "Make Payment"
+            ], key="member_tab")
+            querylog.set_context(tab=tab)
+
+            # --- Personal Details ---
+            if tab == "Personal Details":
+                st.subheader("Your Details")
+                st.write(f"**ID:** {member.member_id}")
+                st.write(f"**Name:** {member.name}")
+                st.write(f"**Gender:** {member.gender}")
+                st.write(f"**Phone:** {member.phone}")
+                st.write(f"**Email:** {member.email}")
+                st.write(f"**Age:** {member.age}")
+                st.write(f"**Height:** {member.height} cm")
+                st.write(f"**Weight:** {member.weight} kg")
+                st.write(f"**BMI:** {member.bmi}")
+                st.write(f"**Membership Status:** {member.status}")
+
+            # --- Trainer Details ---
+            if tab == "Trainer Details":
+                st.subheader("Your Trainer")
+                trainer = member.trainer
+                if trainer:
+                    st.write(f"**Name:** {trainer.name}")
+                    st.write(f"**Gender:** {trainer.gender}")
+                    st.write(f"**Phone:** {trainer.phone}")
+                    st.write(f"**Email:** {trainer.email}")
+                else:
+                    st.info("No trainer assigned.")
 
-        # --- Personal Details ---
-        with tab1:
-            st.subheader("Your Details")
-            st.write(f"**ID:** {member[0]}")
-            st.write(f"**Name:** {member[1]}")
-            st.write(f"**Gender:** {member[2]}")
-            st.write(f"**Phone:** {member[3]}")
-            st.write(f"**Email:** {member[4]}")
-            # safe indexing: ensure indices exist in your schema
-            try:
-                st.write(f"**Age:** {member[12]}")
-            except Exception:
-                pass
-            try:
-                st.write(f"**Height:** {member[8]} cm")
-                st.write(f"**Weight:** {member[9]} kg")
-                st.write(f"**BMI:** {member[10]}")
-            except Exception:
-                pass
-            st.write(f"**Membership Status:** {member[6]}")
-
-        # --- Trainer Details ---
-        with tab2:
-            st.subheader("Your Trainer")
-            cur.execute("SELECT trainer_name, gender, phone, email FROM trainer WHERE trainer_id = %s", (member[7],))
-            trainer = cur.fetchone()
-            if trainer:
-                st.write(f"**Name:** {trainer[0]}")
-                st.write(f"**Gender:** {trainer[1]}")
-                st.write(f"**Phone:** {trainer[2]}")
-                st.write(f"**Email:** {trainer[3]}")
-            else:
-                st.info("No trainer assigned.")
-
-        # --- Membership Scheme ---
-        with tab3:
-            st.subheader("Your Membership Scheme")
-            if member[5]:
-                cur.execute("SELECT scheme_name, duration, fee FROM membership_schemes WHERE scheme_id = %s", (member[5],))
-                scheme = cur.fetchone()
+            # --- Membership Scheme ---
+            if tab == "Membership Scheme":
+                st.subheader("Your Membership Scheme")
+                scheme = member.scheme
                 if scheme:
-                    st.write(f"**Scheme Name:** {scheme[0]}")
-                    st.write(f"**Duration:** {scheme[1]} month(s)")
-                    st.write(f"**Fee:** ₹{scheme[2]}")
+                    st.write(f"**Scheme Name:** {scheme.name}")
+                    st.write(f"**Duration:** {scheme.duration} month(s)")
+                    st.write(f"**Fee:** ₹{scheme.fee}")
+                    # from the dashboard already loaded: latest payment + scheme duration
+                    last_paid = member.payments[0].date if member.payments else None
+                    expires, days_left = expiry.membership_expiry(last_paid, scheme.duration)
+                    if expires is None:
+                        st.info("No payment yet, so your membership has no expiry date.")
+                    elif days_left < 0:
+                        st.warning(f"**Expired on:** {expires} ({-days_left} day(s) ago). Make a payment to renew.")
+                    else:
+                        st.write(f"**Expires on:** {expires} ({days_left} day(s) remaining)")
                 else:
                     st.info("No membership scheme assigned.")
-            else:
-                st.info("No membership scheme assigned.")
 
-        # --- Class Details (blocked if inactive) ---
-        with tab4:
-            st.subheader("Upcoming Class")
-            if member[6] != "Active":
-                st.warning("Your membership is inactive. Please make a payment to view classes.")
-            else:
-                if member[13]:
-                    cur.execute("""
-                        SELECT C.date, W.workout_name FROM classes C
-                        JOIN workouts W ON C.workout_id = W.workout_id
-                        WHERE C.class_id = %s
-                    """, (member[13],))
-                else:
-                    # get next upcoming class (future) from trainer, prefer upcoming
-                    cur.execute("""
-                        SELECT C.date, W.workout_name FROM classes C
-                        JOIN workouts W ON C.workout_id = W.workout_id
-                        WHERE C.trainer_id = %s AND C.date >= CURDATE()
-                        ORDER BY C.date ASC LIMIT 1
-                    """, (member[7],))
-
-                cls = cur.fetchone()
-                if cls:
-                    st.write(f"**Date:** {cls[0]}")
-                    st.write(f"**Workout:** {cls[1]}")
-                else:
+            # --- Class Details (blocked if inactive) ---
+            if tab == "Class Details":
+                st.subheader("Upcoming Classes")
+                if not member.is_active:
+                    st.warning("Your membership is inactive. Please make a payment to view classes.")
+                elif not member.trainer_id:
                     st.info("No class scheduled yet.")
-
-        # --- Workout Plan (blocked if inactive) ---
-        with tab5:
-            st.subheader("Your Workout Plan")
-            if member[6] != "Active":
-                st.warning("Your membership is inactive. Please make a payment to view workout plans.")
-            else:
-                if member[13]:  # class_id exists
-                    cur.execute("""
-                        SELECT W.workout_name, E.equipment_name
-                        FROM workouts W
-                        JOIN equipment E ON W.equipment_id = E.equipment_id
-                        WHERE W.workout_id = (
-                            SELECT workout_id FROM classes WHERE class_id = %s
-                        )
-                    """, (member[13],))
                 else:
-                    # Get next upcoming workout from trainer's class
-                    cur.execute("""
-                        SELECT W.workout_name, E.equipment_name
-                        FROM classes C
-                        JOIN workouts W ON C.workout_id = W.workout_id
-                        JOIN equipment E ON W.equipment_id = E.equipment_id
-                        WHERE C.trainer_id = %s AND C.date >= CURDATE()
-                        ORDER BY C.date ASC LIMIT 1
-                    """, (member[7],))
-
-                workouts = cur.fetchall()
-                if workouts:
-                    for w in workouts:
-                        st.write(f"**Workout:** {w[0]} | **Equipment:** {w[1]}")
+                    # kept on the cached dashboard, so it is reloaded whenever the dashboard is invalidated
+                    if member.upcoming is None:
+                        member.upcoming = scheduling.upcoming_classes(cur, member.member_id, member.trainer_id)
+                    if not member.upcoming:
+                        st.info("No class scheduled yet.")
+                    else:
+                        st.dataframe(
+                            [{"Class ID": c[0], "Date": c[1], "Time": class_slots.time_range(c[5], c[6]), "Room": c[7],
+                              "Workout": c[2], "Equipment": c[3], "Status": c[4]}
+                             for c in member.upcoming],
+                            hide_index=True, use_container_width=True
+                        )
+                        with st.form("class_enrollment_form"):
+                            class_id = st.selectbox("Class", [c[0] for c in member.upcoming],
+                                                    format_func=lambda i: next(f"{c[1]} {class_slots.time_range(c[5], c[6])} - {c[2]}"
+                                                                       for c in member.upcoming if c[0] == i))
+                            action = st.radio("Attendance", ["Skip", "Rejoin"], horizontal=True)
+                            submitted = st.form_submit_button("Update")
+                        if submitted:
+                            try:
+                                scheduling.set_enrollment(conn, class_id, member.member_id,
+                                                          "Dropped" if action == "Skip" else "Enrolled")
+                                member_dashboard.invalidate(member.member_id)
+                                class_dates = [c[1] for c in member.upcoming if c[0] == class_id]
+                                get_demand_cache().invalidate(class_dates)
+                                get_slot_index().invalidate(class_dates)
+                                st.rerun()
+                            except Exception as e:
+                                st.error(f"Error updating class: {e}")
+
+            # --- Workout Plan (blocked if inactive) ---
+            if tab == "Workout Plan":
+                st.subheader("Your Workout Plan")
+                if not member.is_active:
+                    st.warning("Your membership is inactive. Please make a payment to view workout plans.")
+                elif member.workout_name:
+                    st.write(f"**Workout:** {member.workout_name} | **Equipment:** {member.equipment_name}")
                 else:
                     st.info("No workout plan available.")
 
-        # --- Payment History ---
-        with tab6:
-            st.subheader("Your Payment History")
-            cur.execute("SELECT amount, payment_date, payment_method FROM payment WHERE member_id = %s ORDER BY payment_date DESC", (member_id,))
-            payments = cur.fetchall()
-            if payments:
-                for p in payments:
-                    st.write(f"**Amount:** ₹{p[0]} | **Date:** {p[1]} | **Method:** {p[2]}")
-            else:
-                st.info("No payment records found.")
-
-        # --- Make Payment (must equal scheme fee) ---
-        with tab7:
-            st.subheader("Make a Payment")
-            # fetch scheme fee
-            scheme_fee = None
-            if member[5]:
-                cur.execute("SELECT fee FROM membership_schemes WHERE scheme_id = %s", (member[5],))
-                fee_row = cur.fetchone()
-                if fee_row:
-                    scheme_fee = fee_row[0]
-
-            if not scheme_fee:
-                st.info("No membership scheme assigned. Contact admin.")
-            else:
-                # force exact amount equal to scheme fee
-                amount = st.number_input("Amount", min_value=int(scheme_fee), max_value=int(scheme_fee), value=int(scheme_fee), step=0)
-                method = st.selectbox("Payment Method", ["Cash", "Card", "UPI"])
-                if st.button("Submit Payment"):
-                    try:
-                        today = datetime.date.today()
-
-                        # 1. Insert payment
-                        cur.execute(
-                            "INSERT INTO payment (member_id, amount, payment_date, payment_method) VALUES (%s, %s, %s, %s)",
-                            (member_id, amount, today, method)
-                        )
-                        conn.commit()
-
-                        # 2. Optionally get last insert id, store if needed
-                        cur.execute("SELECT LAST_INSERT_ID()")
-                        payment_id = cur.fetchone()[0]
-
-                        # 3. Update member: set payment_id, last_payment_date, status=Active
-                        cur.execute("UPDATE member SET payment_id = %s, last_payment_date = %s, membership_status = %s WHERE memberID = %s",
-                                    (payment_id, today, "Active", member_id))
-                        conn.commit()
-
-                        st.success("Payment submitted and your membership is now Active!")
-                        # refresh member info
-                        cur.execute("SELECT * FROM member WHERE memberID = %s", (member_id,))
-                        member = cur.fetchone()
+            # --- Payment History ---
+            if tab == "Payment History":
+                st.subheader("Your Payment History")
+                if member.payments:
+                    for p in member.payments:
+                        st.write(f"**Amount:** ₹{p.amount} | **Date:** {p.date} | **Method:** {p.method}")
+                else:
+                    st.info("No payment records found.")
 
-                    except Exception as e:
-                        st.error(f"Error submitting payment: {e}")
+            # --- Make Payment (must equal scheme fee) ---
+            if tab == "Make Payment":
+                st.subheader("Make a Payment")
+                scheme_fee = member.scheme.fee if member.scheme else None
 
-    # close cursor/conn for member panel
-    try:
+                if not scheme_fee:
+                    st.info("No membership scheme assigned. Contact admin.")
+                else:
+                    make_payment_form(member_id, scheme_fee)
+    finally:
         cur.close()
         conn.close()
-    except Exception:
-        pass
 
 # -------------------------
 # TRAINER PANEL
@@ -318,140 +614,147 @@ elif role == "Trainer":
 
     conn = get_connection()
     cur = conn.cursor()
+    try:
+        if st.session_state.get("trainer_logged_in"):
+            email = st.session_state["trainer_email"]
+            cur.execute("SELECT * from trainer where email=%s", (email,))
+            trainer = cur.fetchone()
+            if not trainer:
+                st.error("Trainer record not found.")
+                st.session_state.clear()
+                st.stop()
+            trainer_id = trainer[0]
+        else:
+            with st.form("trainer_form"):
+                email = st.text_input("Enter your email ID")
+                password = st.text_input("Enter your password", type="password")
+                submitted = st.form_submit_button("Login")
 
-    if st.session_state.get("trainer_logged_in"):
-        email = st.session_state["trainer_email"]
-        cur.execute("SELECT * from trainer where email=%s", (email,))
-        trainer = cur.fetchone()
-        if not trainer:
-            st.error("Trainer record not found.")
-            st.session_state.clear()
-            st.stop()
-        trainer_id = trainer[0]
-    else:
-        with st.form("trainer_form"):
-            email = st.text_input("Enter your email ID")
-            password = st.text_input("Enter your password", type="password")
-            submitted = st.form_submit_button("Login")
-
-        if submitted:
-            cur.execute("SELECT * FROM login WHERE email = %s and password = %s", (email, password))
-            trainerLogin = cur.fetchone()
-            if trainerLogin:
-                st.session_state["trainer_logged_in"] = True
-                st.session_state["trainer_email"] = email
-                st.rerun()
-            else:
-                st.error("Trainer not found!")
-
-    if st.session_state.get("trainer_logged_in"):
-        st.success(f"Welcome, {trainer[1]}!")
-        if st.button("Logout"):
-            st.session_state.clear()
-            st.rerun()
-
-        tab1, tab2, tab3, tab4, tab5 = st.tabs([
-            "Trainer Details", "Schedule Class", "View Classes", "Add Workout", "Update Workout"
-        ])
-
-        # Trainer Details
-        with tab1:
-            st.subheader("Your Details")
-            st.write(f"**ID:** {trainer_id}")
-            st.write(f"**Name:** {trainer[1]}")
-            st.write(f"**Phone:** {trainer[3]}")
-            st.write(f"**Gender:** {'M' if trainer[2] == 'M' else 'F' if trainer[2] == 'F' else trainer[2]}")
-            st.write(f"**Email:** {trainer[4]}")
-
-        # Schedule Class (only assign to active members)
-        with tab2:
-            st.subheader("Schedule a New Class")
-            class_date = st.date_input("Class Date")
-            workout_id = st.number_input("Workout ID", min_value=1, step=1)
-
-            if st.button("Add Class"):
-                try:
-                    # Insert new class
-                    cur.execute("INSERT INTO classes (trainer_id, date, workout_id) VALUES (%s, %s, %s)",
-                                (trainer_id, class_date, workout_id))
-                    conn.commit()
-
-                    # Get latest inserted class_id
-                    cur.execute("SELECT LAST_INSERT_ID()")
-                    latest_class_id = cur.fetchone()[0]
-
-                    # Update only ACTIVE members under this trainer with the new class_id
-                    cur.execute("UPDATE member SET class_id = %s WHERE trainer_id = %s AND membership_status = %s",
-                                (latest_class_id, trainer_id, "Active"))
-                    conn.commit()
+            if submitted:
+                cur.execute("SELECT * FROM login WHERE email = %s and password = %s", (email, password))
+                trainerLogin = cur.fetchone()
+                if trainerLogin:
+                    st.session_state["trainer_logged_in"] = True
+                    st.session_state["trainer_email"] = email
+                    st.rerun()
+                else:
+                    st.error("Trainer not found!")
 
-                    st.success("Class scheduled and active members updated successfully!")
-                except Exception as e:
-                    st.error(f"Error scheduling class: {e}")
+        if st.session_state.get("trainer_logged_in"):
+            st.success(f"Welcome, {trainer[1]}!")
+            if st.button("Logout"):
+                st.session_state.clear()
+                st.rerun()
 
-        # View scheduled classes
-        with tab3:
-            st.subheader("Your Scheduled Classes")
-            try:
-                cur.execute("""
-                    SELECT class_id, date, workout_name
-                    FROM classes C JOIN workouts W ON C.workout_id = W.workout_id
-                    WHERE C.trainer_id = %s
-                    ORDER BY C.date DESC
-                """, (trainer_id,))
-                classes = cur.fetchall()
-                if classes:
-                    for cls in classes:
-                        st.markdown(f"**Class ID:** {cls[0]} | **Date:** {cls[1]} | **Workout:** {cls[2]}")
+            tab = lazy_tabs([
+                "Trainer Details", "Schedule Class", "Manage Series", "View Classes", "Add Workout", "Update Workout"
+            ], key="trainer_tab")
+            querylog.set_context(tab=tab)
+
+            # Trainer Details
+            if tab == "Trainer Details":
+                st.subheader("Your Details")
+                st.write(f"**ID:** {trainer_id}")
+                st.write(f"**Name:** {trainer[1]}")
+                st.write(f"**Phone:** {trainer[3]}")
+                st.write(f"**Gender:** {'M' if trainer[2] == 'M' else 'F' if trainer[2] == 'F' else trainer[2]}")
+                st.write(f"**Email:** {trainer[4]}")
+
+            # Schedule Class (only assign to active members)
+            if tab == "Schedule Class":
+                st.subheader("Schedule a New Class")
+                schedule_class_form(trainer_id)
+
+            # Edit or cancel the remaining classes of a recurring series
+            if tab == "Manage Series":
+                st.subheader("Recurring Classes")
+                series = scheduling.trainer_series(cur, trainer_id)
+                if not series:
+                    st.info("No recurring classes scheduled yet.")
                 else:
-                    st.info("No classes scheduled yet.")
-            except Exception as e:
-                st.error(f"Error fetching classes: {e}")
-
-        # Add Workout
-        with tab4:
-            st.subheader("Add New Workout")
-            workout_name = st.text_input("Workout Name")
-            equipment_id = st.number_input("Equipment ID", min_value=1, step=1)
-            if st.button("Add Workout"):
+                    st.dataframe(
+                        [{"Series ID": s[0], "Workout": s[1], "Days": s[2], "Time": class_slots.time_range(s[6], s[7]),
+                          "Room": s[8], "From": s[3], "To": s[4], "Remaining": s[5]}
+                         for s in series],
+                        hide_index=True, use_container_width=True
+                    )
+                    series_id = st.selectbox("Series", [s[0] for s in series],
+                                             format_func=lambda i: next(f"{i} - {s[1]} ({s[2]})" for s in series if s[0] == i))
+                    from_date = st.date_input("Apply to classes from", datetime.date.today(), key="series_from")
+
+                    new_workout = search_picker("New Workout", "workouts", key=f"series_workout_{series_id}", cur=cur)
+                    if st.button("Change Workout", disabled=new_workout is None):
+                        try:
+                            updated = scheduling.update_series(conn, series_id, new_workout, from_date)
+                            member_dashboard.invalidate_all()
+                            get_demand_cache().clear()
+                            get_slot_index().clear()
+                            st.success(f"{updated} class(es) updated.")
+                        except Exception as e:
+                            st.error(f"Error updating series: {e}")
+
+                    if st.button("Cancel Remaining Classes"):
+                        try:
+                            cancelled = scheduling.cancel_series(conn, series_id, from_date)
+                            member_dashboard.invalidate_all()
+                            get_demand_cache().clear()
+                            get_slot_index().clear()
+                            st.success(f"{cancelled} class(es) cancelled.")
+                        except Exception as e:
+                            st.error(f"Error cancelling series: {e}")
+
+            # View scheduled classes
+            if tab == "View Classes":
+                st.subheader("Your Scheduled Classes")
                 try:
-                    cur.execute("INSERT INTO workouts (equipment_id, workout_name) VALUES (%s, %s)",
-                                (equipment_id, workout_name))
-                    conn.commit()
-                    st.success("Workout added successfully!")
+                    show_trainer_classes(cur, trainer_id)
                 except Exception as e:
-                    st.error(f"Error adding workout: {e}")
-
-        # Update Workout
-        with tab5:
-            st.subheader("Update Existing Workout")
-            cur.execute("SELECT workout_id, workout_name FROM workouts")
-            workouts = cur.fetchall()
-            workout_options = {f"{w[0]} - {w[1]}": w[0] for w in workouts}
-
-            selected = st.selectbox("Select Workout to Update", list(workout_options.keys()))
-            if selected:
-                workout_id = workout_options[selected]
-                cur.execute("SELECT equipment_id, workout_name FROM workouts WHERE workout_id = %s", (workout_id,))
-                workout_data = cur.fetchone()
-
-                new_name = st.text_input("Updated Workout Name", workout_data[1])
-                new_eqid = st.number_input("Updated Equipment ID", min_value=1, value=workout_data[0])
-
-                if st.button("Update Workout"):
+                    st.error(f"Error fetching classes: {e}")
+
+            # Add Workout
+            if tab == "Add Workout":
+                st.subheader("Add New Workout")
+                workout_name = st.text_input("Workout Name")
+                equipment_id = search_picker("Equipment", "equipment", key="add_workout_equipment", cur=cur)
+                if st.button("Add Workout", disabled=equipment_id is None):
                     try:
-                        cur.execute("UPDATE workouts SET equipment_id = %s, workout_name = %s WHERE workout_id = %s",
-                                    (new_eqid, new_name, workout_id))
+                        cur.execute("INSERT INTO workouts (equipment_id, workout_name) VALUES (%s, %s)",
+                                    (equipment_id, workout_name))
                         conn.commit()
-                        st.success("Workout updated successfully!")
+                        get_name_index("workouts").upsert(cur.lastrowid, workout_name)
+                        st.success("Workout added successfully!")
                     except Exception as e:
-                        st.error(f"Error updating workout: {e}")
-
-    try:
+                        st.error(f"Error adding workout: {e}")
+
+            # Update Workout
+            if tab == "Update Workout":
+                st.subheader("Update Existing Workout")
+                workout_id = search_picker("Workout to Update", "workouts", key="update_workout", cur=cur)
+                if workout_id is not None:
+                    cur.execute("SELECT workout_name, equipment_id FROM workouts WHERE workout_id = %s", (workout_id,))
+                    current_name, current_eqid = cur.fetchone() or (None, None)
+
+                    new_name = st.text_input("Updated Workout Name", current_name, key=f"workout_name_{workout_id}")
+                    new_eqid = search_picker("Updated Equipment", "equipment", key=f"update_workout_equipment_{workout_id}",
+                                             default=current_eqid, cur=cur)
+
+                    if st.button("Update Workout", disabled=new_eqid is None):
+                        try:
+                            cur.execute("UPDATE workouts SET equipment_id = %s, workout_name = %s WHERE workout_id = %s",
+                                        (new_eqid, new_name, workout_id))
+                            conn.commit()
+                            get_name_index("workouts").upsert(workout_id, new_name)
+                            member_dashboard.invalidate_all()
+                            if new_eqid != current_eqid:
+                                # classes of this workout now need other equipment
+                                get_demand_cache().clear()
+                                get_slot_index().clear()
+                            st.success("Workout updated successfully!")
+                        except Exception as e:
+                            st.error(f"Error updating workout: {e}")
+    finally:
         cur.close()
         conn.close()
-    except Exception:
-        pass
 
 # -------------------------
 # ADMIN PANEL
@@ -459,273 +762,558 @@ elif role == "Trainer":
 elif role == "Admin":
     conn = get_connection()
     cur = conn.cursor()
+    try:
+        if "admin_logged_in" not in st.session_state:
+            st.session_state.admin_logged_in = False
+
+        if not st.session_state.admin_logged_in:
+            st.subheader("Admin Login")
+            admin_email = st.text_input("Email")
+            admin_password = st.text_input("Password", type="password")
+            if st.button("Login"):
+                cur.execute("SELECT * FROM login WHERE email = %s AND password = %s AND category = 'Admin'", (admin_email, admin_password))
+                admin_data = cur.fetchone()
+                if admin_data:
+                    st.session_state.admin_logged_in = True
+                    st.success("Logged in successfully!")
+                    st.rerun()
+                else:
+                    st.error("Invalid credentials or not an admin.")
+            st.stop()
 
-    if "admin_logged_in" not in st.session_state:
-        st.session_state.admin_logged_in = False
-
-    if not st.session_state.admin_logged_in:
-        st.subheader("Admin Login")
-        admin_email = st.text_input("Email")
-        admin_password = st.text_input("Password", type="password")
-        if st.button("Login"):
-            cur.execute("SELECT * FROM login WHERE email = %s AND password = %s AND category = 'Admin'", (admin_email, admin_password))
-            admin_data = cur.fetchone()
-            if admin_data:
-                st.session_state.admin_logged_in = True
-                st.success("Logged in successfully!")
-                st.rerun()
-            else:
-                st.error("Invalid credentials or not an admin.")
-        st.stop()
-
-    if st.button("Logout"):
-        st.session_state.clear()
-        st.rerun()
-
-    st.header("Admin Panel")
-
-    admin_actions = st.sidebar.selectbox("Choose an Action", [
-        "Add Member", "Update Member", "Remove Member",
-        "Add Trainer", "Update Trainer", "Remove Trainer", "Update Trainer Salary",
-        "Add Equipment", "Update Equipment", "Remove Equipment",
-        "Add Scheme", "Update Scheme", "Remove Scheme", "View Schemes", "View Equipment", "View Members", "View Trainers"
-    ])
-
-    # --- MEMBER MANAGEMENT ---
-    if admin_actions == "Add Member":
-        st.subheader("Add New Member")
-        with st.form("add_member_form"):
-            member_name = st.text_input("Member Name")
-            gender_label = st.selectbox("Gender", ["M", "F", "Other"])
-            gender = "M" if gender_label == "M" else "F" if gender_label == "F" else gender_label
-            phone = st.text_input("Phone")
-            email = st.text_input("Email")
-            password = st.text_input("Password", type="password")
-            membership_id = st.text_input("Membership ID")
+        if st.button("Logout"):
+            st.session_state.clear()
+            st.rerun()
+
+        st.header("Admin Panel")
+
+        with st.sidebar.expander("Connection pool"):
+            st.json(get_pool().stats())
+        with st.sidebar.expander("Reference cache"):
+            st.json(get_ref_cache().stats())
+
+        admin_actions = st.sidebar.selectbox("Choose an Action", [
+            "Add Member", "Import Members", "Update Member", "Remove Member",
+            "Add Trainer", "Update Trainer", "Remove Trainer", "Update Trainer Salary", "Payroll",
+            "Add Equipment", "Update Equipment", "Remove Equipment",
+            "Add Scheme", "Update Scheme", "Remove Scheme", "View Schemes", "View Equipment", "View Members", "View Trainers",
+            "Bulk Actions", "Membership Status Sweep", "Membership Expiry", "Equipment Usage", "Revenue", "Export Data", "Performance"
+        ])
+        querylog.set_context(tab=admin_actions)
+
+        # --- MEMBER MANAGEMENT ---
+        if admin_actions == "Add Member":
+            st.subheader("Add New Member")
+            with st.form("add_member_form"):
+                member_name = st.text_input("Member Name")
+                gender_label = st.selectbox("Gender", ["M", "F", "Other"])
+                gender = "M" if gender_label == "M" else "F" if gender_label == "F" else gender_label
+                phone = st.text_input("Phone")
+                email = st.text_input("Email")
+                password = st.text_input("Password", type="password")
+                membership_id = st.text_input("Membership ID")
+                trainer_id = st.text_input("Trainer ID")
+                height = st.number_input("Height (cm)")
+                weight = st.number_input("Weight (kg)")
+                age = st.number_input("Age", step=1)
+                submitted = st.form_submit_button("Add Member")
+
+            if submitted:
+                bmi = (weight * 10000) / (height * height) if height > 0 else 0
+                cur.execute("SELECT * FROM login WHERE email = %s", (email,))
+                if cur.fetchone():
+                    st.error("Email already exists!")
+                else:
+                    # create login and member; new members will be Inactive until they pay
+                    cur.execute("INSERT INTO login (email, password, category) VALUES (%s, %s, 'Member')", (email, password))
+                    cur.execute("""
+                        INSERT INTO member (member_name, gender, phone, email, membership_id, trainer_id, height, weight, bmi, age, membership_status)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    """, (member_name, gender, phone, email, membership_id, trainer_id, height, weight, bmi, age, "Inactive"))
+                    member_id = cur.lastrowid
+                    conn.commit()
+                    get_member_index().upsert(member_id, member_name, phone, email)
+                    st.success("Member added successfully! (status: Inactive until first payment)")
+
+        elif admin_actions == "Import Members":
+            st.subheader("Import Members from CSV")
+            st.caption("Columns: " + ", ".join(member_import.COLUMNS) + ". New members are Inactive until their first payment.")
+            upload = st.file_uploader("CSV file", type=["csv"])
+            chunk_size = st.number_input("Rows per transaction", min_value=100, max_value=10000, value=member_import.IMPORT_CHUNK_SIZE, step=100)
+            if upload is not None and st.button("Import"):
+                bar = st.progress(0.0, text="Importing...")
+                size = max(upload.size, 1)
+                lines = io.TextIOWrapper(upload, encoding="utf-8-sig", newline="")
+
+                def show_progress(totals):
+                    bar.progress(min(upload.tell() / size, 1.0),
+                                 text=f"{totals['rows']} rows · {totals['inserted']} inserted · "
+                                      f"{totals['rejected']} rejected · {totals['rows_per_sec']} rows/s")
+
+                try:
+                    totals, rejects = member_import.import_members(conn, lines, int(chunk_size), show_progress)
+                    cached_row_count.clear()
+                    get_member_index().invalidate()
+                    st.success(f"Imported {totals['inserted']} of {totals['rows']} row(s) in {totals['seconds']}s "
+                               f"({totals['rows_per_sec']} rows/s).")
+                    if rejects:
+                        st.warning(f"{len(rejects)} row(s) rejected.")
+                        st.dataframe([{"Line": line, "Reason": reason} for line, reason in rejects[:1000]], hide_index=True)
+                except Exception as e:
+                    st.error(f"Error importing members: {e}")
+
+        elif admin_actions == "Update Member":
+            st.subheader("Update Member Details")
+            member_id = member_picker("update_member", cur=cur)
+            field = st.selectbox("Field to Update", ["member_name", "gender", "phone", "email", "membership_id", "trainer_id", "height", "weight", "age", "membership_status"])
+            new_value = st.text_input("Enter New Value")
+            if st.button("Update Member", disabled=member_id is None):
+                cur.execute(f"UPDATE member SET {field} = %s WHERE memberID = %s", (new_value, member_id))
+                conn.commit()
+                member_dashboard.invalidate(member_id)
+                if field in MEMBERSHIP_FIELDS:
+                    memberships_changed()
+                if field in ("member_name", "phone", "email"):
+                    get_member_index().sync(cur, member_id)
+                st.success("Member updated successfully!")
+
+        elif admin_actions == "Remove Member":
+            st.subheader("Remove Member")
+            member_id = member_picker("remove_member", cur=cur)
+            if st.button("Remove", disabled=member_id is None):
+                try:
+                    # the member and their class responses go in one transaction
+                    bulk_ops.delete_rows(conn, "member", [member_id])
+                except Exception as e:
+                    st.error(f"Error removing member: {e}")
+                else:
+                    cached_row_count.clear()
+                    member_dashboard.invalidate(member_id)
+                    get_member_index().remove(member_id)
+                    memberships_changed()
+                    st.success("Member removed successfully!")
+
+        # --- TRAINER MANAGEMENT ---
+        elif admin_actions == "Add Trainer":
+            st.subheader("Add New Trainer")
+            with st.form("add_trainer_form"):
+                name = st.text_input("Name")
+                phone = st.text_input("Phone")
+                gender_label = st.selectbox("Gender", ["M", "F", "Other"])
+                gender = "M" if gender_label == "M" else "F" if gender_label == "F" else gender_label
+                email = st.text_input("Email")
+                password = st.text_input("Password", type="password")
+                salary = st.number_input("Salary")
+                submitted = st.form_submit_button("Add Trainer")
+
+                if submitted:
+                    cur.execute("INSERT INTO login (email, password, category) VALUES (%s, %s, 'Trainer')", (email, password))
+                    cur.execute("INSERT INTO trainer (trainer_name, phone, gender, email) VALUES (%s, %s, %s, %s)", (name, phone, gender, email))
+                    trainer_id = cur.lastrowid
+                    cur.execute("INSERT INTO salary (trainer_id, salary) VALUES (%s, %s)", (trainer_id, salary))
+                    conn.commit()
+                    st.success("Trainer added successfully!")
+
+        elif admin_actions == "Update Trainer":
+            st.subheader("Update Trainer")
             trainer_id = st.text_input("Trainer ID")
-            height = st.number_input("Height (cm)")
-            weight = st.number_input("Weight (kg)")
-            age = st.number_input("Age", step=1)
-            submitted = st.form_submit_button("Add Member")
-
-        if submitted:
-            bmi = (weight * 10000) / (height * height) if height > 0 else 0
-            cur.execute("SELECT * FROM login WHERE email = %s", (email,))
-            if cur.fetchone():
-                st.error("Email already exists!")
-            else:
-                # create login and member; new members will be Inactive until they pay
-                cur.execute("INSERT INTO login (email, password, category) VALUES (%s, %s, 'Member')", (email, password))
-                cur.execute("""
-                    INSERT INTO member (member_name, gender, phone, email, membership_id, trainer_id, height, weight, bmi, age, membership_status)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """, (member_name, gender, phone, email, membership_id, trainer_id, height, weight, bmi, age, "Inactive"))
+            field = st.selectbox("Field to Update", ["trainer_name", "phone", "gender", "password"])
+            new_value = st.text_input("New Value")
+            if st.button("Update Trainer"):
+                if field == "password":
+                    cur.execute("SELECT email FROM trainer WHERE trainer_id = %s", (trainer_id,))
+                    email = cur.fetchone()[0]
+                    cur.execute("UPDATE login SET password = %s where email = %s", (new_value,email))
+                else:
+                    cur.execute(f"UPDATE trainer SET {field} = %s WHERE trainer_id = %s", (new_value, trainer_id))
                 conn.commit()
-                st.success("Member added successfully! (status: Inactive until first payment)")
-
-    elif admin_actions == "Update Member":
-        st.subheader("Update Member Details")
-        member_id = st.text_input("Enter Member ID to Update")
-        field = st.selectbox("Field to Update", ["member_name", "gender", "phone", "email", "membership_id", "trainer_id", "height", "weight", "age", "membership_status"])
-        new_value = st.text_input("Enter New Value")
-        if st.button("Update Member"):
-            cur.execute(f"UPDATE member SET {field} = %s WHERE memberID = %s", (new_value, member_id))
-            conn.commit()
-            st.success("Member updated successfully!")
-
-    elif admin_actions == "Remove Member":
-        st.subheader("Remove Member")
-        member_id = st.text_input("Enter Member ID to Remove")
-        if st.button("Remove"):
-            cur.execute("DELETE FROM member WHERE memberID = %s", (member_id,))
-            conn.commit()
-            st.success("Member removed successfully!")
-
-    # --- TRAINER MANAGEMENT ---
-    elif admin_actions == "Add Trainer":
-        st.subheader("Add New Trainer")
-        with st.form("add_trainer_form"):
-            name = st.text_input("Name")
-            phone = st.text_input("Phone")
-            gender_label = st.selectbox("Gender", ["M", "F", "Other"])
-            gender = "M" if gender_label == "M" else "F" if gender_label == "F" else gender_label
-            email = st.text_input("Email")
-            password = st.text_input("Password", type="password")
-            salary = st.number_input("Salary")
-            submitted = st.form_submit_button("Add Trainer")
+                member_dashboard.invalidate_all()
+                st.success("Trainer updated successfully!")
+
+        elif admin_actions == "Remove Trainer":
+            st.subheader("Remove Trainer")
+            trainer_id = st.text_input("Enter Trainer ID to Remove")
+            if st.button("Remove Trainer"):
+                cur.execute("DELETE FROM trainer WHERE trainer_id = %s", (trainer_id,))
+                conn.commit()
+                member_dashboard.invalidate_all()
+                st.success("Trainer removed successfully!")
 
-            if submitted:
-                cur.execute("INSERT INTO login (email, password, category) VALUES (%s, %s, 'Trainer')", (email, password))
-                cur.execute("INSERT INTO trainer (trainer_name, phone, gender, email) VALUES (%s, %s, %s, %s)", (name, phone, gender, email))
-                trainer_id = cur.lastrowid
-                cur.execute("INSERT INTO salary (trainer_id, salary) VALUES (%s, %s)", (trainer_id, salary))
+        elif admin_actions == "Update Trainer Salary":
+            st.subheader("Update Trainer Salary")
+            trainer_id = st.text_input("Trainer ID")
+            new_salary = st.number_input("New Salary")
+            if st.button("Update Salary"):
+                cur.execute("UPDATE salary SET salary = %s WHERE trainer_id = %s", (new_salary, trainer_id))
                 conn.commit()
-                st.success("Trainer added successfully!")
-
-    elif admin_actions == "Update Trainer":
-        st.subheader("Update Trainer")
-        trainer_id = st.text_input("Trainer ID")
-        field = st.selectbox("Field to Update", ["trainer_name", "phone", "gender", "password"])
-        new_value = st.text_input("New Value")
-        if st.button("Update Trainer"):
-            if field == "password":
-                cur.execute("SELECT email FROM trainer WHERE trainer_id = %s", (trainer_id,))
-                email = cur.fetchone()[0]
-                cur.execute("UPDATE login SET password = %s where email = %s", (new_value,email))
+                st.success("Salary updated successfully!")
+
+        elif admin_actions == "Payroll":
+            st.subheader("Trainer Payroll")
+            st.caption("Base salary + a rate per class taught in the month + a rate per active member assigned.")
+            col1, col2, col3 = st.columns(3)
+            month = col1.date_input("Month", datetime.date.today().replace(day=1), key="payroll_month").replace(day=1)
+            per_class = col2.number_input("Per class (₹)", min_value=0.0, value=payroll.PER_CLASS_RATE, step=50.0)
+            per_member = col3.number_input("Per active member (₹)", min_value=0.0, value=payroll.PER_MEMBER_RATE, step=10.0)
+
+            if st.button(f"Run payroll for {month:%B %Y}"):
+                try:
+                    result = payroll.run_payroll(conn, month, per_class, per_member)
+                    st.success(f"{result['trainers']} payslip(s), total ₹{result['total']:,.2f}, in {result['seconds']}s.")
+                except Exception as e:
+                    st.error(f"Payroll run failed, nothing was written: {e}")
+
+            slips = payroll.payslips(cur, month)
+            if slips:
+                st.dataframe([dict(zip(payroll.PAYSLIP_COLUMNS, row)) for row in slips],
+                             use_container_width=True, hide_index=True)
+                csv_buffer = io.StringIO()
+                payroll.write_csv(slips, csv_buffer)
+                st.download_button("Download payslips (CSV)", csv_buffer.getvalue(), file_name=f"payslips_{month:%Y_%m}.csv",
+                                   mime="text/csv")
             else:
-                cur.execute(f"UPDATE trainer SET {field} = %s WHERE trainer_id = %s", (new_value, trainer_id))
-            conn.commit()
-            st.success("Trainer updated successfully!")
-
-    elif admin_actions == "Remove Trainer":
-        st.subheader("Remove Trainer")
-        trainer_id = st.text_input("Enter Trainer ID to Remove")
-        if st.button("Remove Trainer"):
-            cur.execute("DELETE FROM trainer WHERE trainer_id = %s", (trainer_id,))
-            conn.commit()
-            st.success("Trainer removed successfully!")
-
-    elif admin_actions == "Update Trainer Salary":
-        st.subheader("Update Trainer Salary")
-        trainer_id = st.text_input("Trainer ID")
-        new_salary = st.number_input("New Salary")
-        if st.button("Update Salary"):
-            cur.execute("UPDATE salary SET salary = %s WHERE trainer_id = %s", (new_salary, trainer_id))
-            conn.commit()
-            st.success("Salary updated successfully!")
-
-    # --- EQUIPMENT MANAGEMENT ---
-    elif admin_actions == "Add Equipment":
-        st.subheader("Add Equipment")
-        name = st.text_input("Equipment Name")
-        quantity = st.number_input("Quantity", step=1)
-        if st.button("Add Equipment"):
-            cur.execute("INSERT INTO equipment (equipment_name, number_of_equipment) VALUES (%s, %s)", (name, quantity))
-            conn.commit()
-            st.success("Equipment added successfully!")
-
-    elif admin_actions == "Update Equipment":
-        st.subheader("Update Equipment")
-        equipment_id = st.text_input("Equipment ID")
-        field = st.selectbox("Field to Update", ["equipment_name", "number_of_equipment"])
-        new_value = st.text_input("New Value")
-        if st.button("Update Equipment"):
-            cur.execute(f"UPDATE equipment SET {field} = %s WHERE equipment_id = %s", (new_value, equipment_id))
-            conn.commit()
-            st.success("Equipment updated successfully!")
-
-    elif admin_actions == "Remove Equipment":
-        st.subheader("Remove Equipment")
-        equipment_id = st.text_input("Equipment ID")
-        if st.button("Remove Equipment"):
-            cur.execute("DELETE FROM equipment WHERE equipment_id = %s", (equipment_id,))
-            conn.commit()
-            st.success("Equipment removed successfully!")
-
-    # --- SCHEME MANAGEMENT ---
-    elif admin_actions == "Add Scheme":
-        st.subheader("Add Scheme")
-        name = st.text_input("Scheme Name")
-        duration = st.number_input("Duration (months)", step=1)
-        fee = st.number_input("Fee")
-        if st.button("Add Scheme"):
-            cur.execute("INSERT INTO membership_schemes (scheme_name, duration, fee) VALUES (%s, %s, %s)", (name, duration, fee))
-            conn.commit()
-            st.success("Scheme added successfully!")
-
-    elif admin_actions == "Update Scheme":
-        st.subheader("Update Scheme")
-        scheme_id = st.text_input("Scheme ID")
-        field = st.selectbox("Field to Update", ["scheme_name", "duration", "fee"])
-        new_value = st.text_input("New Value")
-        if st.button("Update Scheme"):
-            cur.execute(f"UPDATE membership_schemes SET {field} = %s WHERE scheme_id = %s", (new_value, scheme_id))
-            conn.commit()
-            st.success("Scheme updated successfully!")
-
-    elif admin_actions == "Remove Scheme":
-        st.subheader("Remove Scheme")
-        scheme_id = st.text_input("Scheme ID")
-        if st.button("Remove Scheme"):
-            cur.execute("DELETE FROM membership_schemes WHERE scheme_id = %s", (scheme_id,))
-            conn.commit()
-            st.success("Scheme removed successfully!")
-
-    elif admin_actions == "View Schemes":
-        st.subheader("View Membership Schemes")
-        cur.execute("SELECT * FROM membership_schemes")
-        records = cur.fetchall()
-        if records:
-            for row in records:
-                st.markdown(f"""
-                    <div style='border:1px solid #ccc; border-radius:10px; padding:15px; margin-bottom:10px;'>
-                        <b>ID: </b> {row[0]}<br>
-                        <b>Name: </b> {row[1]}<br>
-                        <b>Duration: </b> {row[2]} months<br>
-                        <b>Fee: </b> ₹{row[3]}
-                    </div>
-                """, unsafe_allow_html=True)
-        else:
-            st.info("No schemes found.")
-    elif admin_actions == "View Equipment":
-        st.subheader("View Equipment")
-        cur.execute("SELECT * FROM equipment")
-        records = cur.fetchall()
-        if records:
-            for row in records:
-                st.markdown(f"""
-                    <div style='border:1px solid #ccc; border-radius:10px; padding:15px; margin-bottom:10px;'>
-                        <b>Equipment ID: </b> {row[0]}<br>
-                        <b>Equipment Name: </b> {row[1]}<br>
-                        <b>Quantity: </b> {row[2]}<br>
-                    </div>
-                """, unsafe_allow_html=True)
-        else:
-            st.info("No equipment found.")
-    elif admin_actions == "View Members":
-        st.subheader("View Members")
-        cur.execute("SELECT * FROM member")
-        records = cur.fetchall()
-        if records:
-            for row in records:
-                st.markdown(f"""
-                    <div style='border:1px solid #ccc; border-radius:10px; padding:15px; margin-bottom:10px;'>
-                        <b>ID: </b> {row[0]}<br>
-                        <b>Name: </b> {row[1]}<br>
-                        <b>Gender: </b> {row[2]}<br>
-                        <b>Phone: </b>{row[3]}<br>
-                        <b>Email: </b>{row[4]}<br>
-                        <b>Membership Scheme ID: </b>{row[5]}<br>
-                        <b>Membership Status: </b>{row[6]}<br>
-                        <b>Trainer ID: </b>{row[7]}<br>
-                        <b>Height: </b>{row[8]}<br>
-                        <b>Weight: </b>{row[9]}<br>
-                        <b>BMI: </b>{row[10]}<br>
-                        <b>Payment ID (latest): </b>{row[11]}<br>
-                        <b>Age: </b>{row[12]}<br>
-                        <b>Class ID (upcoming): </b>{row[13]}<br>
-                    </div>
-                """, unsafe_allow_html=True)
-        else:
-            st.info("No schemes found.")
-    elif admin_actions == "View Trainers":
-        st.subheader("View Trainers")
-        cur.execute("SELECT * FROM trainer")
-        records = cur.fetchall()
-        if records:
-            for row in records:
-                st.markdown(f"""
-                    <div style='border:1px solid #ccc; border-radius:10px; padding:15px; margin-bottom:10px;'>
-                        <b>ID: </b> {row[0]}<br>
-                        <b>Name: </b> {row[1]}<br>
-                        <b>Gender:</b> {row[2]}<br>
-                        <b>Phone: </b>{row[3]}<br>
-                        <b>Email: </b>{row[4]}<br>
-                        <b>Class ID (upcoming) : </b>{row[5]}
-                    </div>
-                """, unsafe_allow_html=True)
-        else:
-            st.info("No schemes found.")
+                st.info("No payroll has been run for this month yet.")
+
+            history = payroll.runs(cur)
+            if history:
+                st.markdown("**Past runs**")
+                st.dataframe([{"Month": f"{r[0]:%Y-%m}", "Per class": r[1], "Per member": r[2], "Trainers": r[3],
+                               "Total": r[4], "Run at": r[5]} for r in history], hide_index=True)
+
+        # --- EQUIPMENT MANAGEMENT ---
+        elif admin_actions == "Add Equipment":
+            st.subheader("Add Equipment")
+            name = st.text_input("Equipment Name")
+            quantity = st.number_input("Quantity", step=1)
+            if st.button("Add Equipment"):
+                cur.execute("INSERT INTO equipment (equipment_name, number_of_equipment) VALUES (%s, %s)", (name, quantity))
+                conn.commit()
+                get_ref_cache().invalidate("equipment")
+                get_name_index("equipment").upsert(cur.lastrowid, name)
+                st.success("Equipment added successfully!")
+
+        elif admin_actions == "Update Equipment":
+            st.subheader("Update Equipment")
+            equipment_id = st.text_input("Equipment ID")
+            field = st.selectbox("Field to Update", ["equipment_name", "number_of_equipment"])
+            new_value = st.text_input("New Value")
+            if st.button("Update Equipment"):
+                cur.execute(f"UPDATE equipment SET {field} = %s WHERE equipment_id = %s", (new_value, equipment_id))
+                conn.commit()
+                get_ref_cache().invalidate("equipment")
+                if field == "equipment_name" and equipment_id.strip().isdigit():
+                    get_name_index("equipment").upsert(int(equipment_id), new_value)
+                member_dashboard.invalidate_all()
+                st.success("Equipment updated successfully!")
+
+        elif admin_actions == "Remove Equipment":
+            st.subheader("Remove Equipment")
+            equipment_id = st.text_input("Equipment ID")
+            if st.button("Remove Equipment"):
+                cur.execute("DELETE FROM equipment WHERE equipment_id = %s", (equipment_id,))
+                conn.commit()
+                get_ref_cache().invalidate("equipment")
+                if equipment_id.strip().isdigit():
+                    get_name_index("equipment").remove(int(equipment_id))
+                member_dashboard.invalidate_all()
+                st.success("Equipment removed successfully!")
+
+        # --- SCHEME MANAGEMENT ---
+        elif admin_actions == "Add Scheme":
+            st.subheader("Add Scheme")
+            name = st.text_input("Scheme Name")
+            duration = st.number_input("Duration (months)", step=1)
+            fee = st.number_input("Fee")
+            if st.button("Add Scheme"):
+                cur.execute("INSERT INTO membership_schemes (scheme_name, duration, fee) VALUES (%s, %s, %s)", (name, duration, fee))
+                conn.commit()
+                get_ref_cache().invalidate("membership_schemes")
+                st.success("Scheme added successfully!")
+
+        elif admin_actions == "Update Scheme":
+            st.subheader("Update Scheme")
+            scheme_id = st.text_input("Scheme ID")
+            field = st.selectbox("Field to Update", ["scheme_name", "duration", "fee"])
+            new_value = st.text_input("New Value")
+            if st.button("Update Scheme"):
+                cur.execute(f"UPDATE membership_schemes SET {field} = %s WHERE scheme_id = %s", (new_value, scheme_id))
+                conn.commit()
+                get_ref_cache().invalidate("membership_schemes")
+                member_dashboard.invalidate_all()
+                st.success("Scheme updated successfully!")
+
+        elif admin_actions == "Remove Scheme":
+            st.subheader("Remove Scheme")
+            scheme_id = st.text_input("Scheme ID")
+            if st.button("Remove Scheme"):
+                cur.execute("DELETE FROM membership_schemes WHERE scheme_id = %s", (scheme_id,))
+                conn.commit()
+                get_ref_cache().invalidate("membership_schemes")
+                member_dashboard.invalidate_all()
+                st.success("Scheme removed successfully!")
+
+        elif admin_actions in ADMIN_VIEWS:
+            st.subheader(ADMIN_VIEWS[admin_actions]["title"])
+            show_table_page(admin_actions, cur)
+
+        elif admin_actions == "Bulk Actions":
+            st.subheader("Bulk Actions")
+            view = st.selectbox("Records", ["View Members", "View Trainers", "View Equipment"],
+                                format_func=lambda v: v.replace("View ", ""))
+            table = ADMIN_VIEWS[view]["table"]
+            labels = ADMIN_VIEWS[view]["columns"]
+            selected = show_table_page(view, cur, selectable=True)
+            st.caption(f"{len(selected)} row(s) selected on this page")
+
+            actions = ["Update field", "Delete"] + (["Adjust salary"] if table == "trainer" else [])
+            action = st.radio("Action", actions, horizontal=True, key="bulk_action")
+            changes, salary_args = {}, {}
+            if action == "Update field":
+                field = st.selectbox("Field", bulk_ops.BULK_TABLES[table]["fields"], format_func=lambda f: labels.get(f, f))
+                if field == "membership_status":
+                    changes[field] = st.selectbox("New value", ["Active", "Inactive"])
+                elif field == "membership_id":
+                    def load_schemes():
+                        cur.execute("SELECT scheme_id, scheme_name FROM membership_schemes ORDER BY scheme_id")
+                        return dict(cur.fetchall())
+                    schemes = get_ref_cache().get("membership_schemes", ("options",), load_schemes)
+                    changes[field] = st.selectbox("New scheme", list(schemes), format_func=lambda i: f"{i} - {schemes[i]}")
+                else:
+                    changes[field] = st.text_input("New value")
+            elif action == "Adjust salary":
+                mode = st.radio("Change", ["Percent", "Fixed amount", "Set to"], horizontal=True)
+                if mode == "Percent":
+                    salary_args["percent"] = st.number_input("Percent (negative for a cut)", value=5.0)
+                elif mode == "Fixed amount":
+                    salary_args["amount"] = st.number_input("Amount (negative for a cut)", value=1000, step=100)
+                else:
+                    salary_args["set_to"] = st.number_input("New salary", min_value=0, value=10000, step=100)
+            else:
+                st.warning("Deleting also removes the rows that depend on them "
+                           f"({', '.join(t for t, _ in bulk_ops.BULK_TABLES[table]['dependents']) or 'none'}).")
+
+            if st.button(f"Apply to {len(selected)} row(s)", disabled=not selected):
+                try:
+                    if action == "Update field":
+                        result = bulk_ops.update_rows(conn, table, selected, changes)
+                    elif action == "Delete":
+                        result = bulk_ops.delete_rows(conn, table, selected)
+                    else:
+                        result = bulk_ops.adjust_salaries(conn, selected, **salary_args)
+                except Exception as e:
+                    st.error(f"Bulk action failed, nothing was changed: {e}")
+                else:
+                    cached_row_count.clear()
+                    if table == "member":
+                        for member_id in selected:
+                            member_dashboard.invalidate(member_id)
+                            if action == "Delete":
+                                get_member_index().remove(member_id)
+                        if action == "Delete" or MEMBERSHIP_FIELDS & changes.keys():
+                            memberships_changed()
+                    else:
+                        member_dashboard.invalidate_all()
+                    if table == "equipment":
+                        get_ref_cache().invalidate("equipment")
+                        for equipment_id in selected:
+                            if action == "Delete":
+                                get_name_index("equipment").remove(equipment_id)
+                            elif "equipment_name" in changes:
+                                get_name_index("equipment").upsert(equipment_id, changes["equipment_name"])
+                    st.success(", ".join(f"{table_name}: {n} row(s)" for table_name, n in result["rows"].items())
+                               + f" in {result['seconds']}s")
+
+        elif admin_actions == "Membership Status Sweep":
+            st.subheader("Membership Status Sweep")
+            sweeper = get_status_sweeper()
+            st.write(f"Members whose last payment is older than {membership.INACTIVE_AFTER_MONTHS} months are marked Inactive.")
+            if sweeper.interval > 0:
+                st.write(f"The sweep also runs automatically every {int(sweeper.interval)} seconds.")
+            if st.button("Run Sweep Now"):
+                try:
+                    result = sweeper.run_once()
+                    st.success(f"{result['changed']} of {result['members']} member(s) changed status in {result['seconds']}s.")
+                except Exception as e:
+                    st.error(f"Error running sweep: {e}")
+            if sweeper.last_result:
+                st.write("**Last sweep:**")
+                st.json(sweeper.last_result)
+            if sweeper.last_error:
+                st.warning(f"Last scheduled sweep failed: {sweeper.last_error}")
+
+        elif admin_actions == "Membership Expiry":
+            st.subheader("Membership Expiry")
+            st.caption("A membership runs for its scheme's duration from the member's latest payment.")
+            calendar = get_expiry_calendar()
+            days = st.slider("Expiring within (days)", min_value=1, max_value=90, value=30)
+            started = time.perf_counter()
+            expiring = calendar.expiring(days, cur=cur)
+            overdue = calendar.overdue(cur=cur)
+            took = (time.perf_counter() - started) * 1000
+            m1, m2 = st.columns(2)
+            m1.metric(f"Expiring in the next {days} days", len(expiring))
+            m2.metric("Expired but still Active", len(overdue))
+            st.caption(f"{len(calendar)} members · queried in {took:.1f} ms")
+            columns = {"memberID": "Member ID", "member_name": "Name", "email": "Email", "membership_status": "Status",
+                       "scheme_name": "Scheme", "last_payment": "Last Payment", "expiry": "Expires", "days_remaining": "Days Left"}
+            st.markdown("**Expiring soon**")
+            st.dataframe(expiring.rename(columns=columns), use_container_width=True, hide_index=True)
+            st.markdown("**Expired but still Active**")
+            st.dataframe(overdue.rename(columns=columns), use_container_width=True, hide_index=True)
+            if st.button("Reload"):
+                calendar.invalidate()
+                st.rerun()
+
+            st.markdown("**Renewal reminders**")
+            worker = get_reminder_worker()
+            st.write(reminders.outbox_counts(cur) or "Outbox is empty.")
+            if worker.sink is None:
+                st.info("Reminders are off until GYM_REMINDER_SINK is set (file:<path> or smtp://host:port).")
+            elif worker.running:
+                st.caption(f"Members are reminded {reminders.REMINDER_DAYS} days before expiry, "
+                           f"sent to {reminders.REMINDER_SINK}.")
+                # the worker runs it on its own thread; this page doesn't wait
+                if st.button("Send reminders now"):
+                    worker.wake()
+                    st.info("Reminder run requested; refresh to see the result.")
+            else:
+                st.info("The reminder worker is disabled (GYM_REMINDER_INTERVAL=0); run `python reminders.py run`.")
+            if worker.last_result:
+                st.json(worker.last_result)
+            if worker.last_error:
+                st.warning(f"Last reminder run failed: {worker.last_error}")
+
+        elif admin_actions == "Equipment Usage":
+            st.subheader("Equipment Demand vs. Capacity")
+            st.caption("Demand: one unit of the workout's equipment per enrolled member (the trainer's active members "
+                       "minus those who skipped the class), at the busiest moment of the day; classes without "
+                       "times count for the whole day.")
+            today = datetime.date.today()
+            dates = st.date_input("Days", (today, today + datetime.timedelta(days=13)), key="usage_range")
+            if len(dates) == 2:
+                demand = get_demand_cache().get(cur, *dates)
+                if demand.empty:
+                    st.info("No classes with equipment in this period.")
+                else:
+                    usage = equipment_usage.compare(demand, equipment_usage.load_stock(cur))
+                    over = usage[usage["over_subscribed"]]
+                    m1, m2 = st.columns(2)
+                    m1.metric("Over-subscribed day/equipment slots", len(over))
+                    m2.metric("Units short (worst slot)", int(over["shortfall"].max()) if len(over) else 0)
+                    columns = {"date": "Date", "equipment_name": "Equipment", "classes": "Classes", "demand": "Peak demand",
+                               "stock": "Stock", "utilization": "Utilization", "shortfall": "Short by"}
+                    if len(over):
+                        st.markdown("**Over-subscribed**")
+                        st.dataframe(over[list(columns)].rename(columns=columns), use_container_width=True, hide_index=True)
+                    st.markdown("**Peak utilization per equipment**")
+                    st.bar_chart(usage.groupby("equipment_name")["utilization"].max())
+                    if st.checkbox("Show every day and equipment"):
+                        st.dataframe(usage[list(columns)].rename(columns=columns), use_container_width=True, hide_index=True)
+
+        elif admin_actions == "Revenue":
+            st.subheader("Revenue")
+            # fold in payments since the last visit; the report itself only reads the rollup tables
+            try:
+                refreshed = revenue.refresh(conn)
+                st.caption(f"Rollups include payments up to #{refreshed['watermark']} "
+                           f"({refreshed['payments']} new, {refreshed['seconds']}s)")
+            except Exception as e:
+                st.warning(f"Could not refresh the revenue rollups: {e}")
+
+            col1, col2, col3 = st.columns([1, 2, 1])
+            grain = col1.radio("Grain", ["monthly", "daily"], horizontal=True, format_func=str.title)
+            today = datetime.date.today()
+            default_start = today - datetime.timedelta(days=90 if grain == "daily" else 730)
+            dates = col2.date_input("Period", (default_start, today), key=f"revenue_range_{grain}")
+            dimension = col3.selectbox("Break down by", list(revenue.DIMENSIONS), format_func=str.title)
+
+            if len(dates) == 2:
+                frame = revenue.load(cur, grain, *dates)
+                if frame.empty:
+                    st.info("No revenue in this period.")
+                else:
+                    totals = revenue.trend(frame, window=7 if grain == "daily" else 3, freq=revenue.FREQ[grain])
+                    m1, m2, m3 = st.columns(3)
+                    m1.metric("Revenue (₹)", f"{totals['amount'].sum():,.0f}")
+                    m2.metric("Payments", f"{int(totals['payments'].sum()):,}")
+                    last_change = totals["change_pct"].dropna()
+                    m3.metric(f"Last {'day' if grain == 'daily' else 'month'} vs previous",
+                              f"{last_change.iloc[-1]:+.1f}%" if len(last_change) else "–")
+                    st.line_chart(totals[["amount", "moving_avg"]])
+                    st.bar_chart(revenue.breakdown(frame, dimension))
+                    st.dataframe(revenue.shares(frame, dimension).rename("Share (%)"), use_container_width=True)
+                    st.dataframe(totals.reset_index(), use_container_width=True, hide_index=True)
+
+            if st.button("Rebuild rollups from all payments"):
+                try:
+                    result = revenue.rebuild(conn)
+                    st.success(f"Rebuilt from {result['payments']} payment id(s) in {result['seconds']}s.")
+                except Exception as e:
+                    st.error(f"Error rebuilding rollups: {e}")
+
+        elif admin_actions == "Export Data":
+            st.subheader("Export Data")
+            dataset = st.selectbox("Dataset", list(data_export.DATASETS))
+            fmt = st.selectbox("Format", data_export.FORMATS)
+            start = end = None
+            if data_export.DATASETS[dataset]["date_column"] and st.checkbox("Filter by date"):
+                col1, col2 = st.columns(2)
+                start = col1.date_input("From", datetime.date.today() - datetime.timedelta(days=30))
+                end = col2.date_input("To", datetime.date.today())
+            if st.button("Prepare Export"):
+                # stream to a temp file on disk, then hand that file to the download button
+                with tempfile.TemporaryFile() as export_file:
+                    try:
+                        with st.spinner("Exporting..."):
+                            rows = data_export.export(conn, dataset, fmt, export_file, start, end)
+                        size_mb = export_file.tell() / 2 ** 20
+                        export_file.seek(0)
+                        st.success(f"{rows} row(s) exported ({size_mb:.1f} MB).")
+                        if size_mb > data_export.DOWNLOAD_LIMIT_MB:
+                            # the download button would hold it all in the server's memory
+                            st.warning(f"Too large to download here (over {data_export.DOWNLOAD_LIMIT_MB} MB); run "
+                                       f"`python data_export.py {dataset} --format {fmt} -o {dataset}.{fmt}` instead.")
+                        else:
+                            st.download_button("Download", export_file.read(), file_name=f"{dataset}.{fmt}")
+                    except Exception as e:
+                        st.error(f"Error exporting data: {e}")
+
+        elif admin_actions == "Performance":
+            st.subheader("Query Performance")
+            log = get_pool().query_log
+            records = log.records()
+            st.caption(f"{len(records)} statement(s) in the buffer (last {querylog.QUERY_LOG_SIZE} are kept)"
+                       + (f", also logged to {querylog.QUERY_LOG_FILE}" if querylog.QUERY_LOG_FILE else ""))
+            if st.button("Clear"):
+                log.clear()
+                st.rerun()
 
-    cur.close()
-    conn.close()
+            st.write("**Top queries by total time**")
+            top = log.top_queries()
+            if top:
+                st.dataframe(top, use_container_width=True, hide_index=True)
+            else:
+                st.info("No queries recorded yet.")
+
+            st.write("**Queries per rerun**")
+            runs = log.reruns(limit=200)
+            if runs:
+                counts = sorted(run["queries"] for run in runs)
+                col1, col2, col3 = st.columns(3)
+                col1.metric("Mean", round(sum(counts) / len(counts), 1))
+                col2.metric("p95", counts[min(len(counts) - 1, int(0.95 * len(counts)))])
+                col3.metric("Max", counts[-1])
+                for run in runs:
+                    run["started"] = datetime.datetime.fromtimestamp(run["started"]).strftime("%H:%M:%S")
+                st.dataframe(runs[:50], use_container_width=True, hide_index=True)
+
+            st.write("**Slow query outliers**")
+            threshold = st.slider("Slower than (ms)", 10, 2000, 100, step=10)
+            slow = log.slow_queries(threshold_ms=threshold)
+            if slow:
+                st.dataframe(slow, use_container_width=True, hide_index=True)
+            else:
+                st.info("No slow queries.")
+    finally:
+        cur.close()
+        conn.close()
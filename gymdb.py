@@ -0,0 +1,283 @@
+# gymdb.py
+# Shared database access for the Streamlit apps and the command line tools.
+import os
+import threading
+import time
+
+import mysql.connector
+
+import querylog
+
+# --- Configuration: everything can be overridden through env vars ---
+DB_HOST = os.environ.get("GYM_DB_HOST", "localhost")
+DB_USER = os.environ.get("GYM_DB_USER", "root")
+DB_PASSWORD = os.environ.get("GYM_DB_PASSWORD", "<your-db-password-here>")  # set env var in prod
+DB_NAME = os.environ.get("GYM_DB_NAME", "gym")
+
+# Pool tuning
+DB_POOL_SIZE = int(os.environ.get("GYM_DB_POOL_SIZE", "8"))
+DB_POOL_TIMEOUT = float(os.environ.get("GYM_DB_POOL_TIMEOUT", "10"))          # seconds to wait for a free connection
+DB_POOL_PING_AFTER = float(os.environ.get("GYM_DB_POOL_PING_AFTER", "30"))    # ping connections idle longer than this
+DB_POOL_MAX_IDLE = float(os.environ.get("GYM_DB_POOL_MAX_IDLE", "300"))       # close connections idle longer than this
+DB_POOL_MAX_AGE = float(os.environ.get("GYM_DB_POOL_MAX_AGE", "3600"))        # close connections older than this
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+# Thin proxy handed out by the pool. Behaves like a mysql connection, but
+# close() gives the underlying connection back to the pool instead of dropping it.
+class PooledConnection:
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+
+    def __getattr__(self, name):
+        raw = self.__dict__.get("_raw")
+        if raw is None:
+            raise AttributeError(f"connection already returned to pool ({name})")
+        return getattr(raw, name)
+
+    # cursors are instrumented when the pool has a query log
+    def cursor(self, *args, **kwargs):
+        cursor = self._raw.cursor(*args, **kwargs)
+        if self._pool.query_log is not None:
+            cursor = querylog.InstrumentedCursor(cursor, self._pool.query_log)
+        return cursor
+
+    def close(self):
+        raw, self._raw = self._raw, None
+        if raw is not None:
+            self._pool._release(raw, self._created_at)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Process-wide connection pool.
+# Connections are reused LIFO, pinged when they have sat idle for a while and
+# recycled once they are too old or have been idle too long.
+class ConnectionPool:
+    def __init__(self, size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT, ping_after=DB_POOL_PING_AFTER,
+                 max_idle=DB_POOL_MAX_IDLE, max_age=DB_POOL_MAX_AGE, query_log=None, **connect_args):
+        self.size = size
+        self.query_log = query_log
+        self.timeout = timeout
+        self.ping_after = ping_after
+        self.max_idle = max_idle
+        self.max_age = max_age
+        self.connect_args = {
+            "host": DB_HOST,
+            "user": DB_USER,
+            "password": DB_PASSWORD,
+            "database": DB_NAME,
+        }
+        self.connect_args.update(connect_args)
+
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = []  # (raw, created_at, last_used)
+        self._metrics = {
+            "checkouts": 0,
+            "waits": 0,
+            "wait_seconds": 0.0,
+            "timeouts": 0,
+            "created": 0,
+            "recycled_idle": 0,
+            "recycled_stale": 0,
+            "failed_health_checks": 0,
+            "in_use": 0,
+        }
+
+    def _bump(self, key, amount=1):
+        with self._lock:
+            self._metrics[key] += amount
+
+    def _open(self):
+        raw = mysql.connector.connect(**self.connect_args)
+        self._bump("created")
+        return raw, time.monotonic()
+
+    @staticmethod
+    def _discard(raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    # Borrow a connection. Blocks up to `timeout` seconds when every slot is in use.
+    def connection(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        if not self._slots.acquire(blocking=False):
+            self._bump("waits")
+            started = time.monotonic()
+            acquired = self._slots.acquire(timeout=timeout)
+            self._bump("wait_seconds", time.monotonic() - started)
+            if not acquired:
+                self._bump("timeouts")
+                raise PoolTimeout(f"no database connection free after {timeout:.1f}s (pool size {self.size})")
+
+        try:
+            raw, created_at = self._checkout_idle()
+            if raw is None:
+                raw, created_at = self._open()
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._metrics["checkouts"] += 1
+            self._metrics["in_use"] += 1
+        return PooledConnection(self, raw, created_at)
+
+    # Pop the most recently used idle connection that is still healthy.
+    def _checkout_idle(self):
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None, None
+                raw, created_at, last_used = self._idle.pop()
+
+            now = time.monotonic()
+            if now - created_at > self.max_age:
+                self._bump("recycled_stale")
+                self._discard(raw)
+                continue
+            if now - last_used > self.max_idle:
+                self._bump("recycled_idle")
+                self._discard(raw)
+                continue
+            if now - last_used > self.ping_after:
+                try:
+                    raw.ping(reconnect=False)
+                except Exception:
+                    self._bump("failed_health_checks")
+                    self._discard(raw)
+                    continue
+            return raw, created_at
+
+    def _release(self, raw, created_at):
+        try:
+            # never hand an open transaction to the next borrower
+            if raw.in_transaction:
+                raw.rollback()
+            keep = time.monotonic() - created_at <= self.max_age
+        except Exception:
+            keep = False
+
+        with self._lock:
+            self._metrics["in_use"] -= 1
+            if keep:
+                self._idle.append((raw, created_at, time.monotonic()))
+            else:
+                self._metrics["recycled_stale"] += 1
+        if not keep:
+            self._discard(raw)
+        self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._metrics)
+            stats["idle"] = len(self._idle)
+        stats["size"] = self.size
+        return stats
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for raw, _, _ in idle:
+            self._discard(raw)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+# Process-wide pool for scripts and CLI tools (the Streamlit apps cache theirs with st.cache_resource)
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+
+def get_connection():
+    return get_pool().connection()
+
+
+# --- Keyset pagination ---
+# Rows after the cursor `after` (the (sort value, key) pair of the previous page's last row),
+# ordered by (sort, key). Unlike OFFSET this seeks straight to the page, however deep it is.
+# `table`, `columns`, `key` and `sort` must be trusted identifiers; `where` is an optional
+# extra predicate with %s placeholders whose values are in `params`.
+
+# (sql, args, selected columns) of one page; the query fetches one extra row to know whether
+# another page exists, and also selects `sort` and `key` for the next cursor
+def page_query(table, columns, key, page_size, after=None, sort=None, descending=False, where="", params=()):
+    sort = sort or key
+    select = list(columns)
+    for col in (sort, key):
+        if col not in select:
+            select.append(col)
+
+    clauses, args = [], list(params)
+    if where:
+        clauses.append(f"({where})")
+    if after is not None:
+        last_sort, last_key = after
+        if sort == key:
+            clauses.append(f"{key} {'<' if descending else '>'} %s")
+            args.append(last_key)
+        elif not descending:
+            # ascending: NULL sort values come first
+            if last_sort is None:
+                clauses.append(f"(({sort} IS NULL AND {key} > %s) OR {sort} IS NOT NULL)")
+                args.append(last_key)
+            else:
+                clauses.append(f"({sort} > %s OR ({sort} = %s AND {key} > %s))")
+                args.extend([last_sort, last_sort, last_key])
+        else:
+            # descending: NULL sort values come last
+            if last_sort is None:
+                clauses.append(f"({sort} IS NULL AND {key} < %s)")
+                args.append(last_key)
+            else:
+                clauses.append(f"({sort} < %s OR ({sort} = %s AND {key} < %s) OR {sort} IS NULL)")
+                args.extend([last_sort, last_sort, last_key])
+
+    direction = "DESC" if descending else "ASC"
+    order = f"{key} {direction}" if sort == key else f"{sort} {direction}, {key} {direction}"
+    sql = f"SELECT {', '.join(select)} FROM {table}"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += f" ORDER BY {order} LIMIT %s"
+    return sql, tuple(args) + (page_size + 1,), select
+
+
+# Returns (rows, cursor for the next page or None).
+def fetch_page(cur, table, columns, key, page_size, after=None, sort=None, descending=False, where="", params=()):
+    sql, args, select = page_query(table, columns, key, page_size, after, sort, descending, where, params)
+    cur.execute(sql, args)
+    rows = cur.fetchall()
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = (rows[-1][select.index(sort or key)], rows[-1][select.index(key)])
+    rows = [row[:len(columns)] for row in rows]
+    return rows, next_cursor
+
+
+def count_rows(cur, table, where="", params=()):
+    sql = f"SELECT COUNT(*) FROM {table}"
+    if where:
+        sql += f" WHERE {where}"
+    cur.execute(sql, tuple(params))
+    return cur.fetchone()[0]
@@ -0,0 +1,148 @@
+# member_dashboard.py
+# Everything the Member panel shows, loaded in a single round trip.
+import datetime
+import json
+import threading
+from dataclasses import dataclass, field
+
+DASHBOARD_SQL = """
+    SELECT M.memberID, M.member_name, M.gender, M.phone, M.email, M.membership_id, M.membership_status,
+           M.trainer_id, M.height, M.weight, M.bmi, M.payment_id, M.age,
+           T.trainer_name, T.gender, T.phone, T.email,
+           S.scheme_name, S.duration, S.fee,
+           C.date, W.workout_name, E.equipment_name,
+           (SELECT JSON_ARRAYAGG(JSON_OBJECT('amount', P.amount, 'date', P.payment_date, 'method', P.payment_method))
+            FROM payment P WHERE P.member_id = M.memberID) AS payments
+    FROM member M
+    LEFT JOIN trainer T ON T.trainer_id = M.trainer_id
+    LEFT JOIN membership_schemes S ON S.scheme_id = M.membership_id
+    -- the trainer's next upcoming class that the member hasn't dropped
+    LEFT JOIN classes C ON C.class_id = (
+        SELECT C2.class_id FROM classes C2
+        WHERE C2.trainer_id = M.trainer_id AND C2.date >= CURDATE()
+          AND NOT EXISTS (SELECT 1 FROM class_enrollment CE
+                          WHERE CE.class_id = C2.class_id AND CE.member_id = M.memberID AND CE.status = 'Dropped')
+        ORDER BY C2.date ASC, C2.class_id ASC LIMIT 1
+    )
+    LEFT JOIN workouts W ON W.workout_id = C.workout_id
+    LEFT JOIN equipment E ON E.equipment_id = W.equipment_id
+    WHERE M.email = %s
+"""
+
+
+@dataclass
+class Trainer:
+    name: str
+    gender: str
+    phone: str
+    email: str
+
+
+@dataclass
+class Scheme:
+    name: str
+    duration: int
+    fee: int
+
+
+@dataclass
+class Payment:
+    amount: int
+    date: datetime.date
+    method: str
+
+
+@dataclass
+class MemberDashboard:
+    member_id: int
+    name: str
+    gender: str
+    phone: str
+    email: str
+    scheme_id: int
+    status: str
+    trainer_id: int
+    height: float
+    weight: float
+    bmi: float
+    payment_id: int
+    age: int
+    trainer: Trainer = None
+    scheme: Scheme = None
+    class_date: datetime.date = None
+    workout_name: str = None
+    equipment_name: str = None
+    payments: list = field(default_factory=list)  # newest first
+    upcoming: list = None  # scheduling.upcoming_classes rows, loaded on first use
+
+    @property
+    def is_active(self):
+        return self.status == "Active"
+
+
+def load_dashboard(cur, email):
+    cur.execute(DASHBOARD_SQL, (email,))
+    row = cur.fetchone()
+    if not row:
+        return None
+
+    dash = MemberDashboard(*row[:13])
+    if row[13] is not None:
+        dash.trainer = Trainer(*row[13:17])
+    if row[17] is not None:
+        dash.scheme = Scheme(*row[17:20])
+    if row[21] is not None:
+        dash.class_date, dash.workout_name, dash.equipment_name = row[20:23]
+
+    payments = json.loads(row[23]) if row[23] else []
+    dash.payments = sorted(
+        (Payment(p["amount"], datetime.date.fromisoformat(p["date"]) if p["date"] else None, p["method"]) for p in payments),
+        key=lambda p: p.date or datetime.date.min,
+        reverse=True,
+    )
+    return dash
+
+
+# --- Invalidation ---
+# Sessions keep their dashboard in st.session_state together with the version it was loaded at.
+# Writers bump the member's version (payments, admin edits) or the global one (edits to shared
+# tables such as trainers, schemes or classes); a session reloads only when its version is stale.
+_lock = threading.Lock()
+_versions = {}
+_generation = 0
+
+
+def version(member_id):
+    with _lock:
+        return (_generation, _versions.get(member_id, 0))
+
+
+def invalidate(member_id):
+    try:
+        member_id = int(member_id)
+    except (TypeError, ValueError):
+        # IDs typed into the admin forms may not parse; be safe and drop everything
+        invalidate_all()
+        return
+    with _lock:
+        _versions[member_id] = _versions.get(member_id, 0) + 1
+
+
+def invalidate_all():
+    global _generation
+    with _lock:
+        _generation += 1
+
+
+# Return the session's cached dashboard, reloading it only when it has been invalidated.
+def get_dashboard(session_state, cur, email):
+    cached = session_state.get("member_dashboard")
+    if cached is not None:
+        dash, loaded_version = cached
+        if dash.email == email and loaded_version == version(dash.member_id):
+            return dash
+
+    dash = load_dashboard(cur, email)
+    if dash is not None:
+        session_state["member_dashboard"] = (dash, version(dash.member_id))
+    return dash
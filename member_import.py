@@ -0,0 +1,199 @@
+# member_import.py
+# Bulk member import from CSV, for onboarding a branch or migrating from another system.
+#
+#   python member_import.py members.csv [--chunk-size 1000] [--rejects rejects.csv]
+#
+# Expected header (same fields as the Admin "Add Member" form):
+#   member_name,gender,phone,email,password,membership_id,trainer_id,height,weight,age
+import argparse
+import csv
+import time
+
+import numpy as np
+
+import gymdb
+
+COLUMNS = ["member_name", "gender", "phone", "email", "password", "membership_id", "trainer_id", "height", "weight", "age"]
+REQUIRED = ["member_name", "email", "password"]
+GENDERS = {"M": "M", "F": "F", "O": "O", "OTHER": "O"}
+IMPORT_CHUNK_SIZE = 1000
+
+
+def _optional_int(value):
+    return int(value) if value not in (None, "") else None
+
+
+def _optional_float(value):
+    return float(value) if value not in (None, "") else 0.0
+
+
+# Validate and normalise one CSV row. Returns (record, None) or (None, reason).
+def parse_row(row):
+    missing = [c for c in REQUIRED if not (row.get(c) or "").strip()]
+    if missing:
+        return None, f"missing {', '.join(missing)}"
+    gender = GENDERS.get((row.get("gender") or "").strip().upper())
+    if gender is None:
+        return None, f"invalid gender {row.get('gender')!r}"
+    try:
+        record = {
+            "member_name": row["member_name"].strip(),
+            "gender": gender,
+            "phone": (row.get("phone") or "").strip() or None,
+            "email": row["email"].strip().lower(),
+            "password": row["password"],
+            "membership_id": _optional_int(row.get("membership_id")),
+            "trainer_id": _optional_int(row.get("trainer_id")),
+            "height": _optional_float(row.get("height")),
+            "weight": _optional_float(row.get("weight")),
+            "age": _optional_int(row.get("age")),
+        }
+    except ValueError as e:
+        return None, f"invalid number ({e})"
+    if "@" not in record["email"]:
+        return None, "invalid email"
+    return record, None
+
+
+# BMI for a whole chunk at once; 0 where height is missing (same rule as the Add Member form)
+def compute_bmi(heights, weights):
+    heights = np.asarray(heights, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    bmi = np.zeros_like(heights)
+    np.divide(weights * 10000, heights * heights, out=bmi, where=heights > 0)
+    return np.round(bmi, 2)
+
+
+def _existing(cur, table, column, values):
+    values = [v for v in values if v]
+    if not values:
+        return set()
+    placeholders = ", ".join(["%s"] * len(values))
+    cur.execute(f"SELECT {column} FROM {table} WHERE {column} IN ({placeholders})", values)
+    return {row[0].lower() if column == "email" else row[0] for row in cur.fetchall()}
+
+
+# Insert one validated chunk: duplicate emails/phones are filtered with one lookup per table,
+# then login and member rows go in with executemany inside a single transaction.
+# Returns (inserted records, rejected [(line, reason)]).
+def _insert_chunk(conn, chunk):
+    cur = conn.cursor()
+    try:
+        taken_emails = _existing(cur, "login", "email", [r["email"] for _, r in chunk])
+        taken_phones = _existing(cur, "member", "phone", [r["phone"] for _, r in chunk])
+        rows, rejected = [], []
+        for line, record in chunk:
+            if record["email"] in taken_emails:
+                rejected.append((line, "email already exists"))
+            elif record["phone"] and record["phone"] in taken_phones:
+                rejected.append((line, "phone already exists"))
+            else:
+                rows.append(record)
+        if not rows:
+            return 0, rejected
+
+        bmi = compute_bmi([r["height"] for r in rows], [r["weight"] for r in rows])
+        cur.executemany("INSERT INTO login (email, password, category) VALUES (%s, %s, 'Member')",
+                        [(r["email"], r["password"]) for r in rows])
+        # new members are Inactive until their first payment
+        cur.executemany("""
+            INSERT INTO member (member_name, gender, phone, email, membership_id, trainer_id, height, weight, bmi, age, membership_status)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'Inactive')
+        """, [(r["member_name"], r["gender"], r["phone"], r["email"], r["membership_id"], r["trainer_id"],
+               r["height"], r["weight"], float(b), r["age"]) for r, b in zip(rows, bmi)])
+        conn.commit()
+        return len(rows), rejected
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+
+# Stream `lines` (an open text file or any iterable of CSV lines) into the database in
+# chunked transactions. `progress` is called after every chunk with the running totals.
+def import_members(conn, lines, chunk_size=IMPORT_CHUNK_SIZE, progress=None):
+    started = time.perf_counter()
+    totals = {"rows": 0, "inserted": 0, "rejected": 0, "failed_chunks": 0, "rows_per_sec": 0.0, "seconds": 0.0}
+    rejects = []
+    seen_emails, seen_phones = set(), set()
+
+    def report():
+        totals["seconds"] = round(time.perf_counter() - started, 3)
+        totals["rows_per_sec"] = round(totals["rows"] / totals["seconds"], 1) if totals["seconds"] else 0.0
+        if progress:
+            progress(dict(totals))
+
+    def flush(chunk):
+        try:
+            inserted, rejected = _insert_chunk(conn, chunk)
+        except Exception as e:
+            totals["failed_chunks"] += 1
+            inserted, rejected = 0, [(line, f"chunk failed: {e}") for line, _ in chunk]
+        totals["inserted"] += inserted
+        totals["rejected"] += len(rejected)
+        rejects.extend(rejected)
+        report()
+
+    reader = csv.DictReader(lines)
+    missing = [c for c in REQUIRED if c not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"CSV header is missing column(s): {', '.join(missing)}")
+
+    chunk = []
+    # header is line 1
+    for line, row in enumerate(reader, start=2):
+        totals["rows"] += 1
+        record, reason = parse_row(row)
+        if record is not None:
+            if record["email"] in seen_emails:
+                record, reason = None, "duplicate email in file"
+            elif record["phone"] and record["phone"] in seen_phones:
+                record, reason = None, "duplicate phone in file"
+        if record is None:
+            totals["rejected"] += 1
+            rejects.append((line, reason))
+            continue
+        seen_emails.add(record["email"])
+        if record["phone"]:
+            seen_phones.add(record["phone"])
+        chunk.append((line, record))
+        if len(chunk) >= chunk_size:
+            flush(chunk)
+            chunk = []
+    if chunk:
+        flush(chunk)
+    report()
+    return totals, rejects
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import members from a CSV file")
+    parser.add_argument("csv_file")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    parser.add_argument("--rejects", help="write rejected rows (line, reason) to this CSV file")
+    args = parser.parse_args()
+
+    def progress(totals):
+        print(f"\r{totals['rows']} rows  {totals['inserted']} inserted  {totals['rejected']} rejected  "
+              f"{totals['rows_per_sec']} rows/s", end="", flush=True)
+
+    conn = gymdb.get_connection()
+    try:
+        with open(args.csv_file, newline="", encoding="utf-8-sig") as f:
+            totals, rejects = import_members(conn, f, args.chunk_size, progress)
+    finally:
+        conn.close()
+    print()
+    print(f"done in {totals['seconds']}s")
+
+    if args.rejects and rejects:
+        with open(args.rejects, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["line", "reason"])
+            writer.writerows(rejects)
+        print(f"{len(rejects)} rejected row(s) written to {args.rejects}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+# member_search.py
+# In-memory member lookup by partial name, phone or email for the admin / front desk.
+# Each member's name, phone digits and email words are indexed as character trigrams: a query
+# word is looked up by intersecting its trigram postings and checked as a substring, so
+# "smi", "98765" or "gmail" all work. One-letter words ("John S") match the start of a word.
+# Queries that match nothing exactly (typos) first retry with name words one edit away
+# (substitution, insertion, deletion or swapped letters: "jhon" -> "john"), then fall back to
+# trigram similarity. The app keeps the index in sync on Add / Update / Remove Member.
+import bisect
+import heapq
+import itertools
+import math
+import os
+import re
+import threading
+import time
+from array import array
+from collections import Counter
+
+MEMBER_SEARCH_TTL = float(os.environ.get("GYM_MEMBER_SEARCH_TTL", "900"))  # seconds between full rebuilds
+MIN_SIMILARITY = 0.5  # share of the query's trigrams a fuzzy match must contain
+MAX_RANKED = 2000     # a broader query ranks only its first MAX_RANKED matches (by memberID)
+MAX_CORRECTIONS = 3   # known name words tried per misspelt query word
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def normalise(name, phone, email):
+    digits = re.sub(r"\D", "", phone or "")
+    return " ".join(_WORD.findall((name or "").lower()) + ([digits] if digits else []) + _WORD.findall((email or "").lower()))
+
+
+# Trigrams of every word of `text`, each word padded with spaces so word starts are their own grams
+def document_grams(text):
+    grams = set()
+    for word in text.split():
+        padded = f" {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+# Grams a document must contain for `word` to be a substring of it
+def query_grams(word):
+    if len(word) < 3:
+        return [f" {word}"] if len(word) == 2 else []
+    return list({word[i:i + 3] for i in range(len(word) - 2)})
+
+
+# Grams for similarity matching: also the word-start gram, since typos are rarely in the first letters
+def fuzzy_grams(word):
+    return query_grams(word) + ([f" {word[:2]}"] if len(word) >= 3 else [])
+
+
+# The word and every string one deletion away from it: two words are at most one edit
+# (or one swap of adjacent letters) apart only if these sets share an element
+def deletions(word):
+    return {word} | {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+# Edit distance counting a swap of adjacent letters as one edit (optimal string alignment)
+def edit_distance(a, b):
+    previous2, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def query_words(query):
+    query = (query or "").strip().lower()
+    # a phone number typed with separators is one number
+    if re.fullmatch(r"[\d\s()+\-.]+", query):
+        digits = re.sub(r"\D", "", query)
+        return [digits] if digits else []
+    return _WORD.findall(query)
+
+
+# [(memberID, member_name, phone, email)], in memberID order
+def load_members(cur):
+    cur.execute("SELECT memberID, member_name, phone, email FROM member ORDER BY memberID")
+    return cur.fetchall()
+
+
+class MemberIndex:
+    def __init__(self, loader, ttl=MEMBER_SEARCH_TTL):
+        self._loader = loader  # (cur) -> [(memberID, member_name, phone, email)]; cur may be None
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._built_at = None
+        self._members = {}  # memberID -> (memberID, member_name, phone, email)
+        self._docs = {}     # memberID -> normalised text
+        self._grams = {}    # trigram -> sorted array of memberIDs
+        self._vocab = {}    # name word -> number of members whose name contains it
+        self._deletes = {}  # deletions() variant -> name words, for typo correction
+
+    def __len__(self):
+        return len(self._members)
+
+    @staticmethod
+    def _name_words(name):
+        return set(_WORD.findall((name or "").lower()))
+
+    def _add_word(self, word):
+        self._vocab[word] = self._vocab.get(word, 0) + 1
+        if self._vocab[word] == 1:
+            for variant in deletions(word):
+                self._deletes.setdefault(variant, set()).add(word)
+
+    def _drop_word(self, word):
+        self._vocab[word] -= 1
+        if not self._vocab[word]:
+            del self._vocab[word]
+            for variant in deletions(word):
+                self._deletes[variant].discard(word)
+                if not self._deletes[variant]:
+                    del self._deletes[variant]
+
+    def _add(self, row):
+        member_id = row[0]
+        for word in self._name_words(row[1]):
+            self._add_word(word)
+        self._members[member_id] = tuple(row)
+        self._docs[member_id] = normalise(*row[1:])
+        for gram in document_grams(self._docs[member_id]):
+            postings = self._grams.setdefault(gram, array("q"))
+            postings.insert(bisect.bisect_left(postings, member_id), member_id)
+
+    def _remove(self, member_id):
+        if member_id not in self._members:
+            return
+        for word in self._name_words(self._members.pop(member_id)[1]):
+            self._drop_word(word)
+        for gram in document_grams(self._docs.pop(member_id)):
+            postings = self._grams[gram]
+            i = bisect.bisect_left(postings, member_id)
+            if i < len(postings) and postings[i] == member_id:
+                del postings[i]
+            if not postings:
+                del self._grams[gram]
+
+    # Full rebuild from the loader (rows arrive in memberID order, so postings stay sorted),
+    # reading with the caller's cursor if it passes one
+    def rebuild(self, cur=None):
+        members, docs, grams, vocab, deletes = {}, {}, {}, {}, {}
+        for row in self._loader(cur):
+            member_id = row[0]
+            members[member_id] = tuple(row)
+            docs[member_id] = normalise(*row[1:])
+            for gram in document_grams(docs[member_id]):
+                grams.setdefault(gram, []).append(member_id)
+            for word in self._name_words(row[1]):
+                vocab[word] = vocab.get(word, 0) + 1
+        grams = {gram: array("q", sorted(ids) if ids != sorted(ids) else ids) for gram, ids in grams.items()}
+        for word in vocab:
+            for variant in deletions(word):
+                deletes.setdefault(variant, set()).add(word)
+        with self._lock:
+            self._members, self._docs, self._grams = members, docs, grams
+            self._vocab, self._deletes = vocab, deletes
+            self._built_at = time.monotonic()
+
+    def _ensure_fresh(self, cur=None):
+        if self._built_at is None or time.monotonic() - self._built_at > self.ttl:
+            self.rebuild(cur)
+
+    # Drop everything; the next search rebuilds (e.g. after a bulk import)
+    def invalidate(self):
+        with self._lock:
+            self._built_at = None
+
+    def upsert(self, member_id, name, phone, email):
+        with self._lock:
+            if self._built_at is None:
+                return
+            self._remove(member_id)
+            self._add((member_id, name, phone, email))
+
+    def remove(self, member_id):
+        with self._lock:
+            self._remove(member_id)
+
+    # Re-read one member after a write and update (or drop) its entry
+    def sync(self, cur, member_id):
+        cur.execute("SELECT memberID, member_name, phone, email FROM member WHERE memberID = %s", (member_id,))
+        row = cur.fetchone()
+        if row:
+            self.upsert(*row)
+        else:
+            self.remove(int(member_id))
+
+    def get(self, member_id, cur=None):
+        self._ensure_fresh(cur)
+        return self._members.get(member_id)
+
+    # Rank: words matching the start of a name word first, then the start of any word
+    # (phone, email), then anywhere; ties by name.
+    def _rank(self, member_id, words):
+        doc = " " + self._docs[member_id]
+        name_words = len(_WORD.findall((self._members[member_id][1] or "").lower()))
+        name_part = " " + " ".join(doc.split()[:name_words])
+        score = 0
+        for word in words:
+            if (" " + word) in name_part:
+                continue
+            score += 1 if (" " + word) in doc else 2
+        return score, (self._members[member_id][1] or "").lower(), member_id
+
+    # Members containing every word of `words` (two or more characters each) whose document also
+    # has a word starting with each letter of `initials`, in memberID order
+    def _exact(self, words, initials=()):
+        postings = []
+        for word in words:
+            postings.extend(self._grams.get(gram, ()) for gram in query_grams(word))
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for ids in postings[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(ids)
+        # containing all of a word's trigrams doesn't guarantee the word itself is there
+        needles = [" " + w if len(w) < 3 else w for w in words] + [" " + c for c in initials]
+        matches = []
+        for member_id in sorted(candidates):
+            doc = " " + self._docs[member_id]
+            if all(needle in doc for needle in needles):
+                matches.append(member_id)
+                if len(matches) >= MAX_RANKED:
+                    break
+        return matches
+
+    # Known name words one edit (or one swap of adjacent letters) away from `word`, most common first
+    def _corrections(self, word):
+        if len(word) < 3:
+            return []
+        nearby = set()
+        for variant in deletions(word):
+            nearby.update(self._deletes.get(variant, ()))
+        nearby.discard(word)
+        close = [w for w in nearby if edit_distance(word, w) <= 1]
+        return heapq.nlargest(MAX_CORRECTIONS, close, key=lambda w: (self._vocab[w], w))
+
+    # Exact matches once misspelt words are replaced by known name words one edit away
+    def _corrected(self, words, initials):
+        options = []
+        for word in words:
+            corrections = self._corrections(word) if not self._exact([word]) else []
+            options.append([word] + corrections)
+        if all(len(choices) == 1 for choices in options):
+            return []
+        matches = set()
+        for combination in itertools.product(*options):
+            matches.update(self._exact(list(combination), initials))
+            if len(matches) >= MAX_RANKED:
+                break
+        return sorted(matches)[:MAX_RANKED]
+
+    # (-shared trigrams, name, memberID) of every member containing at least MIN_SIMILARITY of
+    # the query's trigrams; counting runs over the postings in C via Counter
+    def _fuzzy(self, words):
+        grams = set(gram for word in words for gram in fuzzy_grams(word))
+        if len(grams) < 3:
+            return []
+        needed = math.ceil(MIN_SIMILARITY * len(grams))
+        counts = Counter()
+        for gram in grams:
+            counts.update(self._grams.get(gram, ()))
+        return [(-shared, (self._members[member_id][1] or "").lower(), member_id)
+                for member_id, shared in counts.items() if shared >= needed]
+
+    # Top `k` members for `query`, best first: [(memberID, member_name, phone, email)].
+    # One-letter words only narrow the matches of the longer ones.
+    def search(self, query, k=20, cur=None):
+        self._ensure_fresh(cur)
+        words = query_words(query)
+        initials = [w for w in words if len(w) == 1]
+        words = [w for w in words if len(w) > 1]
+        if not words:
+            return []
+        with self._lock:
+            matches = self._exact(words, initials) or self._corrected(words, initials)
+            if matches:
+                ranked = heapq.nsmallest(k, matches, key=lambda member_id: self._rank(member_id, words + initials))
+            else:
+                ranked = [member_id for _, _, member_id in heapq.nsmallest(k, self._fuzzy(words))]
+            return [self._members[member_id] for member_id in ranked]
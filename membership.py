@@ -0,0 +1,144 @@
+# membership.py
+# Membership status rules and the bulk status sweep.
+#
+#   python membership.py sweep                 # one pass over every member
+#   python membership.py sweep --every 3600    # keep sweeping once an hour
+import argparse
+import datetime
+import os
+import threading
+import time
+
+import gymdb
+
+INACTIVE_AFTER_MONTHS = 15
+SWEEP_CHUNK_SIZE = int(os.environ.get("GYM_STATUS_SWEEP_CHUNK", "5000"))
+SWEEP_INTERVAL = float(os.environ.get("GYM_STATUS_SWEEP_INTERVAL", "3600"))  # seconds, 0 disables the scheduler
+
+
+# Earliest last-payment date that still counts as Active on `today`. A payment more than 15 calendar
+# months back (by year and month) is before the first day of the month 15 months back, so the rule
+# becomes a plain date comparison the database can evaluate (and index) directly.
+def active_cutoff(today=None):
+    today = today or datetime.date.today()
+    months = today.year * 12 + (today.month - 1) - INACTIVE_AFTER_MONTHS
+    return datetime.date(months // 12, months % 12 + 1, 1)
+
+
+# Status of members start <= memberID <= end from their latest payment against the cutoff;
+# only rows whose stored status differs are written
+SWEEP_SQL = """
+    UPDATE member M
+    LEFT JOIN (
+        SELECT member_id, MAX(payment_date) AS last_paid
+        FROM payment
+        WHERE member_id BETWEEN %s AND %s
+        GROUP BY member_id
+    ) P ON P.member_id = M.memberID
+    SET M.membership_status = IF(P.last_paid >= %s, 'Active', 'Inactive')
+    WHERE M.memberID BETWEEN %s AND %s
+      AND NOT (M.membership_status <=> IF(P.last_paid >= %s, 'Active', 'Inactive'))
+"""
+
+
+# Recompute Active/Inactive for every member from their latest payment.
+# Works through memberID ranges of `chunk_size`, one set-based UPDATE and one commit
+# per chunk, and only touches rows whose stored status is actually different.
+def sweep_statuses(conn, chunk_size=SWEEP_CHUNK_SIZE, today=None):
+    started = time.perf_counter()
+    cutoff = active_cutoff(today)
+    cur = conn.cursor()
+    cur.execute("SELECT MIN(memberID), MAX(memberID), COUNT(*) FROM member")
+    low, high, members = cur.fetchone()
+
+    changed = 0
+    chunks = 0
+    if members:
+        start = low
+        while start <= high:
+            end = start + chunk_size - 1
+            cur.execute(SWEEP_SQL, (start, end, cutoff, start, end, cutoff))
+            changed += cur.rowcount
+            conn.commit()
+            chunks += 1
+            start = end + 1
+    cur.close()
+
+    return {
+        "members": members,
+        "changed": changed,
+        "chunks": chunks,
+        "cutoff": cutoff.isoformat(),
+        "seconds": round(time.perf_counter() - started, 3),
+        "finished_at": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+# Background thread that runs the sweep every `interval` seconds on a pooled connection.
+# The Streamlit app starts one per server process; the CLI below covers cron-style use.
+class StatusSweeper:
+    def __init__(self, pool, interval=SWEEP_INTERVAL, chunk_size=SWEEP_CHUNK_SIZE, on_change=None):
+        self.pool = pool
+        self.on_change = on_change  # called after a sweep that changed at least one row
+        self.interval = interval
+        self.chunk_size = chunk_size
+        self.last_result = None
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self):
+        # one sweep at a time, whether triggered by the schedule or by an admin
+        with self._lock:
+            conn = self.pool.connection()
+            try:
+                result = sweep_statuses(conn, self.chunk_size)
+            finally:
+                conn.close()
+            self.last_result = result
+            if result["changed"] and self.on_change:
+                self.on_change()
+            return result
+
+    # first pass right away (statuses may be stale after downtime), then every `interval`
+    def _loop(self):
+        while True:
+            try:
+                self.run_once()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+            if self._stop.wait(self.interval):
+                break
+
+    def start(self):
+        if self.interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="status-sweeper", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute membership status for every member")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sweep = sub.add_parser("sweep", help="run the bulk status sweep")
+    sweep.add_argument("--chunk-size", type=int, default=SWEEP_CHUNK_SIZE)
+    sweep.add_argument("--every", type=float, default=0, help="repeat every N seconds instead of running once")
+    args = parser.parse_args()
+
+    sweeper = StatusSweeper(gymdb.get_pool(), interval=args.every, chunk_size=args.chunk_size)
+    while True:
+        result = sweeper.run_once()
+        print(f"{result['finished_at']}  members={result['members']}  changed={result['changed']}  "
+              f"chunks={result['chunks']}  {result['seconds']}s")
+        if not args.every:
+            break
+        time.sleep(args.every)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+# migrations.py
+# Versioned schema migrations and query-plan checks for the hot paths.
+#
+#   python migrations.py status     # applied / pending migrations
+#   python migrations.py migrate    # apply pending migrations (safe to re-run)
+#   python migrations.py verify     # EXPLAIN every hot query, exit 1 if one falls back to a full scan
+#
+# Migrations are migrations/NNNN_name.sql files, applied in order and recorded in schema_migrations.
+import argparse
+import datetime
+import os
+import re
+import sys
+
+from mysql.connector import errorcode, errors
+
+import class_slots
+import expiry
+import gymdb
+import member_dashboard
+import membership
+import reminders
+import revenue
+import scheduling
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+LOCK_NAME = "gym_schema_migrations"
+
+# "already there" errors: a database that predates a migration may already have the object,
+# so these are skipped and the migration is still recorded as applied
+ALREADY_APPLIED = {
+    errorcode.ER_TABLE_EXISTS_ERROR,
+    errorcode.ER_DUP_FIELDNAME,
+    errorcode.ER_DUP_KEYNAME,
+}
+
+
+class PlanRegression(Exception):
+    pass
+
+
+def discover():
+    migrations = []
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        match = re.match(r"^(\d+)_(\w+)\.sql$", filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(MIGRATIONS_DIR, filename)))
+    return migrations
+
+
+def split_statements(sql):
+    sql = "\n".join(line for line in sql.splitlines() if not line.strip().startswith("--"))
+    return [statement.strip() for statement in sql.split(";") if statement.strip()]
+
+
+def applied_versions(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT NOT NULL PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cur.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cur.fetchall()}
+
+
+# Apply every pending migration. Serialised across processes with a named lock, so several
+# app servers starting at once don't race. Returns the list of (version, name) applied.
+def migrate(conn, log=print):
+    cur = conn.cursor()
+    cur.execute("SELECT GET_LOCK(%s, 60)", (LOCK_NAME,))
+    if cur.fetchone()[0] != 1:
+        raise RuntimeError("could not acquire the schema migration lock")
+    applied = []
+    try:
+        done = applied_versions(cur)
+        for version, name, path in discover():
+            if version in done:
+                continue
+            with open(path) as f:
+                statements = split_statements(f.read())
+            for statement in statements:
+                try:
+                    cur.execute(statement)
+                except errors.DatabaseError as e:
+                    if e.errno not in ALREADY_APPLIED:
+                        raise
+                    if log:
+                        log(f"  {version:04d}_{name}: skipped, already present ({e.msg})")
+            cur.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)", (version, name))
+            conn.commit()
+            applied.append((version, name))
+            if log:
+                log(f"applied {version:04d}_{name}")
+    finally:
+        cur.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+        cur.fetchall()
+        cur.close()
+    return applied
+
+
+def status(conn):
+    cur = conn.cursor()
+    done = applied_versions(cur)
+    cur.close()
+    return [(version, name, version in done) for version, name, _ in discover()]
+
+
+# --- Plan verification ---
+# Every hot query of the app with representative parameters and the table aliases that must be
+# read through an index. A full scan (EXPLAIN type ALL) of one of them is a regression, except
+# on tables small enough (< SMALL_TABLE_ROWS) that the optimizer rightly prefers scanning.
+SMALL_TABLE_ROWS = 1000
+
+# Each query is the SQL the app runs, taken from the module that runs it; only the login and payment
+# history lookups are still written inline in the Streamlit pages.
+_DAY = datetime.date(2024, 6, 1)
+
+HOT_QUERIES = [
+    ("login", "SELECT * FROM login WHERE email = %s and password = %s", ("a@b.c", "x"), ["login"]),
+    ("member_dashboard", member_dashboard.DASHBOARD_SQL, ("a@b.c",), ["M", "P", "C2"]),
+    ("payment_history",
+     "SELECT amount, payment_date, payment_method FROM payment WHERE member_id = %s ORDER BY payment_date DESC",
+     (1,), ["payment"]),
+    ("status_sweep", membership.SWEEP_SQL,
+     (1, 5000, membership.active_cutoff(_DAY), 1, 5000, membership.active_cutoff(_DAY)), ["M", "payment"]),
+    ("member_upcoming_classes", scheduling.UPCOMING_SQL, (1, 1, scheduling.UPCOMING_LIMIT), ["C", "CE"]),
+    ("trainer_view_classes",
+     *gymdb.page_query(page_size=25, after=(_DAY, 1000), **scheduling.trainer_classes_query(
+         1, datetime.date(2024, 1, 1), datetime.date(2024, 12, 31), upcoming=False, today=datetime.date(2024, 7, 1)))[:2],
+     ["C", "W"]),
+    ("series_update", scheduling.UPDATE_SERIES_SQL, (1, 1, _DAY), ["classes"]),
+    ("class_demand", class_slots.CLASS_DEMAND_SQL, (_DAY, _DAY + datetime.timedelta(days=13)) * 2,
+     ["C", "W", "member", "CE", "C2", "M"]),
+    ("class_requirement", class_slots.REQUIREMENT_SQL, (1, 1), ["W", "E", "member"]),
+    # every member is read on purpose; their latest payments must come from the index
+    ("expiry_members", expiry.MEMBERS_SQL, (), ["S", "payment"]),
+    ("reminder_queue_chunk", reminders.QUEUE_SQL, (0, 5000, 0, 5000, _DAY, _DAY + datetime.timedelta(days=7)),
+     ["M", "S", "payment"]),
+    ("reminder_pending", reminders.PENDING_SQL, (0, 500), ["O", "M", "S", "payment"]),
+    ("revenue_monthly_report",
+     revenue.LOAD_SQL.format(table="revenue_monthly", column="month", where="WHERE R.month >= %s AND R.month <= %s"),
+     ("2024-01-01", "2024-12-01"), ["R"]),
+    ("revenue_fold", revenue.FOLD_SQL.format(table="revenue_daily", column="day", period="P.payment_date"),
+     (1000, 51000), ["P", "M"]),
+    ("admin_members_page",
+     *gymdb.page_query("member", ["memberID", "member_name", "email"], "memberID", 50, after=(1000, 1000))[:2],
+     ["member"]),
+]
+
+
+def explain(cur, sql, params):
+    cur.execute("EXPLAIN " + sql, params)
+    columns = [d[0] for d in cur.description]
+    return [dict(zip(columns, row)) for row in cur.fetchall()]
+
+
+# EXPLAIN each hot query; returns {name: plan rows} or raises PlanRegression listing every full scan
+def verify(conn, hot_queries=None, small_table_rows=SMALL_TABLE_ROWS):
+    cur = conn.cursor()
+    plans, problems = {}, []
+    try:
+        for name, sql, params, tables in (hot_queries or HOT_QUERIES):
+            if not tables:
+                problems.append(f"{name}: no tables listed to check")
+                continue
+            plan = explain(cur, sql, params)
+            plans[name] = plan
+            for step in plan:
+                if step.get("table") not in tables:
+                    continue
+                if step.get("type") == "ALL" and (step.get("rows") or 0) >= small_table_rows:
+                    problems.append(f"{name}: full scan of {step['table']} (~{step.get('rows')} rows, "
+                                    f"possible keys: {step.get('possible_keys')})")
+    finally:
+        conn.rollback()
+        cur.close()
+    if problems:
+        raise PlanRegression("query plan regression:\n  " + "\n  ".join(problems))
+    return plans
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Schema migrations")
+    parser.add_argument("command", choices=["status", "migrate", "verify"])
+    args = parser.parse_args()
+
+    conn = gymdb.get_connection()
+    try:
+        if args.command == "status":
+            for version, name, done in status(conn):
+                print(f"{version:04d}_{name}: {'applied' if done else 'pending'}")
+        elif args.command == "migrate":
+            applied = migrate(conn)
+            if not applied:
+                print("schema is up to date")
+        else:
+            try:
+                plans = verify(conn)
+            except PlanRegression as e:
+                print(e, file=sys.stderr)
+                sys.exit(1)
+            for name, plan in plans.items():
+                print(f"{name}: " + ", ".join(f"{s['table']}={s['type']}/{s['key']}" for s in plan))
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
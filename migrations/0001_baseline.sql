@@ -0,0 +1,98 @@
+-- Baseline schema of the gym database (see DatabaseDesc/).
+-- Existing databases already have these tables; CREATE TABLE IF NOT EXISTS leaves them untouched.
+-- Relationships are plain indexes, matching the original database.
+
+CREATE TABLE IF NOT EXISTS login (
+    email VARCHAR(255) NOT NULL,
+    password VARCHAR(255) NOT NULL,
+    category VARCHAR(30),
+    PRIMARY KEY (email)
+);
+
+CREATE TABLE IF NOT EXISTS membership_schemes (
+    scheme_id INT NOT NULL AUTO_INCREMENT,
+    scheme_name VARCHAR(100),
+    duration INT DEFAULT 1,
+    fee INT,
+    PRIMARY KEY (scheme_id),
+    UNIQUE KEY scheme_name (scheme_name)
+);
+
+CREATE TABLE IF NOT EXISTS equipment (
+    equipment_id INT NOT NULL AUTO_INCREMENT,
+    equipment_name VARCHAR(100),
+    number_of_equipment INT NOT NULL DEFAULT 1,
+    PRIMARY KEY (equipment_id)
+);
+
+CREATE TABLE IF NOT EXISTS workouts (
+    workout_id INT NOT NULL AUTO_INCREMENT,
+    equipment_id INT,
+    workout_name VARCHAR(100),
+    PRIMARY KEY (workout_id),
+    KEY equipment_id (equipment_id)
+);
+
+CREATE TABLE IF NOT EXISTS trainer (
+    trainer_id INT NOT NULL AUTO_INCREMENT,
+    trainer_name VARCHAR(100),
+    gender CHAR(1),
+    phone VARCHAR(15),
+    email VARCHAR(255),
+    class_id INT,
+    PRIMARY KEY (trainer_id),
+    UNIQUE KEY email (email),
+    KEY class_id (class_id)
+);
+
+CREATE TABLE IF NOT EXISTS salary (
+    salary INT DEFAULT 10000,
+    date DATE,
+    salary_id INT NOT NULL AUTO_INCREMENT,
+    trainer_id INT,
+    PRIMARY KEY (salary_id),
+    KEY trainer_id (trainer_id)
+);
+
+CREATE TABLE IF NOT EXISTS classes (
+    class_id INT NOT NULL AUTO_INCREMENT,
+    trainer_id INT,
+    date DATE,
+    workout_id INT,
+    PRIMARY KEY (class_id),
+    KEY trainer_id (trainer_id),
+    KEY workout_id (workout_id)
+);
+
+CREATE TABLE IF NOT EXISTS member (
+    memberID INT NOT NULL AUTO_INCREMENT,
+    member_name VARCHAR(100),
+    gender CHAR(1),
+    phone VARCHAR(15),
+    email VARCHAR(255),
+    membership_id INT,
+    membership_status VARCHAR(20) DEFAULT 'Active',
+    trainer_id INT,
+    height DECIMAL(5,2),
+    weight DECIMAL(5,2),
+    bmi DECIMAL(5,2),
+    payment_id INT,
+    age INT,
+    class_id INT,
+    PRIMARY KEY (memberID),
+    UNIQUE KEY phone (phone),
+    UNIQUE KEY email (email),
+    KEY membership_id (membership_id),
+    KEY trainer_id (trainer_id),
+    KEY payment_id (payment_id)
+);
+
+CREATE TABLE IF NOT EXISTS payment (
+    payment_id INT NOT NULL AUTO_INCREMENT,
+    member_id INT,
+    amount INT,
+    payment_date DATE,
+    payment_method VARCHAR(10),
+    PRIMARY KEY (payment_id),
+    KEY member_id (member_id)
+);
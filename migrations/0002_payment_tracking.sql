@@ -0,0 +1,5 @@
+-- The payment path's per-submission idempotency key (unique, so a replayed submission is rejected).
+
+ALTER TABLE payment ADD COLUMN idempotency_key VARCHAR(64) NULL;
+
+CREATE UNIQUE INDEX uq_payment_idempotency_key ON payment (idempotency_key);
@@ -0,0 +1,12 @@
+-- Composite indexes for the hot lookups (checked with `python migrations.py verify`).
+-- member(email) is already served by the unique key from the baseline, and the login form
+-- (WHERE email = ? AND password = ?) by login's primary key on email.
+
+-- payment history and the status sweep: WHERE member_id = ? ORDER BY / MAX(payment_date)
+CREATE INDEX idx_payment_member_date ON payment (member_id, payment_date);
+
+-- next upcoming class and the trainer's class list: WHERE trainer_id = ? AND date >= ?
+CREATE INDEX idx_classes_trainer_date ON classes (trainer_id, date);
+
+-- a trainer's active members (class head counts): WHERE trainer_id = ? AND membership_status = 'Active'
+CREATE INDEX idx_member_trainer_status ON member (trainer_id, membership_status);
@@ -0,0 +1,12 @@
+-- Class enrollment. Active members are enrolled in their trainer's classes by default,
+-- so scheduling a class is a single insert into classes. This table only holds a member's
+-- explicit response to a class ('Enrolled' or 'Dropped').
+
+CREATE TABLE IF NOT EXISTS class_enrollment (
+    class_id INT NOT NULL,
+    member_id INT NOT NULL,
+    status VARCHAR(10) NOT NULL DEFAULT 'Enrolled',
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (class_id, member_id),
+    KEY idx_enrollment_member (member_id, class_id)
+);
@@ -0,0 +1,18 @@
+-- Recurring class series. Every occurrence is an ordinary classes row tagged with its
+-- series_id, so the member and trainer views need no changes; the (series_id, date) index
+-- serves the bulk edit / cancel of a series' remaining occurrences.
+
+CREATE TABLE IF NOT EXISTS class_series (
+    series_id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    trainer_id INT NOT NULL,
+    workout_id INT NOT NULL,
+    start_date DATE NOT NULL,
+    end_date DATE NOT NULL,
+    weekdays VARCHAR(20) NOT NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    KEY idx_series_trainer (trainer_id, start_date)
+);
+
+ALTER TABLE classes ADD COLUMN series_id INT NULL;
+
+ALTER TABLE classes ADD KEY idx_classes_series_date (series_id, date);
@@ -0,0 +1,29 @@
+-- Revenue rollups maintained by revenue.py: payment totals per day and per month, by the
+-- member's scheme and trainer and by payment method. 0 / '' stand for "none" in the keys.
+-- rollup_state holds the payment_id high-water mark already folded into the rollups.
+
+CREATE TABLE IF NOT EXISTS revenue_daily (
+    day DATE NOT NULL,
+    scheme_id INT NOT NULL DEFAULT 0,
+    payment_method VARCHAR(20) NOT NULL DEFAULT '',
+    trainer_id INT NOT NULL DEFAULT 0,
+    payments INT NOT NULL DEFAULT 0,
+    amount DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, scheme_id, payment_method, trainer_id)
+);
+
+CREATE TABLE IF NOT EXISTS revenue_monthly (
+    month DATE NOT NULL,
+    scheme_id INT NOT NULL DEFAULT 0,
+    payment_method VARCHAR(20) NOT NULL DEFAULT '',
+    trainer_id INT NOT NULL DEFAULT 0,
+    payments INT NOT NULL DEFAULT 0,
+    amount DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (month, scheme_id, payment_method, trainer_id)
+);
+
+CREATE TABLE IF NOT EXISTS rollup_state (
+    name VARCHAR(50) NOT NULL PRIMARY KEY,
+    last_payment_id BIGINT NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
@@ -0,0 +1,25 @@
+-- Monthly payroll written by payroll.py: one payslip per trainer per period (the first day
+-- of the month) and one payroll_run row recording the rates and totals of the last run.
+-- Re-running a period replaces its payslips.
+
+CREATE TABLE IF NOT EXISTS payroll_run (
+    period DATE NOT NULL PRIMARY KEY,
+    per_class_rate DECIMAL(10, 2) NOT NULL,
+    per_member_rate DECIMAL(10, 2) NOT NULL,
+    trainers INT NOT NULL,
+    total DECIMAL(14, 2) NOT NULL,
+    run_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS payslip (
+    period DATE NOT NULL,
+    trainer_id INT NOT NULL,
+    base_salary DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    classes_taught INT NOT NULL DEFAULT 0,
+    class_pay DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    active_members INT NOT NULL DEFAULT 0,
+    member_pay DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    gross DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (period, trainer_id),
+    KEY idx_payslip_trainer (trainer_id, period)
+);
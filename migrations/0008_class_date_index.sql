@@ -0,0 +1,4 @@
+-- Equipment demand (equipment_usage.py) reads every class in a date range, across trainers;
+-- (trainer_id, date) can't serve that, so classes get a date index of their own.
+
+CREATE INDEX idx_classes_date ON classes (date, workout_id);
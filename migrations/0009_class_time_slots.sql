@@ -0,0 +1,16 @@
+-- Classes get a time slot and a room; class_slots.py checks trainer, room and equipment
+-- conflicts before scheduling. Existing classes keep NULL times and are treated as untimed.
+-- A series records its slot too; every occurrence carries a copy.
+-- One column per statement, so a database that already has some of them still gets the rest.
+
+ALTER TABLE classes ADD COLUMN start_time TIME NULL;
+
+ALTER TABLE classes ADD COLUMN end_time TIME NULL;
+
+ALTER TABLE classes ADD COLUMN room VARCHAR(50) NULL;
+
+ALTER TABLE class_series ADD COLUMN start_time TIME NULL;
+
+ALTER TABLE class_series ADD COLUMN end_time TIME NULL;
+
+ALTER TABLE class_series ADD COLUMN room VARCHAR(50) NULL;
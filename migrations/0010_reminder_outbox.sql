@@ -0,0 +1,29 @@
+-- Renewal reminders (reminders.py). The scan queues one outbox row per member per expiry date
+-- (the unique key makes re-scans harmless); the delivery step drains pending rows in id order.
+-- reminder_state holds the memberID the scan has reached, so a restarted worker resumes there;
+-- horizon is the last expiry date a completed pass queued up to (the next pass only queues later
+-- ones) and pass_until the upper bound of the pass in progress, so a resumed pass keeps its window.
+
+CREATE TABLE IF NOT EXISTS reminder_outbox (
+    reminder_id BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    member_id INT NOT NULL,
+    expiry_date DATE NOT NULL,
+    member_name VARCHAR(100) NULL,
+    email VARCHAR(100) NULL,
+    status VARCHAR(10) NOT NULL DEFAULT 'pending',
+    attempts INT NOT NULL DEFAULT 0,
+    last_error VARCHAR(255) NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    sent_at DATETIME NULL,
+    UNIQUE KEY uq_reminder_cycle (member_id, expiry_date),
+    KEY idx_reminder_status (status, reminder_id)
+);
+
+CREATE TABLE IF NOT EXISTS reminder_state (
+    name VARCHAR(50) NOT NULL PRIMARY KEY,
+    last_member_id INT NOT NULL DEFAULT 0,
+    passes INT NOT NULL DEFAULT 0,
+    horizon DATE NULL,
+    pass_until DATE NULL,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
@@ -0,0 +1,133 @@
+# payments.py
+# Payment write path shared by the Member panel and batch jobs.
+#
+# Needs payment.idempotency_key and its unique index (migrations/0002_payment_tracking.sql).
+#
+#   python payments.py bench --members 1,2,3 --workers 8 --per-worker 200 --duplicate-rate 0.1
+import argparse
+import datetime
+import random
+import threading
+import time
+import uuid
+
+from mysql.connector import errorcode, errors
+
+import gymdb
+
+IDEMPOTENCY_INDEX = "uq_payment_idempotency_key"  # created by migrations/0002_payment_tracking.sql
+
+
+def new_idempotency_key():
+    return uuid.uuid4().hex
+
+
+# Record a payment and activate the member in one transaction.
+# `idempotency_key` identifies the submission: replaying it (double click, rerun, retried
+# batch) hits the unique index and returns the original payment instead of inserting again.
+# Returns (payment_id, created).
+def record_payment(conn, member_id, amount, method, idempotency_key, payment_date=None):
+    payment_date = payment_date or datetime.date.today()
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            "INSERT INTO payment (member_id, amount, payment_date, payment_method, idempotency_key) VALUES (%s, %s, %s, %s, %s)",
+            (member_id, amount, payment_date, method, idempotency_key)
+        )
+        payment_id = cur.lastrowid
+        cur.execute("UPDATE member SET payment_id = %s, membership_status = %s WHERE memberID = %s",
+                    (payment_id, "Active", member_id))
+        conn.commit()
+        return payment_id, True
+    except errors.IntegrityError as e:
+        conn.rollback()
+        if e.errno != errorcode.ER_DUP_ENTRY or IDEMPOTENCY_INDEX not in str(e):
+            raise
+        cur.execute("SELECT payment_id FROM payment WHERE idempotency_key = %s", (idempotency_key,))
+        return cur.fetchone()[0], False
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+
+# Concurrent-submit benchmark: `workers` threads each record `per_worker` payments for random
+# members, resubmitting an already used key `duplicate_rate` of the time.
+# Writes real rows, so point GYM_DB_NAME at a scratch database.
+def benchmark(pool, member_ids, workers=8, per_worker=200, duplicate_rate=0.0, amount=1000, seed=0):
+    counts = {"created": 0, "duplicates": 0, "errors": 0}
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(n):
+        rng = random.Random(seed + n)
+        used_keys = []
+        conn = pool.connection()
+        try:
+            for _ in range(per_worker):
+                if used_keys and rng.random() < duplicate_rate:
+                    key = rng.choice(used_keys)
+                else:
+                    key = new_idempotency_key()
+                    used_keys.append(key)
+                started = time.perf_counter()
+                try:
+                    _, created = record_payment(conn, rng.choice(member_ids), amount, "Card", key)
+                    outcome = "created" if created else "duplicates"
+                except Exception:
+                    outcome = "errors"
+                elapsed = time.perf_counter() - started
+                with lock:
+                    counts[outcome] += 1
+                    latencies.append(elapsed)
+        finally:
+            conn.close()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    total = len(latencies)
+
+    def pct(p):
+        return round(latencies[min(total - 1, int(p * total))] * 1000, 2) if total else None
+
+    return {
+        **counts,
+        "workers": workers,
+        "submits": total,
+        "seconds": round(elapsed, 3),
+        "submits_per_sec": round(total / elapsed, 1) if elapsed else None,
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Payment write path tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench = sub.add_parser("bench", help="measure payment throughput under concurrent submits")
+    bench.add_argument("--members", required=True, help="comma separated member IDs to pay for")
+    bench.add_argument("--workers", type=int, default=8)
+    bench.add_argument("--per-worker", type=int, default=200)
+    bench.add_argument("--duplicate-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    pool = gymdb.get_pool()
+    if args.workers > pool.size:
+        pool = gymdb.ConnectionPool(size=args.workers)
+    member_ids = [int(m) for m in args.members.split(",")]
+    result = benchmark(pool, member_ids, args.workers, args.per_worker, args.duplicate_rate)
+    for key, value in result.items():
+        print(f"{key:>16}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# payroll.py
+# Monthly trainer payroll: base salary (latest salary row) plus a rate per class taught in the
+# month (classes) and per active member assigned (member.trainer_id). Computed for every trainer
+# with one grouped INSERT ... SELECT and written as payslips (migrations/0007_payroll.sql).
+#
+#   python payroll.py run 2024-05 --per-class 500 --per-member 100
+#   python payroll.py show 2024-05
+#
+# Active members are counted as of the run, so re-running an old period uses today's roster.
+import argparse
+import csv
+import datetime
+import os
+import sys
+import time
+
+import gymdb
+
+PER_CLASS_RATE = float(os.environ.get("GYM_PAYROLL_PER_CLASS", "500"))
+PER_MEMBER_RATE = float(os.environ.get("GYM_PAYROLL_PER_MEMBER", "100"))
+
+PAYSLIP_COLUMNS = ["trainer_id", "trainer_name", "base_salary", "classes_taught", "class_pay",
+                   "active_members", "member_pay", "gross"]
+
+
+# (first day of the month containing `day`, first day of the next month)
+def period_bounds(day):
+    start = day.replace(day=1)
+    return start, (start + datetime.timedelta(days=32)).replace(day=1)
+
+
+# Compute and store the payroll of the month containing `period` for all trainers in one
+# transaction. Re-running a period replaces its payslips, so the run is idempotent.
+# Returns {"period", "trainers", "total", "seconds"}.
+def run_payroll(conn, period, per_class=PER_CLASS_RATE, per_member=PER_MEMBER_RATE):
+    started = time.perf_counter()
+    start, end = period_bounds(period)
+    cur = conn.cursor()
+    try:
+        cur.execute("DELETE FROM payslip WHERE period = %s", (start,))
+        cur.execute("""
+            INSERT INTO payslip (period, trainer_id, base_salary, classes_taught, class_pay,
+                                 active_members, member_pay, gross)
+            SELECT %s, T.trainer_id, COALESCE(S.salary, 0),
+                   COALESCE(C.taught, 0), COALESCE(C.taught, 0) * %s,
+                   COALESCE(M.active, 0), COALESCE(M.active, 0) * %s,
+                   COALESCE(S.salary, 0) + COALESCE(C.taught, 0) * %s + COALESCE(M.active, 0) * %s
+            FROM trainer T
+            LEFT JOIN salary S ON S.salary_id = (
+                SELECT MAX(S2.salary_id) FROM salary S2 WHERE S2.trainer_id = T.trainer_id
+            )
+            LEFT JOIN (
+                SELECT trainer_id, COUNT(*) AS taught FROM classes
+                WHERE date >= %s AND date < %s
+                GROUP BY trainer_id
+            ) C ON C.trainer_id = T.trainer_id
+            LEFT JOIN (
+                SELECT trainer_id, COUNT(*) AS active FROM member
+                WHERE membership_status = 'Active'
+                GROUP BY trainer_id
+            ) M ON M.trainer_id = T.trainer_id
+        """, (start, per_class, per_member, per_class, per_member, start, end))
+        trainers = cur.rowcount
+        cur.execute("SELECT COALESCE(SUM(gross), 0) FROM payslip WHERE period = %s", (start,))
+        total = cur.fetchone()[0]
+        cur.execute("""
+            INSERT INTO payroll_run (period, per_class_rate, per_member_rate, trainers, total)
+            VALUES (%s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE per_class_rate = VALUES(per_class_rate), per_member_rate = VALUES(per_member_rate),
+                                    trainers = VALUES(trainers), total = VALUES(total), run_at = CURRENT_TIMESTAMP
+        """, (start, per_class, per_member, trainers, total))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+    return {"period": start.isoformat(), "trainers": trainers, "total": float(total),
+            "seconds": round(time.perf_counter() - started, 3)}
+
+
+# Payslips of a period, highest gross first: rows of PAYSLIP_COLUMNS
+def payslips(cur, period):
+    start, _ = period_bounds(period)
+    cur.execute("""
+        SELECT P.trainer_id, T.trainer_name, P.base_salary, P.classes_taught, P.class_pay,
+               P.active_members, P.member_pay, P.gross
+        FROM payslip P
+        LEFT JOIN trainer T ON T.trainer_id = P.trainer_id
+        WHERE P.period = %s
+        ORDER BY P.gross DESC, P.trainer_id
+    """, (start,))
+    return cur.fetchall()
+
+
+# Payslip rows as CSV (with a header) to the text file object `out`
+def write_csv(rows, out):
+    writer = csv.writer(out)
+    writer.writerow(PAYSLIP_COLUMNS)
+    writer.writerows(rows)
+
+
+# Past runs, newest first: (period, per_class_rate, per_member_rate, trainers, total, run_at)
+def runs(cur, limit=24):
+    cur.execute("""
+        SELECT period, per_class_rate, per_member_rate, trainers, total, run_at
+        FROM payroll_run ORDER BY period DESC LIMIT %s
+    """, (limit,))
+    return cur.fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trainer payroll")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="compute and store a month's payslips")
+    run.add_argument("month", help="YYYY-MM")
+    run.add_argument("--per-class", type=float, default=PER_CLASS_RATE)
+    run.add_argument("--per-member", type=float, default=PER_MEMBER_RATE)
+    show = sub.add_parser("show", help="print a month's payslips")
+    show.add_argument("month", help="YYYY-MM")
+    args = parser.parse_args()
+
+    period = datetime.date.fromisoformat(args.month + "-01")
+    conn = gymdb.get_connection()
+    try:
+        if args.command == "run":
+            result = run_payroll(conn, period, args.per_class, args.per_member)
+            print(f"{result['period']}: {result['trainers']} payslip(s), total {result['total']:.2f} "
+                  f"in {result['seconds']}s")
+        else:
+            cur = conn.cursor()
+            write_csv(payslips(cur, period), sys.stdout)
+            cur.close()
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
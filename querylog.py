@@ -0,0 +1,210 @@
+# querylog.py
+# Query instrumentation: every statement run through a pooled connection is recorded with its
+# SQL fingerprint, duration, rows and the panel/tab (and rerun) that issued it.
+# Records live in a bounded in-memory ring buffer and can also be appended to a JSONL file.
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from collections import deque
+
+QUERY_LOG_SIZE = int(os.environ.get("GYM_QUERY_LOG_SIZE", "5000"))
+QUERY_LOG_FILE = os.environ.get("GYM_QUERY_LOG_FILE")  # optional JSONL sink
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))*\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+# Same statement shape -> same fingerprint: literals become ?, IN lists collapse, whitespace is normalised
+def fingerprint(sql):
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("(...)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+# --- Context: which rerun / panel / tab is running on this thread ---
+# Streamlit runs each session's script on its own thread, so a thread-local is enough.
+_context = threading.local()
+
+
+def begin_rerun(panel=None, tab=None):
+    _context.rerun_id = uuid.uuid4().hex[:12]
+    _context.panel = panel
+    _context.tab = tab
+
+
+def set_context(panel=None, tab=None):
+    if panel is not None:
+        _context.panel = panel
+    if tab is not None:
+        _context.tab = tab
+
+
+def current_context():
+    return (getattr(_context, "rerun_id", None),
+            getattr(_context, "panel", None) or "background",
+            getattr(_context, "tab", None))
+
+
+class QueryLog:
+    def __init__(self, size=QUERY_LOG_SIZE, path=QUERY_LOG_FILE):
+        self._lock = threading.Lock()
+        self._records = deque(maxlen=size)
+        self._sink = open(path, "a", buffering=1) if path else None
+
+    def record(self, sql, seconds, rows, error=None):
+        rerun_id, panel, tab = current_context()
+        entry = {
+            "ts": time.time(),
+            "fingerprint": fingerprint(sql),
+            "ms": round(seconds * 1000, 3),
+            "rows": rows,
+            "panel": panel,
+            "tab": tab,
+            "rerun": rerun_id,
+        }
+        if error:
+            entry["error"] = error
+        with self._lock:
+            self._records.append(entry)
+        return entry
+
+    # Append a finished record (rows counted) to the JSONL sink, if there is one
+    def emit(self, entry):
+        if self._sink:
+            line = json.dumps(entry) + "\n"
+            with self._lock:
+                self._sink.write(line)
+
+    def records(self):
+        with self._lock:
+            return list(self._records)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+    # Aggregate by fingerprint, most total time first
+    def top_queries(self, limit=20):
+        groups = {}
+        for r in self.records():
+            g = groups.setdefault(r["fingerprint"], {"fingerprint": r["fingerprint"], "calls": 0, "total_ms": 0.0,
+                                                     "rows": 0, "timings": [], "panels": set()})
+            g["calls"] += 1
+            g["total_ms"] += r["ms"]
+            g["rows"] += r["rows"] or 0
+            g["timings"].append(r["ms"])
+            g["panels"].add(f"{r['panel']}/{r['tab']}" if r["tab"] else r["panel"])
+        out = []
+        for g in groups.values():
+            timings = sorted(g.pop("timings"))
+            g["total_ms"] = round(g["total_ms"], 3)
+            g["mean_ms"] = round(g["total_ms"] / g["calls"], 3)
+            g["p95_ms"] = timings[min(len(timings) - 1, int(0.95 * len(timings)))]
+            g["panels"] = ", ".join(sorted(g["panels"]))
+            out.append(g)
+        out.sort(key=lambda g: g["total_ms"], reverse=True)
+        return out[:limit]
+
+    # One row per script rerun (or fragment run): how many statements and how long they took
+    def reruns(self, limit=50):
+        runs = {}
+        for r in self.records():
+            if r["rerun"] is None:
+                continue
+            run = runs.setdefault(r["rerun"], {"rerun": r["rerun"], "started": r["ts"], "panel": r["panel"],
+                                               "tab": r["tab"], "queries": 0, "total_ms": 0.0})
+            run["queries"] += 1
+            run["total_ms"] = round(run["total_ms"] + r["ms"], 3)
+            run["tab"] = r["tab"] or run["tab"]
+        out = sorted(runs.values(), key=lambda run: run["started"], reverse=True)
+        return out[:limit]
+
+    # Statements slower than `threshold_ms`, or more than `factor` times their fingerprint's median
+    def slow_queries(self, threshold_ms=100.0, factor=5.0, limit=50):
+        records = self.records()
+        by_fp = {}
+        for r in records:
+            by_fp.setdefault(r["fingerprint"], []).append(r["ms"])
+        medians = {fp: sorted(ms)[len(ms) // 2] for fp, ms in by_fp.items()}
+        out = [r for r in records
+               if r["ms"] >= threshold_ms or (len(by_fp[r["fingerprint"]]) >= 5 and r["ms"] > factor * medians[r["fingerprint"]])]
+        out.sort(key=lambda r: r["ms"], reverse=True)
+        return out[:limit]
+
+
+# Cursor wrapper that reports every execute to a QueryLog.
+# Rows are counted as they are fetched (reads) or taken from rowcount (writes).
+class InstrumentedCursor:
+    def __init__(self, cursor, log):
+        self._cursor = cursor
+        self._log = log
+        self._entry = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._add_rows(1)
+            yield row
+
+    def _add_rows(self, n):
+        if self._entry is not None:
+            self._entry["rows"] += n
+
+    # the previous statement's rows are final once the next one runs or the cursor closes
+    def _finish(self):
+        entry, self._entry = self._entry, None
+        if entry is not None:
+            self._log.emit(entry)
+
+    def _run(self, method, sql, *args, **kwargs):
+        self._finish()
+        started = time.perf_counter()
+        try:
+            result = method(sql, *args, **kwargs)
+        except Exception as e:
+            self._log.emit(self._log.record(sql, time.perf_counter() - started, 0, error=type(e).__name__))
+            raise
+        elapsed = time.perf_counter() - started
+        rows = 0 if self._cursor.description else max(self._cursor.rowcount, 0)
+        self._entry = self._log.record(sql, elapsed, rows)
+        return result
+
+    def execute(self, sql, *args, **kwargs):
+        return self._run(self._cursor.execute, sql, *args, **kwargs)
+
+    def executemany(self, sql, *args, **kwargs):
+        return self._run(self._cursor.executemany, sql, *args, **kwargs)
+
+    def close(self):
+        self._finish()
+        return self._cursor.close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._add_rows(1)
+        return row
+
+    def fetchmany(self, size=1):
+        rows = self._cursor.fetchmany(size)
+        self._add_rows(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._add_rows(len(rows))
+        return rows
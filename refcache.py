@@ -0,0 +1,117 @@
+# refcache.py
+# In-process read-through caches. RefCache holds the reference tables (schemes, equipment):
+# they change rarely, so reads are served from memory until the entry expires or a
+# write to the table invalidates it. DayCache holds values computed per calendar day (equipment
+# demand, class slot indexes) that are invalidated day by day.
+import os
+import threading
+import time
+from collections import OrderedDict
+
+REFERENCE_TABLES = ("membership_schemes", "equipment")
+REFCACHE_TTL = float(os.environ.get("GYM_REFCACHE_TTL", "300"))              # seconds
+REFCACHE_MAX_ENTRIES = int(os.environ.get("GYM_REFCACHE_MAX_ENTRIES", "512"))
+
+
+class RefCache:
+    def __init__(self, ttl=REFCACHE_TTL, max_entries=REFCACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (table, key) -> (expires_at, value), least recently used first
+        self._stats = {}
+        self._generations = {}  # table -> number of invalidations so far
+
+    def _count(self, table, event):
+        counts = self._stats.setdefault(table, {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0})
+        counts[event] += 1
+
+    # Cached value for (table, key); on a miss `loader()` is called and its result stored.
+    def get(self, table, key, loader):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get((table, key))
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end((table, key))
+                self._count(table, "hits")
+                return entry[1]
+            self._count(table, "misses")
+            generation = self._generations.get(table, 0)
+
+        # load outside the lock so a slow query doesn't block other readers
+        value = loader()
+        with self._lock:
+            # a write invalidated the table while we were loading: serve the value but don't keep it
+            if self._generations.get(table, 0) != generation:
+                return value
+            self._entries[(table, key)] = (now + self.ttl, value)
+            self._entries.move_to_end((table, key))
+            while len(self._entries) > self.max_entries:
+                (evicted_table, _), _ = self._entries.popitem(last=False)
+                self._count(evicted_table, "evictions")
+        return value
+
+    # Drop every cached entry of `table` (call after any write to it).
+    def invalidate(self, table):
+        with self._lock:
+            for cache_key in [k for k in self._entries if k[0] == table]:
+                del self._entries[cache_key]
+            self._generations[table] = self._generations.get(table, 0) + 1
+            self._count(table, "invalidations")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = {table: dict(counts) for table, counts in self._stats.items()}
+            for table, _ in self._entries:
+                stats.setdefault(table, {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0})
+                stats[table]["entries"] = stats[table].get("entries", 0) + 1
+        for counts in stats.values():
+            lookups = counts["hits"] + counts["misses"]
+            counts["hit_ratio"] = round(counts["hits"] / lookups, 3) if lookups else None
+        return stats
+
+
+class DayCache:
+    # `build(cur, start, end)` returns {date: value} for the days in start..end that have data;
+    # `empty()` is the value of a day without any.
+    def __init__(self, build, empty, ttl):
+        self._build = build
+        self._empty = empty
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._days = {}  # date -> (expires_at, value)
+        self._generation = 0
+
+    # {date: value} for every day in `dates`; days not cached are built as one date range
+    def get(self, cur, dates):
+        now = time.monotonic()
+        with self._lock:
+            cached = {d: self._days[d][1] for d in dates if d in self._days and self._days[d][0] > now}
+            generation = self._generation
+        missing = sorted(set(dates) - set(cached))
+        if missing:
+            fresh = self._build(cur, missing[0], missing[-1])
+            with self._lock:
+                for d in missing:
+                    cached[d] = fresh.get(d) if d in fresh else self._empty()
+                    # an invalidation while building: use the value but don't keep it
+                    if self._generation == generation:
+                        self._days[d] = (now + self.ttl, cached[d])
+        return cached
+
+    # Forget the given days (after data on them changed)
+    def invalidate(self, dates):
+        with self._lock:
+            for d in dates:
+                self._days.pop(d, None)
+            self._generation += 1
+
+    # Forget everything
+    def clear(self):
+        with self._lock:
+            self._days.clear()
+            self._generation += 1
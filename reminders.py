@@ -0,0 +1,378 @@
+# reminders.py
+# Renewal reminders for memberships about to expire (expiry as in expiry.py: the scheme's duration
+# after the latest payment). A background worker repeatedly
+#   1. queues into reminder_outbox everyone whose membership ends after the expiry horizon of the
+#      previous pass and within the next REMINDER_DAYS (one row per member per expiry date, so a
+#      member is reminded once per renewal cycle). A pass reads members in memberID chunks above a
+#      persisted watermark, so a restart resumes it; once a day's horizon is queued, later runs
+#      that day have nothing to scan;
+#   2. drains pending outbox rows in batches to a sink (a JSON-lines file, or SMTP).
+# Nothing runs until a sink is configured (GYM_REMINDER_SINK or --sink): without one no member
+# would be notified, so no row may be marked sent.
+# Both steps are set-based SQL plus one batch in memory, so memory stays bounded however many
+# members there are. Needs migrations/0010_reminder_outbox.sql.
+#
+#   python reminders.py run                          # one scan + delivery to GYM_REMINDER_SINK
+#   python reminders.py run --every 3600             # keep running
+#   python reminders.py run --sink smtp://localhost:1025
+#   python reminders.py status                       # outbox counts, the scan watermark and horizon
+import argparse
+import datetime
+import json
+import os
+import smtplib
+import threading
+import time
+from email.message import EmailMessage
+
+import gymdb
+
+REMINDER_DAYS = int(os.environ.get("GYM_REMINDER_DAYS", "7"))  # remind this many days before expiry
+REMINDER_INTERVAL = float(os.environ.get("GYM_REMINDER_INTERVAL", "3600"))  # seconds, 0 disables the worker
+REMINDER_SINK = os.environ.get("GYM_REMINDER_SINK", "")  # file:<path> or smtp://host:port; unset sends nothing
+REMINDER_FROM = os.environ.get("GYM_REMINDER_FROM", "gym@localhost")
+SCAN_CHUNK_SIZE = 5000     # memberIDs per scan transaction
+DELIVERY_BATCH = 500       # outbox rows per delivery batch
+MAX_ATTEMPTS = 5           # a reminder that failed this often is marked 'failed'
+STATE_NAME = "renewal"
+LOCK_NAME = "gym_renewal_reminders"
+
+
+# --- Sinks ---
+# A sink is opened once per delivery batch (`with sink:`) and sends one reminder at a time:
+# {"reminder_id", "member_id", "member_name", "email", "expiry_date", "days_left", "message"}.
+
+class FileSink:
+    # Appends one JSON line per reminder; the stand-in for email in development and tests
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, "a", encoding="utf-8")
+        return self
+
+    def __exit__(self, *exc):
+        self._file.close()
+        self._file = None
+
+    def send(self, reminder):
+        self._file.write(json.dumps(reminder, default=str) + "\n")
+
+
+class SmtpSink:
+    # One SMTP connection per batch (e.g. `python -m aiosmtpd -n` locally)
+    def __init__(self, host, port=25, sender=REMINDER_FROM):
+        self.host, self.port, self.sender = host, port, sender
+        self._smtp = None
+
+    def __enter__(self):
+        self._smtp = smtplib.SMTP(self.host, self.port, timeout=30)
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            self._smtp.quit()
+        finally:
+            self._smtp = None
+
+    def send(self, reminder):
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = reminder["email"]
+        message["Subject"] = "Your gym membership is about to expire"
+        message.set_content(reminder["message"])
+        self._smtp.send_message(message)
+
+
+# "file:<path>" or "smtp://host[:port]"
+def make_sink(spec=REMINDER_SINK):
+    if spec.startswith("file:"):
+        return FileSink(spec[len("file:"):])
+    if spec.startswith("smtp://"):
+        host, _, port = spec[len("smtp://"):].partition(":")
+        return SmtpSink(host, int(port or 25))
+    raise ValueError(f"unknown reminder sink {spec!r} (use file:<path> or smtp://host:port)")
+
+
+def message_for(name, expiry_date, days_left):
+    when = "today" if days_left <= 0 else f"in {days_left} day(s)"
+    return (f"Hi {name or 'there'},\n\nyour gym membership expires {when}, on {expiry_date}. "
+            f"Renew it from the Make Payment tab to keep your classes and workout plan.\n")
+
+
+# --- Scan ---
+
+# (last_member_id, passes, horizon, pass_until)
+def _state(cur):
+    cur.execute("SELECT last_member_id, passes, horizon, pass_until FROM reminder_state WHERE name = %s",
+                (STATE_NAME,))
+    row = cur.fetchone()
+    return row if row else (0, 0, None, None)
+
+
+def _set_state(cur, last_member_id, passes, horizon, pass_until):
+    cur.execute("""
+        INSERT INTO reminder_state (name, last_member_id, passes, horizon, pass_until) VALUES (%s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE last_member_id = VALUES(last_member_id), passes = VALUES(passes),
+                                horizon = VALUES(horizon), pass_until = VALUES(pass_until)
+    """, (STATE_NAME, last_member_id, passes, horizon, pass_until))
+
+
+# DATE_ADD(.., INTERVAL n MONTH) clamps to the end of a shorter month, like expiry.expiry_dates.
+QUEUE_SQL = """
+    INSERT INTO reminder_outbox (member_id, expiry_date, member_name, email)
+    SELECT M.memberID, DATE_ADD(P.last_paid, INTERVAL S.duration MONTH), M.member_name, M.email
+    FROM member M
+    JOIN membership_schemes S ON S.scheme_id = M.membership_id
+    JOIN (
+        SELECT member_id, MAX(payment_date) AS last_paid FROM payment
+        WHERE member_id > %s AND member_id <= %s
+        GROUP BY member_id
+    ) P ON P.member_id = M.memberID
+    WHERE M.memberID > %s AND M.memberID <= %s
+      AND DATE_ADD(P.last_paid, INTERVAL S.duration MONTH) BETWEEN %s AND %s
+    ON DUPLICATE KEY UPDATE member_id = member_id
+"""
+
+
+# Queue members with low < memberID <= high expiring between `first` and `last` (caller commits)
+def queue_chunk(cur, low, high, first, last):
+    cur.execute(QUEUE_SQL, (low, high, low, high, first, last))
+    return cur.rowcount  # 0 for members already queued for this expiry
+
+
+# One pass queues the expiries after the previous pass's horizon (and not before today) up to
+# today + days, reading members from the watermark to the last member `chunk_size` memberIDs per
+# transaction (each moves the queue and the watermark together). A completed pass moves the horizon
+# to its upper bound and the watermark back to 0; a pass cut short (restart, `max_chunks`) resumes at
+# the watermark with the same upper bound, unless that bound is already past (the worker was down
+# for days): then the pass is closed and a new one starts. A membership shortened into a window
+# already scanned (e.g. a scheme change) is not queued. Returns (queued, chunks, watermark, passes, horizon).
+def scan(conn, cur, today=None, days=REMINDER_DAYS, chunk_size=SCAN_CHUNK_SIZE, max_chunks=None):
+    today = today or datetime.date.today()
+    watermark, passes, horizon, until = _state(cur)
+    if watermark and (until is None or until < today):
+        # the open pass's window ended while the worker was down: its remaining expiries are past,
+        # so close it and start a pass over the current window
+        watermark, until = 0, today + datetime.timedelta(days=days)
+        _set_state(cur, watermark, passes, horizon, until)
+        conn.commit()
+    elif not watermark:
+        until = today + datetime.timedelta(days=days)
+    first = max(horizon + datetime.timedelta(days=1), today) if horizon else today
+    if first > until:
+        return 0, 0, watermark, passes, horizon  # everything up to today + days is queued already
+    cur.execute("SELECT MAX(memberID) FROM member")
+    high = cur.fetchone()[0] or 0
+    queued = chunks = 0
+    while watermark < high and (max_chunks is None or chunks < max_chunks):
+        upto = min(watermark + chunk_size, high)
+        queued += queue_chunk(cur, watermark, upto, first, until)
+        _set_state(cur, upto, passes, horizon, until)
+        conn.commit()
+        watermark, chunks = upto, chunks + 1
+    if watermark >= high:
+        watermark, passes, horizon = 0, passes + 1, until
+        _set_state(cur, watermark, passes, horizon, None)
+        conn.commit()
+    return queued, chunks, watermark, passes, horizon
+
+
+# --- Delivery ---
+
+def _mark(cur, ids, sql, params=()):
+    if ids:
+        cur.execute(sql.format(ids=", ".join(["%s"] * len(ids))), tuple(params) + tuple(ids))
+
+
+# Pending reminders after a reminder_id with the member's current expiry
+PENDING_SQL = """
+    SELECT O.reminder_id, O.member_id, O.member_name, O.email, O.expiry_date,
+           DATE_ADD((SELECT MAX(payment_date) FROM payment WHERE member_id = O.member_id),
+                    INTERVAL S.duration MONTH)
+    FROM reminder_outbox O
+    LEFT JOIN member M ON M.memberID = O.member_id
+    LEFT JOIN membership_schemes S ON S.scheme_id = M.membership_id
+    WHERE O.status = 'pending' AND O.reminder_id > %s
+    ORDER BY O.reminder_id LIMIT %s
+"""
+
+
+# Send pending reminders in reminder_id order, `batch_size` at a time. Rows are marked sent per
+# batch after the sink accepted them, so a crash mid-batch can resend that batch (at least once).
+# A reminder whose member's current expiry is no longer the queued one (renewed, scheme changed,
+# member removed) is cancelled instead of sent. Returns {"sent", "failed", "skipped", "cancelled"}.
+def deliver(conn, cur, sink, today=None, batch_size=DELIVERY_BATCH):
+    today = today or datetime.date.today()
+    counts = {"sent": 0, "failed": 0, "skipped": 0, "cancelled": 0}
+    after = 0
+    while True:
+        cur.execute(PENDING_SQL, (after, batch_size))
+        rows = cur.fetchall()
+        if not rows:
+            return counts
+        after = rows[-1][0]
+        sent, failed, skipped, cancelled, error = [], [], [], [], None
+        with sink:
+            for reminder_id, member_id, name, email, expiry_date, current_expiry in rows:
+                if current_expiry != expiry_date:
+                    cancelled.append(reminder_id)
+                    continue
+                if not email:
+                    skipped.append(reminder_id)
+                    continue
+                days_left = (expiry_date - today).days
+                try:
+                    sink.send({"reminder_id": reminder_id, "member_id": member_id, "member_name": name,
+                               "email": email, "expiry_date": expiry_date, "days_left": days_left,
+                               "message": message_for(name, expiry_date, days_left)})
+                    sent.append(reminder_id)
+                except Exception as e:
+                    failed.append(reminder_id)
+                    error = str(e)[:255]
+        _mark(cur, sent, "UPDATE reminder_outbox SET status = 'sent', sent_at = NOW() WHERE reminder_id IN ({ids})")
+        _mark(cur, skipped, "UPDATE reminder_outbox SET status = 'skipped' WHERE reminder_id IN ({ids})")
+        _mark(cur, cancelled, "UPDATE reminder_outbox SET status = 'cancelled' WHERE reminder_id IN ({ids})")
+        _mark(cur, failed, """
+            UPDATE reminder_outbox SET status = IF(attempts + 1 >= %s, 'failed', 'pending'),
+                   attempts = attempts + 1, last_error = %s
+            WHERE reminder_id IN ({ids})
+        """, (MAX_ATTEMPTS, error))
+        conn.commit()
+        counts["sent"] += len(sent)
+        counts["failed"] += len(failed)
+        counts["skipped"] += len(skipped)
+        counts["cancelled"] += len(cancelled)
+
+
+# One scan and delivery under a named lock, so only one process works the outbox at a time.
+# Returns None if another process holds the lock.
+def run_once(conn, sink, today=None, days=REMINDER_DAYS):
+    started = time.perf_counter()
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT GET_LOCK(%s, 0)", (LOCK_NAME,))
+        if cur.fetchone()[0] != 1:
+            return None
+        try:
+            queued, chunks, watermark, passes, horizon = scan(conn, cur, today, days)
+            result = {"queued": queued, "chunks": chunks, "watermark": watermark, "passes": passes,
+                      "horizon": horizon}
+            result.update(deliver(conn, cur, sink, today))
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+            cur.fetchall()
+    finally:
+        cur.close()
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    result["finished_at"] = datetime.datetime.now().isoformat(timespec="seconds")
+    return result
+
+
+# Outbox rows per status: {"pending": n, "sent": n, ...}
+def outbox_counts(cur):
+    cur.execute("SELECT status, COUNT(*) FROM reminder_outbox GROUP BY status")
+    return dict(cur.fetchall())
+
+
+# Background thread running `run_once` every `interval` seconds on a pooled connection,
+# off the Streamlit request path; `wake` asks for a run now without waiting for it.
+# Stays idle without a sink (none passed and GYM_REMINDER_SINK unset).
+class ReminderWorker:
+    def __init__(self, pool, sink=None, interval=REMINDER_INTERVAL, days=REMINDER_DAYS):
+        self.pool = pool
+        self.sink = sink or (make_sink() if REMINDER_SINK else None)
+        self.interval = interval
+        self.days = days
+        self.last_result = None
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def run_once(self):
+        if self.sink is None:
+            return None
+        with self._lock:
+            conn = self.pool.connection()
+            try:
+                result = run_once(conn, self.sink, days=self.days)
+            finally:
+                conn.close()
+            if result is not None:
+                self.last_result = result
+            return result
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def start(self):
+        if self.interval > 0 and self.sink is not None and self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="renewal-reminders", daemon=True)
+            self._thread.start()
+        return self
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Membership renewal reminders")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="queue members expiring soon and deliver pending reminders")
+    run.add_argument("--days", type=int, default=REMINDER_DAYS)
+    run.add_argument("--sink", default=REMINDER_SINK or None,
+                     help="file:<path> or smtp://host:port (default: GYM_REMINDER_SINK)")
+    run.add_argument("--every", type=float, default=0, help="repeat every N seconds instead of running once")
+    sub.add_parser("status", help="outbox counts, the scan watermark and horizon")
+    args = parser.parse_args()
+    if args.command == "run" and not args.sink:
+        parser.error("no reminder sink: pass --sink or set GYM_REMINDER_SINK")
+
+    conn = gymdb.get_connection()
+    try:
+        if args.command == "status":
+            cur = conn.cursor()
+            watermark, passes, horizon, _ = _state(cur)
+            print(f"watermark={watermark}  passes={passes}  horizon={horizon}  outbox={outbox_counts(cur)}")
+            cur.close()
+            return
+        sink = make_sink(args.sink)
+        while True:
+            result = run_once(conn, sink, days=args.days)
+            if result is None:
+                print("another reminder run holds the lock; skipped")
+            else:
+                print(f"{result['finished_at']}  queued={result['queued']}  sent={result['sent']}  "
+                      f"failed={result['failed']}  skipped={result['skipped']}  cancelled={result['cancelled']}  "
+                      f"chunks={result['chunks']}  "
+                      f"{result['seconds']}s")
+            if not args.every:
+                break
+            time.sleep(args.every)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+# revenue.py
+# Revenue rollups: daily and monthly payment totals by scheme, payment method and trainer,
+# kept in summary tables (migrations/0006_revenue_rollups.sql) so reporting never scans payment.
+# New payments are folded in incrementally above a payment_id high-water mark.
+#
+#   python revenue.py refresh                 # fold in payments newer than the high-water mark
+#   python revenue.py refresh --every 300     # keep refreshing
+#   python revenue.py rebuild                 # recompute the rollups from the whole payment table
+#
+# A payment is attributed to the scheme and trainer its member has when it is rolled up.
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import gymdb
+
+ROLLUP_NAME = "revenue"
+REFRESH_BATCH = 50000  # payment ids folded in per transaction
+LOCK_NAME = "gym_revenue_rollup"
+
+# grain -> (rollup table, period column, period of a payment row)
+GRAINS = {
+    "daily": ("revenue_daily", "day", "P.payment_date"),
+    "monthly": ("revenue_monthly", "month", "DATE_FORMAT(P.payment_date, '%%Y-%%m-01')"),
+}
+FREQ = {"daily": "D", "monthly": "MS"}
+DIMENSIONS = {"scheme": "scheme_name", "method": "payment_method", "trainer": "trainer_name"}
+
+
+# Payments with low < payment_id <= high folded into one rollup; formatted with a GRAINS entry
+FOLD_SQL = """
+    INSERT INTO {table} ({column}, scheme_id, payment_method, trainer_id, payments, amount)
+    SELECT {period}, COALESCE(M.membership_id, 0), COALESCE(P.payment_method, ''),
+           COALESCE(M.trainer_id, 0), COUNT(*), COALESCE(SUM(P.amount), 0)
+    FROM payment P
+    LEFT JOIN member M ON M.memberID = P.member_id
+    WHERE P.payment_id > %s AND P.payment_id <= %s AND P.payment_date IS NOT NULL
+    GROUP BY 1, 2, 3, 4
+    ON DUPLICATE KEY UPDATE payments = payments + VALUES(payments), amount = amount + VALUES(amount)
+"""
+
+# Rollup rows with names; formatted with a GRAINS entry and an optional WHERE clause
+LOAD_SQL = """
+    SELECT R.{column}, COALESCE(S.scheme_name, 'No scheme'), COALESCE(NULLIF(R.payment_method, ''), 'Unknown'),
+           COALESCE(T.trainer_name, 'No trainer'), R.payments, R.amount
+    FROM {table} R
+    LEFT JOIN membership_schemes S ON S.scheme_id = R.scheme_id
+    LEFT JOIN trainer T ON T.trainer_id = R.trainer_id
+    {where}
+    ORDER BY R.{column}
+"""
+
+
+# Add payments with low < payment_id <= high to every rollup (caller commits)
+def _fold(cur, low, high):
+    for table, column, period in GRAINS.values():
+        cur.execute(FOLD_SQL.format(table=table, column=column, period=period), (low, high))
+
+
+def _set_watermark(cur, payment_id):
+    cur.execute("""
+        INSERT INTO rollup_state (name, last_payment_id) VALUES (%s, %s)
+        ON DUPLICATE KEY UPDATE last_payment_id = VALUES(last_payment_id)
+    """, (ROLLUP_NAME, payment_id))
+
+
+def _locked(conn, work):
+    cur = conn.cursor()
+    cur.execute("SELECT GET_LOCK(%s, 30)", (LOCK_NAME,))
+    if cur.fetchone()[0] != 1:
+        cur.close()
+        raise RuntimeError("another revenue rollup is running")
+    try:
+        return work(cur)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+        cur.fetchall()
+        cur.close()
+
+
+# Fold every payment above the high-water mark into the rollups, `batch_size` ids per
+# transaction; each batch moves the rollups and the mark together. Payments are written in
+# short single-insert transactions, so ids commit in order in practice; `rebuild` repairs
+# the rollups should one ever commit below the mark.
+# Returns {"payments": ids folded, "batches", "watermark", "seconds"}.
+def refresh(conn, batch_size=REFRESH_BATCH):
+    started = time.perf_counter()
+
+    def work(cur):
+        cur.execute("SELECT last_payment_id FROM rollup_state WHERE name = %s", (ROLLUP_NAME,))
+        row = cur.fetchone()
+        watermark = row[0] if row else 0
+        cur.execute("SELECT MAX(payment_id) FROM payment")
+        high = cur.fetchone()[0] or 0
+        start, batches = watermark, 0
+        while watermark < high:
+            upto = min(watermark + batch_size, high)
+            _fold(cur, watermark, upto)
+            _set_watermark(cur, upto)
+            conn.commit()
+            watermark, batches = upto, batches + 1
+        return {"payments": watermark - start, "batches": batches, "watermark": watermark,
+                "seconds": round(time.perf_counter() - started, 3)}
+
+    return _locked(conn, work)
+
+
+# Recompute the rollups from scratch in one transaction (readers see the old totals until it commits)
+def rebuild(conn):
+    started = time.perf_counter()
+
+    def work(cur):
+        cur.execute("SELECT MAX(payment_id) FROM payment")
+        high = cur.fetchone()[0] or 0
+        for table, _, _ in GRAINS.values():
+            cur.execute(f"DELETE FROM {table}")
+        _fold(cur, 0, high)
+        _set_watermark(cur, high)
+        conn.commit()
+        return {"payments": high, "batches": 1, "watermark": high, "seconds": round(time.perf_counter() - started, 3)}
+
+    return _locked(conn, work)
+
+
+# Rollup rows between `start` and `end` as a DataFrame:
+# period, scheme_name, payment_method, trainer_name, payments, amount
+def load(cur, grain="monthly", start=None, end=None):
+    table, column, _ = GRAINS[grain]
+    clauses, params = [], []
+    if start and grain == "monthly":
+        start = start.replace(day=1)
+    if start:
+        clauses.append(f"R.{column} >= %s")
+        params.append(start)
+    if end:
+        clauses.append(f"R.{column} <= %s")
+        params.append(end)
+    where = "WHERE " + " AND ".join(clauses) if clauses else ""
+    cur.execute(LOAD_SQL.format(table=table, column=column, where=where), tuple(params))
+    frame = pd.DataFrame(cur.fetchall(), columns=["period", "scheme_name", "payment_method", "trainer_name",
+                                                   "payments", "amount"])
+    frame["period"] = pd.to_datetime(frame["period"])
+    frame["amount"] = frame["amount"].astype(float)
+    return frame
+
+
+# Per-period totals with change vs the previous period and a trailing moving average.
+# `freq` ("D" or "MS") fills periods without payments with zeros.
+def trend(frame, window=3, freq=None):
+    totals = frame.groupby("period")[["payments", "amount"]].sum().sort_index()
+    if freq and len(totals):
+        totals = totals.asfreq(freq, fill_value=0)
+    amount = totals["amount"].to_numpy()
+    previous = np.concatenate(([np.nan], amount[:-1]))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        totals["change_pct"] = np.where(previous > 0, (amount - previous) / previous * 100, np.nan).round(1)
+    totals["moving_avg"] = totals["amount"].rolling(window, min_periods=1).mean().round(2)
+    return totals
+
+
+# Amount per period for each value of a dimension ("scheme", "method" or "trainer"), top `limit` values
+def breakdown(frame, dimension, limit=10):
+    column = DIMENSIONS[dimension]
+    pivot = frame.pivot_table(index="period", columns=column, values="amount", aggfunc="sum", fill_value=0)
+    top = pivot.sum().nlargest(limit).index
+    return pivot[top]
+
+
+# Share of total revenue per value of a dimension, largest first
+def shares(frame, dimension):
+    totals = frame.groupby(DIMENSIONS[dimension])["amount"].sum()
+    total = totals.sum()
+    return (totals / total * 100).round(1).sort_values(ascending=False) if total else totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Revenue rollups")
+    sub = parser.add_subparsers(dest="command", required=True)
+    ref = sub.add_parser("refresh", help="fold in payments above the high-water mark")
+    ref.add_argument("--batch-size", type=int, default=REFRESH_BATCH)
+    ref.add_argument("--every", type=float, default=0, help="repeat every N seconds instead of running once")
+    sub.add_parser("rebuild", help="recompute the rollups from the payment table")
+    args = parser.parse_args()
+
+    conn = gymdb.get_connection()
+    try:
+        while True:
+            result = refresh(conn, args.batch_size) if args.command == "refresh" else rebuild(conn)
+            print(f"payments={result['payments']}  batches={result['batches']}  "
+                  f"watermark={result['watermark']}  {result['seconds']}s")
+            if args.command != "refresh" or not args.every:
+                break
+            time.sleep(args.every)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+# scheduling.py
+# Classes and enrollment.
+# Active members are enrolled in every class their trainer schedules unless they drop it,
+# so scheduling is a single insert and a member's classes come from the
+# classes(trainer_id, date) index plus their rows in class_enrollment.
+# Recurring series (migrations/0005_class_series.sql) are expanded into one classes row per
+# occurrence and written, edited and cancelled as a whole in a single transaction.
+# Classes may have a time slot and a room (migrations/0009_class_time_slots.sql); the app checks
+# them for conflicts with class_slots.py before scheduling.
+import datetime
+
+import gymdb
+
+UPCOMING_LIMIT = 20
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+MAX_SERIES_WEEKS = 52
+
+
+# Schedule one class. Returns the new class_id.
+def schedule_class(conn, trainer_id, class_date, workout_id, start_time=None, end_time=None, room=None):
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            INSERT INTO classes (trainer_id, date, workout_id, start_time, end_time, room)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, (trainer_id, class_date, workout_id, start_time, end_time, room or None))
+        class_id = cur.lastrowid
+        conn.commit()
+        return class_id
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+
+UPCOMING_SQL = """
+    SELECT C.class_id, C.date, W.workout_name, E.equipment_name, COALESCE(CE.status, 'Enrolled'),
+           C.start_time, C.end_time, C.room
+    FROM classes C
+    LEFT JOIN workouts W ON W.workout_id = C.workout_id
+    LEFT JOIN equipment E ON E.equipment_id = W.equipment_id
+    LEFT JOIN class_enrollment CE ON CE.class_id = C.class_id AND CE.member_id = %s
+    WHERE C.trainer_id = %s AND C.date >= CURDATE()
+    ORDER BY C.date ASC, C.class_id ASC
+    LIMIT %s
+"""
+
+
+# The member's upcoming classes (today onwards), soonest first:
+# [(class_id, date, workout_name, equipment_name, status, start_time, end_time, room)]
+# where status is 'Enrolled' or 'Dropped'
+def upcoming_classes(cur, member_id, trainer_id, limit=UPCOMING_LIMIT):
+    cur.execute(UPCOMING_SQL, (member_id, trainer_id, limit))
+    return cur.fetchall()
+
+
+# --- Trainer class list ---
+# A date window split into upcoming (soonest first) and past (latest first), read a page at a
+# time with keyset pagination on (date, class_id) so only the rows shown are touched.
+CLASS_COLUMNS = ["C.class_id", "C.date", "W.workout_name", "C.series_id", "C.start_time", "C.end_time", "C.room"]
+CLASS_TABLE = "classes C LEFT JOIN workouts W ON W.workout_id = C.workout_id"
+
+
+# (start, end) of a named window around `today`: "This week" (Mon-Sun) or "This month"
+def class_window(name, today=None):
+    today = today or datetime.date.today()
+    if name == "This week":
+        start = today - datetime.timedelta(days=today.weekday())
+        return start, start + datetime.timedelta(days=6)
+    if name == "This month":
+        start = today.replace(day=1)
+        next_month = (start + datetime.timedelta(days=32)).replace(day=1)
+        return start, next_month - datetime.timedelta(days=1)
+    raise ValueError(f"unknown class window {name!r}")
+
+
+# fetch_page arguments for one page of the trainer's classes between `start` and `end` (inclusive)
+def trainer_classes_query(trainer_id, start, end, upcoming, today=None):
+    today = today or datetime.date.today()
+    if upcoming:
+        where, params = "C.trainer_id = %s AND C.date >= %s AND C.date <= %s", (trainer_id, max(start, today), end)
+    else:
+        where, params = "C.trainer_id = %s AND C.date >= %s AND C.date < %s", (
+            trainer_id, start, min(end + datetime.timedelta(days=1), today))
+    return {"table": CLASS_TABLE, "columns": CLASS_COLUMNS, "key": "C.class_id", "sort": "C.date",
+            "descending": not upcoming, "where": where, "params": params}
+
+
+# One page of the trainer's classes between `start` and `end` (inclusive).
+# Returns (rows, next_cursor) like gymdb.fetch_page.
+def trainer_classes_page(cur, trainer_id, start, end, upcoming, page_size=25, after=None, today=None):
+    return gymdb.fetch_page(cur, page_size=page_size, after=after,
+                            **trainer_classes_query(trainer_id, start, end, upcoming, today))
+
+
+# Dates of a series: every `weekdays` (0 = Monday) in the `weeks` weeks starting at `start`
+def series_dates(start, weekdays, weeks):
+    if not weekdays:
+        raise ValueError("a series needs at least one weekday")
+    if not 1 <= weeks <= MAX_SERIES_WEEKS:
+        raise ValueError(f"a series runs for 1 to {MAX_SERIES_WEEKS} weeks")
+    days = set(weekdays)
+    return [d for d in (start + datetime.timedelta(days=i) for i in range(weeks * 7)) if d.weekday() in days]
+
+
+# Schedule a recurring series: the series row and all of its occurrences in one transaction,
+# the occurrences with a single executemany. Returns (series_id, number of classes).
+def schedule_series(conn, trainer_id, workout_id, start, weekdays, weeks, start_time=None, end_time=None, room=None):
+    dates = series_dates(start, weekdays, weeks)
+    room = room or None
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            INSERT INTO class_series (trainer_id, workout_id, start_date, end_date, weekdays, start_time, end_time, room)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """, (trainer_id, workout_id, dates[0], dates[-1], ",".join(WEEKDAYS[d] for d in sorted(set(weekdays))),
+              start_time, end_time, room))
+        series_id = cur.lastrowid
+        cur.executemany("""
+            INSERT INTO classes (trainer_id, date, workout_id, series_id, start_time, end_time, room)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, [(trainer_id, d, workout_id, series_id, start_time, end_time, room) for d in dates])
+        conn.commit()
+        return series_id, len(dates)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+
+# The trainer's series with their remaining (today onwards) occurrence counts, newest first:
+# [(series_id, workout_name, weekdays, start_date, end_date, remaining, start_time, end_time, room)]
+def trainer_series(cur, trainer_id):
+    cur.execute("""
+        SELECT S.series_id, W.workout_name, S.weekdays, S.start_date, S.end_date,
+               (SELECT COUNT(*) FROM classes C WHERE C.series_id = S.series_id AND C.date >= CURDATE()),
+               S.start_time, S.end_time, S.room
+        FROM class_series S
+        LEFT JOIN workouts W ON W.workout_id = S.workout_id
+        WHERE S.trainer_id = %s
+        ORDER BY S.start_date DESC, S.series_id DESC
+    """, (trainer_id,))
+    return cur.fetchall()
+
+
+UPDATE_SERIES_SQL = "UPDATE classes SET workout_id = %s WHERE series_id = %s AND date >= %s"
+
+
+# Change the workout of every occurrence of a series on or after `from_date`.
+# Returns the number of classes updated.
+def update_series(conn, series_id, workout_id, from_date=None):
+    from_date = from_date or datetime.date.today()
+    cur = conn.cursor()
+    try:
+        cur.execute(UPDATE_SERIES_SQL, (workout_id, series_id, from_date))
+        updated = cur.rowcount
+        cur.execute("UPDATE class_series SET workout_id = %s WHERE series_id = %s", (workout_id, series_id))
+        conn.commit()
+        return updated
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+
+# Cancel every occurrence of a series on or after `from_date`, with the members' responses
+# to them. Returns the number of classes cancelled.
+def cancel_series(conn, series_id, from_date=None):
+    from_date = from_date or datetime.date.today()
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            DELETE CE FROM class_enrollment CE
+            JOIN classes C ON C.class_id = CE.class_id
+            WHERE C.series_id = %s AND C.date >= %s
+        """, (series_id, from_date))
+        cur.execute("DELETE FROM classes WHERE series_id = %s AND date >= %s", (series_id, from_date))
+        cancelled = cur.rowcount
+        # the series now ends with its last remaining occurrence, or is gone entirely
+        cur.execute("SELECT MAX(date) FROM classes WHERE series_id = %s", (series_id,))
+        last = cur.fetchone()[0]
+        if last is None:
+            cur.execute("DELETE FROM class_series WHERE series_id = %s", (series_id,))
+        else:
+            cur.execute("UPDATE class_series SET end_date = %s WHERE series_id = %s", (last, series_id))
+        conn.commit()
+        return cancelled
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+
+# Record a member's response to a class ('Enrolled' or 'Dropped')
+def set_enrollment(conn, class_id, member_id, status):
+    if status not in ("Enrolled", "Dropped"):
+        raise ValueError(f"invalid enrollment status {status!r}")
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            INSERT INTO class_enrollment (class_id, member_id, status) VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE status = VALUES(status)
+        """, (class_id, member_id, status))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
@@ -0,0 +1,196 @@
+# search_index.py
+# In-memory typeahead index over workout and equipment names.
+# Word prefixes are matched with a binary search over a sorted (token, id) list; when that finds
+# nothing or too little (typos), misspelt words are corrected to known words by trigram overlap.
+# Built once from the table, then kept current by the app's writes (upsert / remove), with a
+# periodic full rebuild to pick up changes made by other processes.
+import bisect
+import heapq
+import math
+import os
+import re
+import threading
+import time
+
+SEARCH_INDEX_TTL = float(os.environ.get("GYM_SEARCH_INDEX_TTL", "900"))  # seconds between full rebuilds
+MIN_TRIGRAM_SCORE = 0.3
+
+# table -> (id column, name column)
+SEARCHABLE = {
+    "workouts": ("workout_id", "workout_name"),
+    "equipment": ("equipment_id", "equipment_name"),
+}
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokens(name):
+    return _TOKEN.findall((name or "").lower())
+
+
+def trigrams(text):
+    text = f"  {' '.join(tokens(text))} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+# [(id, name)] of a searchable table
+def load_names(cur, table):
+    id_column, name_column = SEARCHABLE[table]
+    cur.execute(f"SELECT {id_column}, {name_column} FROM {table}")
+    return cur.fetchall()
+
+
+class NameIndex:
+    def __init__(self, loader, ttl=SEARCH_INDEX_TTL):
+        self._loader = loader  # (cur) -> [(id, name)]; cur is None when the caller has none open
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._built_at = None
+        self._names = {}      # id -> name
+        self._prefix = []     # sorted (token, id)
+        self._by_name = []    # sorted (lowercased name, id), for the empty query
+        self._vocab = {}      # token -> number of names containing it
+        self._trigrams = {}   # trigram -> set of tokens, for typo correction
+
+    def __len__(self):
+        return len(self._names)
+
+    def _add_token(self, token):
+        self._vocab[token] = self._vocab.get(token, 0) + 1
+        if self._vocab[token] == 1:
+            for gram in trigrams(token):
+                self._trigrams.setdefault(gram, set()).add(token)
+
+    def _drop_token(self, token):
+        self._vocab[token] -= 1
+        if not self._vocab[token]:
+            del self._vocab[token]
+            for gram in trigrams(token):
+                self._trigrams[gram].discard(token)
+                if not self._trigrams[gram]:
+                    del self._trigrams[gram]
+
+    def _add(self, item_id, name):
+        self._names[item_id] = name
+        bisect.insort(self._by_name, ((name or "").lower(), item_id))
+        for token in set(tokens(name)):
+            bisect.insort(self._prefix, (token, item_id))
+            self._add_token(token)
+
+    def _remove(self, item_id):
+        name = self._names.pop(item_id, None)
+        if name is None:
+            return
+        i = bisect.bisect_left(self._by_name, ((name or "").lower(), item_id))
+        if i < len(self._by_name) and self._by_name[i][1] == item_id:
+            del self._by_name[i]
+        for token in set(tokens(name)):
+            i = bisect.bisect_left(self._prefix, (token, item_id))
+            if i < len(self._prefix) and self._prefix[i] == (token, item_id):
+                del self._prefix[i]
+                self._drop_token(token)
+
+    # Full rebuild from the loader, reading with the caller's cursor if it passes one
+    def rebuild(self, cur=None):
+        rows = self._loader(cur)
+        names, prefix, vocab, grams = {}, [], {}, {}
+        for item_id, name in rows:
+            names[item_id] = name
+            for token in set(tokens(name)):
+                prefix.append((token, item_id))
+                vocab[token] = vocab.get(token, 0) + 1
+        prefix.sort()
+        for token in vocab:
+            for gram in trigrams(token):
+                grams.setdefault(gram, set()).add(token)
+        by_name = sorted(((name or "").lower(), item_id) for item_id, name in names.items())
+        with self._lock:
+            self._names, self._prefix, self._by_name = names, prefix, by_name
+            self._vocab, self._trigrams = vocab, grams
+            self._built_at = time.monotonic()
+
+    def _ensure_fresh(self, cur=None):
+        if self._built_at is None or time.monotonic() - self._built_at > self.ttl:
+            self.rebuild(cur)
+
+    # Incremental maintenance: call after inserting / renaming / deleting a row
+    def upsert(self, item_id, name):
+        with self._lock:
+            if self._built_at is None:
+                return  # not built yet; the first search loads everything
+            self._remove(item_id)
+            self._add(item_id, name)
+
+    def remove(self, item_id):
+        with self._lock:
+            self._remove(item_id)
+
+    def name(self, item_id, cur=None):
+        self._ensure_fresh(cur)
+        return self._names.get(item_id)
+
+    def _range(self, word, exact=False):
+        lo = bisect.bisect_left(self._prefix, (word,))
+        hi = bisect.bisect_left(self._prefix, (word + ("\0" if exact else "\uffff"),))
+        return lo, hi
+
+    # Known words most similar to `word` by trigram Jaccard similarity (typo correction)
+    def _similar_tokens(self, word, limit=3):
+        # a word reaching MIN_TRIGRAM_SCORE shares at least `needed` of the query's trigrams, so it
+        # appears in one of the (len - needed + 1) rarest ones: only those postings are scanned
+        postings = sorted((self._trigrams.get(gram, set()) for gram in trigrams(word)), key=len)
+        needed = max(1, math.ceil(MIN_TRIGRAM_SCORE * len(postings)))
+        scored = []
+        for token in set().union(*postings[:len(postings) - needed + 1]):
+            count = sum(1 for ids in postings if token in ids)
+            scored.append((count / (len(postings) + len(token) + 1 - count), token))
+        return [token for score, token in heapq.nlargest(limit, scored) if score >= MIN_TRIGRAM_SCORE]
+
+    # Walk the postings of the rarest query word and keep names matching every word.
+    # `matchers` is one predicate over a name's tokens per query word.
+    def _collect(self, ranges, matchers, k, results, seen):
+        for lo, hi in min(ranges, key=lambda rs: sum(hi - lo for lo, hi in rs)):
+            for i in range(lo, hi):
+                item_id = self._prefix[i][1]
+                if item_id in seen:
+                    continue
+                seen.add(item_id)
+                name_tokens = tokens(self._names[item_id])
+                if all(match(name_tokens) for match in matchers):
+                    results.append((item_id, self._names[item_id]))
+                    if len(results) >= k:
+                        return
+
+    # Top `k` (id, name) matches for `query`: names with a word starting with every query word,
+    # then names matching once misspelt query words are corrected to similar known words.
+    # An empty query lists the first `k` names alphabetically.
+    def search(self, query, k=10, cur=None):
+        self._ensure_fresh(cur)
+        words = tokens(query)
+        with self._lock:
+            if not words:
+                return [(item_id, self._names[item_id]) for _, item_id in self._by_name[:k]]
+
+            results, seen = [], set()
+            ranges = [[self._range(word)] for word in words]
+            matchers = [lambda ts, w=word: any(t.startswith(w) for t in ts) for word in words]
+            if all(lo < hi for (lo, hi), in ranges):
+                self._collect(ranges, matchers, k, results, seen)
+            if len(results) >= k:
+                return results
+
+            # words that match nothing are taken as typos and fall back to similar known words
+            corrected = False
+            for n, word in enumerate(words):
+                if ranges[n][0][0] < ranges[n][0][1]:
+                    continue
+                similar = self._similar_tokens(word)
+                if not similar:
+                    continue
+                corrected = True
+                ranges[n] = ranges[n] + [self._range(t, exact=True) for t in similar]
+                matchers[n] = lambda ts, w=word, alts=frozenset(similar): any(t.startswith(w) or t in alts for t in ts)
+            if corrected:
+                seen = {item_id for item_id, _ in results}
+                self._collect(ranges, matchers, k, results, seen)
+            return results
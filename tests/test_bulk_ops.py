@@ -0,0 +1,116 @@
+# test_bulk_ops.py
+# The generated statements, captured by a fake connection
+import pytest
+
+import bulk_ops
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rowcount = 0
+
+    def execute(self, sql, params):
+        if self.conn.fail_on and self.conn.fail_on in sql:
+            raise RuntimeError("lock wait timeout")
+        self.conn.statements.append((" ".join(sql.split()), params))
+        self.rowcount = len(params)
+
+    def close(self):
+        pass
+
+
+class FakeConn:
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.statements = []
+        self.commits = self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+@pytest.fixture
+def conn():
+    return FakeConn()
+
+
+def test_update_sets_every_field_for_every_id(conn):
+    result = bulk_ops.update_rows(conn, "member", [3, 5, 8], {"membership_status": "Active", "trainer_id": 2})
+    assert conn.statements == [
+        ("UPDATE member SET membership_status = %s, trainer_id = %s WHERE memberID IN (%s, %s, %s)",
+         ("Active", 2, 3, 5, 8)),
+    ]
+    assert result["rows"] == {"member": 5}
+    assert conn.commits == 1
+
+
+def test_single_id(conn):
+    bulk_ops.update_rows(conn, "equipment", [7], {"number_of_equipment": 4})
+    assert conn.statements == [("UPDATE equipment SET number_of_equipment = %s WHERE equipment_id IN (%s)", (4, 7))]
+
+
+@pytest.mark.parametrize("changes", [{}, {"email": "x@y.z"}, {"membership_status": "Active", "bmi": 20}])
+def test_update_rejects_fields_outside_the_allowed_list(conn, changes):
+    with pytest.raises(ValueError, match="membership_status, membership_id, trainer_id, age"):
+        bulk_ops.update_rows(conn, "member", [1], changes)
+    assert conn.statements == []
+
+
+def test_delete_removes_dependent_rows_first_in_one_transaction(conn):
+    result = bulk_ops.delete_rows(conn, "member", [4, 9])
+    assert conn.statements == [
+        ("DELETE FROM class_enrollment WHERE member_id IN (%s, %s)", (4, 9)),
+        ("DELETE FROM member WHERE memberID IN (%s, %s)", (4, 9)),
+    ]
+    assert result["rows"] == {"class_enrollment": 2, "member": 2}
+    assert conn.commits == 1
+
+
+def test_delete_without_dependents(conn):
+    bulk_ops.delete_rows(conn, "equipment", [1])
+    assert conn.statements == [("DELETE FROM equipment WHERE equipment_id IN (%s)", (1,))]
+
+
+def test_a_failed_statement_rolls_back_the_whole_action():
+    conn = FakeConn(fail_on="DELETE FROM trainer")
+    with pytest.raises(RuntimeError):
+        bulk_ops.delete_rows(conn, "trainer", [2, 3])
+    assert [sql for sql, _ in conn.statements] == ["DELETE FROM salary WHERE trainer_id IN (%s, %s)"]
+    assert (conn.commits, conn.rollbacks) == (0, 1)
+
+
+def test_salaries_set_to_an_amount(conn):
+    bulk_ops.adjust_salaries(conn, [1, 2], set_to=30000)
+    assert conn.statements == [("UPDATE salary SET salary = %s WHERE trainer_id IN (%s, %s)", (30000, 1, 2))]
+
+
+def test_salaries_raised_by_percent_and_amount(conn):
+    bulk_ops.adjust_salaries(conn, [6], percent=10, amount=-500)
+    assert conn.statements == [
+        ("UPDATE salary SET salary = GREATEST(0, ROUND(salary * (1 + %s / 100)) + %s) WHERE trainer_id IN (%s)",
+         (10, -500, 6)),
+    ]
+
+
+@pytest.mark.parametrize("action", [
+    lambda conn: bulk_ops.update_rows(conn, "trainer", [], {"phone": "1"}),
+    lambda conn: bulk_ops.delete_rows(conn, "member", []),
+    lambda conn: bulk_ops.adjust_salaries(conn, [], percent=5),
+])
+def test_empty_selections_are_rejected_before_any_sql(conn, action):
+    with pytest.raises(ValueError, match="no rows selected"):
+        action(conn)
+    assert conn.statements == []
+
+
+def test_selections_are_capped(conn):
+    with pytest.raises(ValueError, match=f"at most {bulk_ops.MAX_BULK_ROWS} rows"):
+        bulk_ops.delete_rows(conn, "equipment", list(range(bulk_ops.MAX_BULK_ROWS + 1)))
+    assert conn.statements == []
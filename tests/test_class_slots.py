@@ -0,0 +1,45 @@
+# test_class_slots.py
+import random
+
+from class_slots import IntervalList, peak
+
+
+def brute_force(intervals, start, end):
+    return sorted((s, e, item) for s, e, item in intervals if s < end and e > start)
+
+
+def test_overlapping_is_half_open():
+    slots = IntervalList()
+    slots.add(540, 600, "a")   # 09:00-10:00
+    slots.add(600, 660, "b")   # 10:00-11:00
+    assert slots.overlapping(600, 630) == [(600, 660, "b")]
+    assert slots.overlapping(570, 605) == [(540, 600, "a"), (600, 660, "b")]
+    assert slots.overlapping(660, 720) == []
+
+
+def test_long_interval_is_found_past_shorter_ones():
+    slots = IntervalList()
+    slots.add(0, 1440, "all day")
+    for i in range(10):
+        slots.add(60 * i, 60 * i + 30, i)
+    assert [item for _, _, item in slots.overlapping(1000, 1010)] == ["all day"]
+
+
+def test_matches_brute_force():
+    rng = random.Random(7)
+    slots, intervals = IntervalList(), []
+    for i in range(300):
+        start = rng.randrange(0, 1400)
+        interval = (start, start + rng.randrange(1, 240), i)
+        intervals.append(interval)
+        slots.add(*interval)
+    for _ in range(200):
+        start = rng.randrange(0, 1440)
+        end = start + rng.randrange(1, 120)
+        assert sorted(slots.overlapping(start, end)) == brute_force(intervals, start, end)
+
+
+def test_peak_counts_back_to_back_once():
+    assert peak([(540, 600, 3), (600, 660, 4)]) == 4
+    assert peak([(540, 600, 3), (570, 660, 4), (0, 1440, 1)]) == 8
+    assert peak([]) == 0
@@ -0,0 +1,39 @@
+# test_data_export.py
+# The writers fed chunks directly, as iter_chunks would yield them from the cursor
+import csv
+import datetime
+import io
+from decimal import Decimal
+
+import pytest
+
+import data_export
+
+COLUMNS = ["payment_id", "amount", "payment_date", "note"]
+
+
+def chunks():
+    # amounts grow from chunk to chunk, like a DECIMAL(12, 2) column read in payment_id order
+    yield COLUMNS, [(1, Decimal("9.50"), datetime.date(2024, 1, 5), None), (2, Decimal("12.00"), datetime.date(2024, 1, 6), None)]
+    yield COLUMNS, [(3, Decimal("1250.75"), datetime.date(2024, 2, 1), "late")]
+    yield COLUMNS, [(4, Decimal("9999999999.99"), datetime.date(2024, 3, 1), None)]
+
+
+def test_parquet_keeps_decimals_wider_than_the_first_chunk():
+    pq = pytest.importorskip("pyarrow.parquet")
+    out = io.BytesIO()
+    assert data_export._write_parquet(chunks(), out) == 4
+    out.seek(0)
+    table = pq.read_table(out)
+    assert table.column("amount").to_pylist() == [Decimal("9.50"), Decimal("12.00"), Decimal("1250.75"),
+                                                  Decimal("9999999999.99")]
+    assert table.column("note").to_pylist() == [None, None, "late", None]
+    assert table.column("payment_date").to_pylist()[-1] == datetime.date(2024, 3, 1)
+
+
+def test_csv_writes_the_header_once():
+    out = io.BytesIO()
+    assert data_export._write_csv(chunks(), out) == 4
+    rows = list(csv.reader(io.StringIO(out.getvalue().decode("utf-8"))))
+    assert rows[0] == COLUMNS
+    assert [row[0] for row in rows[1:]] == ["1", "2", "3", "4"]
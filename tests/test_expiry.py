@@ -0,0 +1,46 @@
+# test_expiry.py
+import datetime
+
+import numpy as np
+
+from expiry import ExpiryCalendar, expiry_dates, membership_expiry
+
+
+def dates(values):
+    return [None if np.isnat(v) else v.item() for v in values]
+
+
+def test_end_of_month_is_clamped():
+    paid = np.array(["2024-01-31", "2023-01-31", "2024-03-31", "2024-08-31", "2024-01-15"], dtype="datetime64[D]")
+    assert dates(expiry_dates(paid, [1, 1, 1, 6, 12])) == [
+        datetime.date(2024, 2, 29),   # leap year
+        datetime.date(2023, 2, 28),
+        datetime.date(2024, 4, 30),
+        datetime.date(2025, 2, 28),
+        datetime.date(2025, 1, 15),
+    ]
+
+
+def test_missing_payment_or_scheme_has_no_expiry():
+    paid = np.array(["NaT", "2024-01-10"], dtype="datetime64[D]")
+    assert dates(expiry_dates(paid, [3, np.nan])) == [None, None]
+
+
+def test_membership_expiry_days_remaining():
+    assert membership_expiry(datetime.date(2024, 1, 31), 1, today=datetime.date(2024, 2, 20)) == (
+        datetime.date(2024, 2, 29), 9)
+    assert membership_expiry(None, 1) == (None, None)
+
+
+def test_calendar_expiring_and_overdue():
+    rows = [
+        (1, "A", "a@x", "Active", "Monthly", 1, datetime.date(2024, 5, 31)),     # expires 2024-06-30
+        (2, "B", "b@x", "Active", "Monthly", 1, datetime.date(2024, 5, 1)),      # expired 2024-06-01
+        (3, "C", "c@x", "Inactive", "Monthly", 1, datetime.date(2024, 5, 2)),    # expired, not Active
+        (4, "D", "d@x", "Active", None, None, None),                             # no expiry
+    ]
+    calendar = ExpiryCalendar(lambda cur: rows)
+    today = datetime.date(2024, 6, 20)
+    assert calendar.expiring(30, today)["memberID"].tolist() == [1]
+    assert calendar.expiring(30, today)["days_remaining"].tolist() == [10]
+    assert calendar.overdue(today)["memberID"].tolist() == [2]
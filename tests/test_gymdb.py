@@ -0,0 +1,79 @@
+# test_gymdb.py
+# Keyset pages checked against SQLite, which orders NULLs like MySQL (first ascending, last descending)
+import sqlite3
+
+import pytest
+
+import gymdb
+
+ROWS = [(1, 30), (2, None), (3, 10), (4, 30), (5, None), (6, 20), (7, 10), (8, None), (9, 20), (10, 30)]
+
+
+class SqliteCursor:
+    def __init__(self, db):
+        self._cur = db.cursor()
+
+    def execute(self, sql, params=()):
+        self._cur.execute(sql.replace("%s", "?"), params)
+
+    def fetchall(self):
+        return self._cur.fetchall()
+
+
+@pytest.fixture
+def cur():
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE item (id INTEGER PRIMARY KEY, score INTEGER)")
+    db.executemany("INSERT INTO item VALUES (?, ?)", ROWS)
+    return SqliteCursor(db)
+
+
+def all_pages(cur, page_size, **kwargs):
+    rows, after, pages = [], None, 0
+    while True:
+        page, after = gymdb.fetch_page(cur, "item", ["id", "score"], "id", page_size, after=after, **kwargs)
+        rows.extend(page)
+        pages += 1
+        if after is None:
+            return rows, pages
+
+
+def expected(descending):
+    # NULL scores first ascending and last descending, ties broken by id in the same direction
+    nulls = sorted((r for r in ROWS if r[1] is None), reverse=descending)
+    scored = sorted((r for r in ROWS if r[1] is not None), key=lambda r: (r[1], r[0]), reverse=descending)
+    return scored + nulls if descending else nulls + scored
+
+
+@pytest.mark.parametrize("page_size", [1, 2, 3, 4, 10, 50])
+@pytest.mark.parametrize("descending", [False, True])
+def test_pages_cover_every_row_once_across_nulls(cur, page_size, descending):
+    rows, pages = all_pages(cur, page_size, sort="score", descending=descending)
+    assert rows == expected(descending)
+    assert pages == max(1, -(-len(ROWS) // page_size))
+
+
+def test_sorting_by_key(cur):
+    assert all_pages(cur, 3, descending=True)[0] == sorted(ROWS, reverse=True)
+
+
+def test_where_applies_to_every_page(cur):
+    rows, _ = all_pages(cur, 2, sort="score", where="score IS NULL OR score > %s", params=(15,))
+    assert rows == [r for r in expected(False) if r[1] is None or r[1] > 15]
+
+
+def test_predicates_after_a_null_sort_value():
+    sql, args, _ = gymdb.page_query("item", ["id"], "id", 10, after=(None, 5), sort="score")
+    assert "((score IS NULL AND id > %s) OR score IS NOT NULL)" in sql
+    assert args == (5, 11)
+    sql, args, _ = gymdb.page_query("item", ["id"], "id", 10, after=(None, 5), sort="score", descending=True)
+    assert "(score IS NULL AND id < %s)" in sql
+    assert args == (5, 11)
+
+
+def test_predicates_after_a_sort_value():
+    sql, args, select = gymdb.page_query("item", ["id"], "id", 10, after=(20, 6), sort="score", descending=True)
+    assert "(score < %s OR (score = %s AND id < %s) OR score IS NULL)" in sql
+    assert sql.endswith("ORDER BY score DESC, id DESC LIMIT %s")
+    assert args == (20, 20, 6, 11)
+    assert select == ["id", "score"]
@@ -0,0 +1,55 @@
+# test_member_import.py
+import numpy as np
+import pytest
+
+from member_import import compute_bmi, parse_row
+
+ROW = {"member_name": " Asha Rao ", "gender": "f", "phone": " 98765 43210 ", "email": " Asha@Example.COM ",
+       "password": "secret", "membership_id": "2", "trainer_id": "", "height": "160", "weight": "", "age": "31"}
+
+
+def test_a_valid_row_is_normalised():
+    record, error = parse_row(ROW)
+    assert error is None
+    assert record == {"member_name": "Asha Rao", "gender": "F", "phone": "98765 43210", "email": "asha@example.com",
+                      "password": "secret", "membership_id": 2, "trainer_id": None, "height": 160.0, "weight": 0.0,
+                      "age": 31}
+
+
+@pytest.mark.parametrize("gender, stored", [("M", "M"), ("o", "O"), ("Other", "O")])
+def test_gender_spellings(gender, stored):
+    assert parse_row(dict(ROW, gender=gender))[0]["gender"] == stored
+
+
+def test_optional_fields_may_be_left_out():
+    record, error = parse_row({"member_name": "A", "gender": "M", "email": "a@b.c", "password": "p"})
+    assert error is None
+    assert (record["phone"], record["membership_id"], record["height"], record["age"]) == (None, None, 0.0, None)
+
+
+@pytest.mark.parametrize("changes, error", [
+    ({"member_name": "  "}, "missing member_name"),
+    ({"email": "", "password": None}, "missing email, password"),
+    ({"gender": "X"}, "invalid gender 'X'"),
+    ({"gender": None}, "invalid gender None"),
+    ({"email": "asha.example.com"}, "invalid email"),
+])
+def test_invalid_rows_are_rejected_with_a_reason(changes, error):
+    assert parse_row(dict(ROW, **changes)) == (None, error)
+
+
+@pytest.mark.parametrize("field", ["membership_id", "trainer_id", "age", "height", "weight"])
+def test_non_numeric_fields_are_rejected(field):
+    record, error = parse_row(dict(ROW, **{field: "abc"}))
+    assert record is None
+    assert error.startswith("invalid number")
+
+
+def test_bmi_for_a_chunk():
+    bmi = compute_bmi([180, 160.0, 0, 175], [81, 64, 70, 0])
+    assert bmi.tolist() == [25.0, 25.0, 0.0, 0.0]  # no height -> 0, like the Add Member form
+
+
+def test_bmi_is_rounded_to_two_places():
+    assert compute_bmi([170], [65])[0] == pytest.approx(22.49)
+    assert compute_bmi(np.array([]), np.array([])).size == 0
@@ -0,0 +1,69 @@
+# test_member_search.py
+import pytest
+
+from member_search import MemberIndex, edit_distance
+
+MEMBERS = [
+    (1, "John Smith", "555-0101", "john.smith@gmail.com"),
+    (2, "Jane Doe", "555-0102", "jane@yahoo.com"),
+    (3, "Johnny Stone", "555-0103", "jstone@gmail.com"),
+    (4, "Mary Johnson", "555-0104", "mary@example.com"),
+    (5, "Peter Jones", "555-0105", "pj@example.com"),
+]
+
+
+@pytest.fixture
+def index():
+    return MemberIndex(lambda cur: list(MEMBERS))
+
+
+def ids(rows):
+    return [row[0] for row in rows]
+
+
+def test_name_start_ranks_before_substring(index):
+    assert ids(index.search("john")) == [1, 3, 4]
+
+
+def test_name_match_ranks_before_email_and_substring(index):
+    index.search("")
+    index.upsert(7, "Alan Brook", "555-0107", "stone.alan@example.com")
+    index.upsert(8, "Keystone Gym", "555-0108", "desk@example.com")
+    # name word start, then another word start (email), then inside a word
+    assert ids(index.search("stone")) == [3, 7, 8]
+
+
+def test_phone_and_email(index):
+    assert ids(index.search("(555) 0103")) == [3]
+    assert ids(index.search("gmail")) == [1, 3]
+
+
+def test_one_letter_word_narrows_to_word_starts(index):
+    assert ids(index.search("John S")) == [1, 3]
+    assert ids(index.search("j smith")) == [1]
+    assert index.search("j") == []
+
+
+def test_swapped_letters(index):
+    assert ids(index.search("jhon"))[:2] == [1, 3]
+    assert ids(index.search("jhon smith")) == [1]
+
+
+def test_one_edit_typos(index):
+    assert ids(index.search("smiht")) == [1]
+    assert ids(index.search("jnae")) == [2]
+    assert ids(index.search("petr")) == [5]
+
+
+def test_upsert_and_remove_update_corrections(index):
+    index.search("john")
+    index.upsert(6, "Anna Karenina", "555-0106", "anna@example.com")
+    assert ids(index.search("karenian")) == [6]
+    index.remove(6)
+    assert index.search("karenian") == []
+
+
+def test_edit_distance():
+    assert edit_distance("jhon", "john") == 1
+    assert edit_distance("jon", "john") == 1
+    assert edit_distance("john", "jane") == 3
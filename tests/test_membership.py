@@ -0,0 +1,28 @@
+# test_membership.py
+import datetime
+
+import pytest
+
+from membership import INACTIVE_AFTER_MONTHS, active_cutoff
+
+
+@pytest.mark.parametrize("today, cutoff", [
+    (datetime.date(2025, 4, 15), datetime.date(2024, 1, 1)),
+    (datetime.date(2025, 4, 1), datetime.date(2024, 1, 1)),
+    (datetime.date(2025, 3, 31), datetime.date(2023, 12, 1)),   # crosses a year boundary
+    (datetime.date(2025, 1, 1), datetime.date(2023, 10, 1)),
+    (datetime.date(2024, 2, 29), datetime.date(2022, 11, 1)),
+])
+def test_cutoff_is_first_of_the_month_15_months_back(today, cutoff):
+    assert INACTIVE_AFTER_MONTHS == 15
+    assert active_cutoff(today) == cutoff
+
+
+def test_cutoff_matches_the_calendar_month_rule():
+    # a payment counts as Active while at most 15 calendar months (by year and month) have passed
+    today = datetime.date(2025, 6, 10)
+    for year in range(2023, 2026):
+        for month in range(1, 13):
+            paid = datetime.date(year, month, 28)
+            months = (today.year - paid.year) * 12 + (today.month - paid.month)
+            assert (paid >= active_cutoff(today)) == (months <= INACTIVE_AFTER_MONTHS)
@@ -0,0 +1,78 @@
+# test_querylog.py
+import threading
+
+import pytest
+
+import querylog
+from querylog import QueryLog, fingerprint
+
+
+@pytest.mark.parametrize("sql, expected", [
+    ("SELECT * FROM member WHERE memberID = 42", "SELECT * FROM member WHERE memberID = ?"),
+    ("SELECT * FROM login WHERE email = 'a@b.com' AND password = \"it's\"",
+     "SELECT * FROM login WHERE email = ? AND password = ?"),
+    ("SELECT 'it\\'s', 3.75", "SELECT ?, ?"),
+    ("DELETE FROM member WHERE memberID IN (%s, %s, %s)", "DELETE FROM member WHERE memberID IN (...)"),
+    ("DELETE FROM member WHERE memberID IN (1, 2,3)", "DELETE FROM member WHERE memberID IN (...)"),
+    ("SELECT  a,\n\tb\nFROM t1   LIMIT %s", "SELECT a, b FROM t1 LIMIT %s"),  # identifiers keep their digits
+])
+def test_fingerprint_normalises_literals_lists_and_whitespace(sql, expected):
+    assert fingerprint(sql) == expected
+
+
+def test_statements_differing_only_in_literals_share_a_fingerprint():
+    assert fingerprint("SELECT fee FROM membership_schemes WHERE scheme_id = 1") == \
+        fingerprint("SELECT fee FROM membership_schemes  WHERE scheme_id = 27")
+
+
+@pytest.fixture
+def log():
+    log = QueryLog(size=100, path=None)
+    querylog.begin_rerun("Member", "Payment History")
+    for ms in (10, 20, 30):
+        log.record(f"SELECT * FROM payment WHERE member_id = {ms}", ms / 1000, 5)
+    log.record("UPDATE member SET membership_status = 'Active' WHERE memberID = 1", 0.005, 1)
+    querylog.begin_rerun("Trainer")
+    querylog.set_context(tab="View Classes")
+    log.record("SELECT * FROM classes WHERE trainer_id = 3", 0.1, 12)
+    yield log
+    querylog.begin_rerun()
+
+
+def test_top_queries_aggregate_by_fingerprint_most_time_first(log):
+    top = log.top_queries()
+    assert [(q["fingerprint"], q["calls"]) for q in top] == [
+        ("SELECT * FROM classes WHERE trainer_id = ?", 1),
+        ("SELECT * FROM payment WHERE member_id = ?", 3),
+        ("UPDATE member SET membership_status = ? WHERE memberID = ?", 1),
+    ]
+    payments = top[1]
+    assert (payments["total_ms"], payments["mean_ms"], payments["p95_ms"], payments["rows"]) == (60.0, 20.0, 30.0, 15)
+    assert payments["panels"] == "Member/Payment History"
+    assert log.top_queries(limit=1) == top[:1]
+
+
+def test_reruns_count_statements_per_run_newest_first(log):
+    runs = log.reruns()
+    assert [(r["panel"], r["tab"], r["queries"], r["total_ms"]) for r in runs] == [
+        ("Trainer", "View Classes", 1, 100.0),
+        ("Member", "Payment History", 4, 65.0),
+    ]
+
+
+def test_slow_queries_by_threshold_or_against_the_median(log):
+    assert [r["ms"] for r in log.slow_queries(threshold_ms=25)] == [100.0, 30.0]
+    for _ in range(4):
+        log.record("SELECT * FROM payment WHERE member_id = 1", 0.010, 1)
+    log.record("SELECT * FROM payment WHERE member_id = 1", 0.090, 1)  # 9x the median of its fingerprint
+    assert [r["ms"] for r in log.slow_queries(threshold_ms=95)] == [100.0, 90.0]
+
+
+def test_records_from_other_threads_are_background(log):
+    # e.g. the status sweeper: no rerun context on its thread
+    worker = threading.Thread(target=log.record, args=("SELECT 1", 0.001, 1))
+    worker.start()
+    worker.join()
+    entry = log.records()[-1]
+    assert (entry["panel"], entry["tab"], entry["rerun"]) == ("background", None, None)
+    assert len(log.reruns()) == 2
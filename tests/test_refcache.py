@@ -0,0 +1,153 @@
+# test_refcache.py
+# Both caches against counting loaders and a clock the tests move by hand
+import datetime
+
+import pytest
+
+import refcache
+from refcache import DayCache, RefCache
+
+DAY = datetime.timedelta(days=1)
+MONDAY = datetime.date(2025, 3, 3)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(refcache.time, "monotonic", lambda: now[0])
+    return now
+
+
+class Loader:
+    def __init__(self, value="row"):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return f"{self.value}{self.calls}"
+
+
+# --- RefCache ---
+
+def test_hits_are_served_until_the_ttl_expires(clock):
+    cache, load = RefCache(ttl=60), Loader()
+    assert cache.get("equipment", 1, load) == "row1"
+    clock[0] += 59
+    assert cache.get("equipment", 1, load) == "row1"
+    clock[0] += 2
+    assert cache.get("equipment", 1, load) == "row2"
+    assert load.calls == 2
+    stats = cache.stats()["equipment"]
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 2, 0.333)
+
+
+def test_invalidation_drops_only_that_table(clock):
+    cache, schemes, equipment = RefCache(ttl=60), Loader("s"), Loader("e")
+    cache.get("membership_schemes", "all", schemes)
+    cache.get("equipment", "all", equipment)
+    cache.invalidate("membership_schemes")
+    assert cache.get("membership_schemes", "all", schemes) == "s2"
+    assert cache.get("equipment", "all", equipment) == "e1"
+    assert cache.stats()["membership_schemes"]["invalidations"] == 1
+
+
+def test_a_value_loaded_across_an_invalidation_is_not_kept(clock):
+    cache = RefCache(ttl=60)
+
+    def stale_loader():
+        cache.invalidate("equipment")  # a write lands while the query runs
+        return "stale"
+
+    assert cache.get("equipment", 1, stale_loader) == "stale"
+    assert cache.get("equipment", 1, Loader("fresh")) == "fresh1"
+
+
+def test_least_recently_used_entries_are_evicted(clock):
+    cache, load = RefCache(ttl=60, max_entries=2), Loader()
+    cache.get("equipment", 1, load)
+    cache.get("equipment", 2, load)
+    cache.get("equipment", 1, load)  # 2 is now the least recently used
+    cache.get("equipment", 3, load)
+    assert load.calls == 3
+    cache.get("equipment", 1, load)
+    assert load.calls == 3
+    cache.get("equipment", 2, load)
+    assert load.calls == 4
+    assert cache.stats()["equipment"]["evictions"] == 2
+
+
+# --- DayCache ---
+
+class Builder:
+    # {date: [date]} for the days in start..end except Sundays, which have no data
+    def __init__(self):
+        self.ranges = []
+
+    def __call__(self, cur, start, end):
+        self.ranges.append((start, end))
+        days = {}
+        day = start
+        while day <= end:
+            if day.weekday() != 6:
+                days[day] = [day]
+            day += DAY
+        return days
+
+
+def week(start, n=7):
+    return [start + i * DAY for i in range(n)]
+
+
+def test_days_without_data_get_the_empty_value(clock):
+    build = Builder()
+    cache = DayCache(build, list, ttl=60)
+    days = cache.get(None, week(MONDAY))
+    assert days[MONDAY] == [MONDAY]
+    assert days[MONDAY + 6 * DAY] == []
+    assert build.ranges == [(MONDAY, MONDAY + 6 * DAY)]
+
+
+def test_a_new_day_builds_only_the_missing_range(clock):
+    build = Builder()
+    cache = DayCache(build, list, ttl=60)
+    cache.get(None, week(MONDAY))
+    # the window rolls over by a day: only the new day is built
+    days = cache.get(None, week(MONDAY + DAY))
+    assert build.ranges[1:] == [(MONDAY + 7 * DAY, MONDAY + 7 * DAY)]
+    assert sorted(days) == week(MONDAY + DAY)
+
+
+def test_days_expire_after_the_ttl(clock):
+    build = Builder()
+    cache = DayCache(build, list, ttl=60)
+    cache.get(None, [MONDAY])
+    clock[0] += 61
+    cache.get(None, [MONDAY])
+    assert build.ranges == [(MONDAY, MONDAY), (MONDAY, MONDAY)]
+
+
+def test_invalidated_days_are_rebuilt(clock):
+    build = Builder()
+    cache = DayCache(build, list, ttl=60)
+    cache.get(None, week(MONDAY))
+    cache.invalidate([MONDAY + 2 * DAY])
+    cache.get(None, week(MONDAY))
+    assert build.ranges[1:] == [(MONDAY + 2 * DAY, MONDAY + 2 * DAY)]
+    cache.clear()
+    cache.get(None, week(MONDAY))
+    assert build.ranges[2:] == [(MONDAY, MONDAY + 6 * DAY)]
+
+
+def test_a_day_built_across_an_invalidation_is_not_kept(clock):
+    build = Builder()
+
+    def build_racing_once(cur, start, end):
+        if not build.ranges:
+            cache.invalidate([start])  # a class is scheduled while the first load runs
+        return build(cur, start, end)
+
+    cache = DayCache(build_racing_once, list, ttl=60)
+    assert cache.get(None, [MONDAY]) == {MONDAY: [MONDAY]}
+    cache.get(None, [MONDAY])
+    assert len(build.ranges) == 2
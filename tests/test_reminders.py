@@ -0,0 +1,102 @@
+# test_reminders.py
+# The scan's state machine against a fake cursor: reminder_state is one row in memory, the
+# member table is just its highest memberID and each queued chunk is recorded with its window
+import datetime
+
+import pytest
+
+import reminders
+
+TODAY = datetime.date(2025, 3, 10)
+DAY = datetime.timedelta(days=1)
+
+
+class FakeConn:
+    def __init__(self):
+        self.commits = 0
+
+    def commit(self):
+        self.commits += 1
+
+
+class FakeCursor:
+    def __init__(self, high):
+        self.high = high
+        self.state = None  # (last_member_id, passes, horizon, pass_until)
+        self.chunks = []   # (low, high, first, last) of every queue_chunk call
+        self.rowcount = 0
+        self._row = None
+
+    def execute(self, sql, params=()):
+        if "FROM reminder_state" in sql:
+            self._row = self.state
+        elif "INSERT INTO reminder_state" in sql:
+            self.state = tuple(params[1:])
+        elif "MAX(memberID)" in sql:
+            self._row = (self.high,)
+        elif "INSERT INTO reminder_outbox" in sql:
+            low, high, _, _, first, last = params
+            self.chunks.append((low, high, first, last))
+            self.rowcount = 1
+        else:
+            raise AssertionError(sql)
+
+    def fetchone(self):
+        return self._row
+
+
+@pytest.fixture
+def db():
+    return FakeConn(), FakeCursor(high=10)
+
+
+def scan(db, today, **kwargs):
+    conn, cur = db
+    cur.chunks.clear()
+    return reminders.scan(conn, cur, today=today, days=7, chunk_size=4, **kwargs)
+
+
+def test_a_pass_reads_every_chunk_and_moves_the_horizon(db):
+    assert scan(db, TODAY) == (3, 3, 0, 1, TODAY + 7 * DAY)
+    assert db[1].chunks == [(0, 4, TODAY, TODAY + 7 * DAY), (4, 8, TODAY, TODAY + 7 * DAY),
+                            (8, 10, TODAY, TODAY + 7 * DAY)]
+    assert db[1].state == (0, 1, TODAY + 7 * DAY, None)
+
+
+def test_a_second_run_the_same_day_has_nothing_to_scan(db):
+    scan(db, TODAY)
+    assert scan(db, TODAY) == (0, 0, 0, 1, TODAY + 7 * DAY)
+    assert db[1].chunks == []
+
+
+def test_the_next_day_queues_only_the_new_expiry_day(db):
+    scan(db, TODAY)
+    scan(db, TODAY + DAY)
+    assert {(first, last) for _, _, first, last in db[1].chunks} == {(TODAY + 8 * DAY, TODAY + 8 * DAY)}
+    assert db[1].state == (0, 2, TODAY + 8 * DAY, None)
+
+
+def test_an_interrupted_pass_resumes_with_the_same_window(db):
+    assert scan(db, TODAY, max_chunks=1)[2] == 4
+    assert db[1].state == (4, 0, None, TODAY + 7 * DAY)
+    scan(db, TODAY + DAY)  # yesterday's expiries are past, the upper bound stays
+    assert db[1].chunks == [(4, 8, TODAY + DAY, TODAY + 7 * DAY), (8, 10, TODAY + DAY, TODAY + 7 * DAY)]
+    assert db[1].state == (0, 1, TODAY + 7 * DAY, None)
+
+
+def test_a_pass_left_open_over_a_long_gap_is_closed_and_restarted(db):
+    scan(db, TODAY, max_chunks=1)
+    later = TODAY + 30 * DAY  # the open pass's window ended 23 days ago
+    assert scan(db, later) == (3, 3, 0, 1, later + 7 * DAY)
+    assert db[1].chunks[0] == (0, 4, later, later + 7 * DAY)
+    assert db[1].state == (0, 1, later + 7 * DAY, None)
+    # and the days after scan normally again
+    scan(db, later + DAY)
+    assert {(first, last) for _, _, first, last in db[1].chunks} == {(later + 8 * DAY, later + 8 * DAY)}
+
+
+def test_a_gap_between_completed_passes_starts_at_today(db):
+    scan(db, TODAY)
+    later = TODAY + 20 * DAY
+    scan(db, later)
+    assert {(first, last) for _, _, first, last in db[1].chunks} == {(later, later + 7 * DAY)}
@@ -0,0 +1,98 @@
+# test_scheduling.py
+import datetime
+
+import pytest
+
+import scheduling
+from scheduling import class_window, series_dates, trainer_classes_query
+
+D = datetime.date
+MON, WED, FRI, SUN = 0, 2, 4, 6
+
+
+def test_weekly_series_across_month_and_year_ends():
+    dates = series_dates(D(2024, 12, 23), [MON, FRI], 3)
+    assert dates == [D(2024, 12, 23), D(2024, 12, 27), D(2024, 12, 30), D(2025, 1, 3), D(2025, 1, 6), D(2025, 1, 10)]
+
+
+def test_series_starting_mid_week_takes_the_days_from_the_start_on():
+    # starts on a Thursday in January: 14 days from the start, the first Monday is in February
+    dates = series_dates(D(2025, 1, 30), [MON, WED], 2)
+    assert dates == [D(2025, 2, 3), D(2025, 2, 5), D(2025, 2, 10), D(2025, 2, 12)]
+    assert all(d < D(2025, 1, 30) + datetime.timedelta(weeks=2) for d in dates)
+
+
+def test_series_through_february_of_a_leap_year():
+    dates = series_dates(D(2024, 2, 26), [WED], 2)
+    assert dates == [D(2024, 2, 28), D(2024, 3, 6)]
+    assert series_dates(D(2024, 2, 29), [SUN, SUN], 1) == [D(2024, 3, 3)]  # repeated weekdays count once
+
+
+def test_series_length_is_weeks_times_weekdays():
+    dates = series_dates(D(2025, 5, 1), [MON, WED, FRI], scheduling.MAX_SERIES_WEEKS)
+    assert len(dates) == 3 * scheduling.MAX_SERIES_WEEKS
+    assert len(set(dates)) == len(dates) and dates == sorted(dates)
+
+
+@pytest.mark.parametrize("weekdays, weeks, message", [
+    ([], 4, "at least one weekday"),
+    ([MON], 0, "1 to"),
+    ([MON], scheduling.MAX_SERIES_WEEKS + 1, "1 to"),
+])
+def test_invalid_series(weekdays, weeks, message):
+    with pytest.raises(ValueError, match=message):
+        series_dates(D(2025, 1, 6), weekdays, weeks)
+
+
+@pytest.mark.parametrize("today, window", [
+    (D(2025, 3, 12), (D(2025, 3, 10), D(2025, 3, 16))),   # Wednesday
+    (D(2025, 3, 10), (D(2025, 3, 10), D(2025, 3, 16))),   # Monday is the first day
+    (D(2025, 3, 16), (D(2025, 3, 10), D(2025, 3, 16))),   # Sunday the last
+    (D(2024, 12, 31), (D(2024, 12, 30), D(2025, 1, 5))),  # across the year end
+])
+def test_this_week_runs_monday_to_sunday(today, window):
+    assert class_window("This week", today) == window
+
+
+@pytest.mark.parametrize("today, window", [
+    (D(2025, 1, 31), (D(2025, 1, 1), D(2025, 1, 31))),
+    (D(2025, 2, 1), (D(2025, 2, 1), D(2025, 2, 28))),
+    (D(2024, 2, 15), (D(2024, 2, 1), D(2024, 2, 29))),
+    (D(2025, 12, 1), (D(2025, 12, 1), D(2025, 12, 31))),
+])
+def test_this_month_runs_first_to_last_day(today, window):
+    assert class_window("This month", today) == window
+
+
+def test_unknown_window():
+    with pytest.raises(ValueError, match="unknown class window"):
+        class_window("This year", D(2025, 1, 1))
+
+
+TODAY = D(2025, 3, 12)
+
+
+def test_upcoming_starts_today_soonest_first():
+    query = trainer_classes_query(7, D(2025, 3, 10), D(2025, 3, 16), upcoming=True, today=TODAY)
+    assert query["where"] == "C.trainer_id = %s AND C.date >= %s AND C.date <= %s"
+    assert query["params"] == (7, TODAY, D(2025, 3, 16))
+    assert (query["sort"], query["key"], query["descending"]) == ("C.date", "C.class_id", False)
+
+
+def test_past_ends_before_today_latest_first():
+    query = trainer_classes_query(7, D(2025, 3, 10), D(2025, 3, 16), upcoming=False, today=TODAY)
+    assert query["where"] == "C.trainer_id = %s AND C.date >= %s AND C.date < %s"
+    assert query["params"] == (7, D(2025, 3, 10), TODAY)
+    assert query["descending"] is True
+
+
+def test_windows_entirely_before_or_after_today():
+    past_month = (D(2025, 2, 1), D(2025, 2, 28))
+    assert trainer_classes_query(7, *past_month, upcoming=False, today=TODAY)["params"] == (7, D(2025, 2, 1), D(2025, 3, 1))
+    # nothing upcoming: the lower bound passes the upper one
+    lower, upper = trainer_classes_query(7, *past_month, upcoming=True, today=TODAY)["params"][1:]
+    assert lower > upper
+    next_month = (D(2025, 4, 1), D(2025, 4, 30))
+    assert trainer_classes_query(7, *next_month, upcoming=True, today=TODAY)["params"] == (7, D(2025, 4, 1), D(2025, 4, 30))
+    lower, upper = trainer_classes_query(7, *next_month, upcoming=False, today=TODAY)["params"][1:]
+    assert lower >= upper
@@ -0,0 +1,46 @@
+# test_search_index.py
+import pytest
+
+from search_index import NameIndex
+
+WORKOUTS = [
+    (1, "Bench Press"),
+    (2, "Incline Bench Press"),
+    (3, "Squat"),
+    (4, "Front Squat"),
+    (5, "Deadlift"),
+]
+
+
+@pytest.fixture
+def index():
+    return NameIndex(lambda cur: list(WORKOUTS))
+
+
+def ids(rows):
+    return [item_id for item_id, _ in rows]
+
+
+def test_word_prefixes_in_any_order(index):
+    assert sorted(ids(index.search("ben"))) == [1, 2]
+    assert ids(index.search("squ fr")) == [4]
+    assert index.search("press squat") == []
+
+
+def test_empty_query_lists_names_alphabetically(index):
+    assert ids(index.search("", k=3)) == [1, 5, 4]
+
+
+def test_misspelt_word_is_corrected(index):
+    assert ids(index.search("deadlfit")) == [5]
+    assert sorted(ids(index.search("inclne bench"))) == [2]
+
+
+def test_writes_update_the_index(index):
+    index.search("")
+    index.upsert(6, "Bulgarian Split Squat")
+    index.upsert(3, "Back Squat")
+    index.remove(5)
+    assert sorted(ids(index.search("squat"))) == [3, 4, 6]
+    assert index.name(3) == "Back Squat"
+    assert index.search("deadlift") == []
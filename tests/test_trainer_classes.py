@@ -0,0 +1,86 @@
+# test_trainer_classes.py
+# The trainer's View Classes pages against SQLite: window bounds, the upcoming / past split
+# around today, other trainers' classes filtered out, and keyset paging over same-day classes
+import datetime
+import sqlite3
+
+import pytest
+
+import scheduling
+
+D = datetime.date
+TODAY = D(2025, 3, 12)  # a Wednesday; This week is 10-16 March
+TRAINER, OTHER = 1, 2
+
+# (class_id, trainer_id, date)
+CLASSES = [
+    (1, TRAINER, D(2025, 3, 9)),    # Sunday before the week
+    (2, TRAINER, D(2025, 3, 10)),
+    (3, TRAINER, D(2025, 3, 11)),
+    (4, TRAINER, D(2025, 3, 11)),
+    (5, OTHER, D(2025, 3, 11)),
+    (6, TRAINER, D(2025, 3, 12)),   # today counts as upcoming
+    (7, TRAINER, D(2025, 3, 12)),
+    (8, TRAINER, D(2025, 3, 14)),
+    (9, OTHER, D(2025, 3, 15)),
+    (10, TRAINER, D(2025, 3, 16)),
+    (11, TRAINER, D(2025, 3, 17)),  # Monday after the week
+    (12, TRAINER, D(2025, 3, 31)),
+]
+
+
+class SqliteCursor:
+    def __init__(self, db):
+        self._cur = db.cursor()
+
+    def execute(self, sql, params=()):
+        params = [p.isoformat() if isinstance(p, datetime.date) else p for p in params]
+        self._cur.execute(sql.replace("%s", "?"), params)
+
+    def fetchall(self):
+        return self._cur.fetchall()
+
+
+@pytest.fixture
+def cur():
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE workouts (workout_id INTEGER PRIMARY KEY, workout_name TEXT)")
+    db.execute("""CREATE TABLE classes (class_id INTEGER PRIMARY KEY, trainer_id INTEGER, date TEXT, workout_id INTEGER,
+                                        series_id INTEGER, start_time TEXT, end_time TEXT, room TEXT)""")
+    db.execute("INSERT INTO workouts VALUES (1, 'Spin')")
+    db.executemany("INSERT INTO classes (class_id, trainer_id, date, workout_id) VALUES (?, ?, ?, 1)",
+                   [(class_id, trainer, day.isoformat()) for class_id, trainer, day in CLASSES])
+    return SqliteCursor(db)
+
+
+def class_ids(cur, window, upcoming, page_size=2):
+    start, end = scheduling.class_window(window, TODAY)
+    ids, after = [], None
+    while True:
+        rows, after = scheduling.trainer_classes_page(cur, TRAINER, start, end, upcoming, page_size, after, today=TODAY)
+        ids.extend(row[0] for row in rows)
+        if after is None:
+            return ids
+
+
+def test_this_week_upcoming_from_today_soonest_first(cur):
+    assert class_ids(cur, "This week", upcoming=True) == [6, 7, 8, 10]
+
+
+def test_this_week_past_before_today_latest_first(cur):
+    assert class_ids(cur, "This week", upcoming=False) == [4, 3, 2]
+
+
+def test_this_month_takes_the_whole_month(cur):
+    assert class_ids(cur, "This month", upcoming=True) == [6, 7, 8, 10, 11, 12]
+    assert class_ids(cur, "This month", upcoming=False) == [4, 3, 2, 1]
+
+
+@pytest.mark.parametrize("page_size", [1, 2, 3, 10])
+def test_pages_cover_the_window_once_whatever_the_page_size(cur, page_size):
+    assert class_ids(cur, "This month", upcoming=True, page_size=page_size) == [6, 7, 8, 10, 11, 12]
+
+
+def test_a_window_entirely_in_the_past_has_nothing_upcoming(cur):
+    rows, after = scheduling.trainer_classes_page(cur, TRAINER, D(2025, 3, 1), D(2025, 3, 11), True, today=TODAY)
+    assert (rows, after) == ([], None)